@@ -0,0 +1,30 @@
+"""add projects.original_sha256
+
+Revision ID: 4f1a2c9d8e31
+Revises:
+Create Date: 2026-10-19 01:00:00
+
+Tables are created with create_all on startup, which never adds columns to
+an existing table: databases created before the column existed need this.
+IF NOT EXISTS keeps it a no-op on databases created after.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f1a2c9d8e31'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE projects ADD COLUMN IF NOT EXISTS original_sha256 VARCHAR(64)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_projects_original_sha256 ON projects (original_sha256)")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_projects_original_sha256", table_name="projects")
+    op.drop_column("projects", "original_sha256")
@@ -0,0 +1,29 @@
+"""add projects.render_engine
+
+Revision ID: 8b3e5d7a2c14
+Revises: 4f1a2c9d8e31
+Create Date: 2026-10-19 02:00:00
+
+Tables are created with create_all on startup, which never adds columns to
+an existing table: databases created before the column existed need this.
+Existing projects get the HTML engine they were rendered with; IF NOT
+EXISTS keeps it a no-op on databases created after.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b3e5d7a2c14'
+down_revision: Union[str, None] = '4f1a2c9d8e31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE projects ADD COLUMN IF NOT EXISTS render_engine VARCHAR(20) DEFAULT 'html'")
+
+
+def downgrade() -> None:
+    op.drop_column("projects", "render_engine")
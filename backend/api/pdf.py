@@ -1,7 +1,9 @@
 """
 PDF API Routes - PDF generation and download
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
@@ -10,11 +12,14 @@ from datetime import datetime
 from urllib.parse import quote
 
 from core.database import get_db
-from core.dependencies import get_current_active_user
+from core.dependencies import get_current_active_user, get_rate_limited_user
+from core.responses import stored_file_response
 from models.user import User
-from models.project import Project, ProjectStatus
-from services.pdf_generator import pdf_generator
-from services.storage import storage_service
+from models.project import Project, ProjectStatus, RenderEngine
+from services.storage import storage_service, async_storage
+from services.governor import resource_governor
+from services.render_cache import render_cache
+from services.page_raster import page_raster, PREVIEW_CONTENT_TYPES
 from loguru import logger
 
 router = APIRouter(prefix="/api/pdf", tags=["PDF"])
@@ -23,7 +28,7 @@ router = APIRouter(prefix="/api/pdf", tags=["PDF"])
 @router.post("/projects/{project_id}/generate")
 async def generate_pdf(
     project_id: UUID,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_rate_limited_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -31,9 +36,10 @@ async def generate_pdf(
 
     Steps:
     1. Get project with translated markdown
-    2. Convert Markdown to PDF
-    3. Upload PDF to storage
-    4. Update project with PDF URL
+    2. Return the cached PDF if its inputs are unchanged
+    3. Convert Markdown to PDF
+    4. Store PDF under its cache key
+    5. Update project with PDF URL
     """
     # Get project with images (eager load for position info)
     result = await db.execute(
@@ -58,63 +64,108 @@ async def generate_pdf(
             detail="Translation not yet completed. Please wait or start translation."
         )
 
-    try:
-        logger.info(f"Generating PDF for project {project_id}")
-
-        # Load project images with position info
-        # Note: project.images is already loaded via relationship
-        # with order_by="ProjectImage.page_number, ProjectImage.image_index"
-
-        # Generate PDF from translated Markdown (with embedded images and positions)
-        pdf_bytes = pdf_generator.markdown_to_pdf(
-            markdown_content=project.markdown_translated,
-            title=project.original_filename.replace('.pdf', '_translated.pdf'),
-            language=project.target_language,
-            storage_service=storage_service,
-            project_images=project.images  # Pass image position info
+    render_engine = project.render_engine or RenderEngine.HTML.value
+    if render_engine == RenderEngine.OVERLAY.value and not project.original_file_url:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Overlay rendering needs the original PDF, which this project does not have"
         )
 
-        # Upload PDF to storage
-        pdf_filename = project.original_filename.replace('.pdf', '_translated.pdf')
-        pdf_path = storage_service.upload_file(
-            file_content=pdf_bytes,
-            filename=pdf_filename,
-            content_type="application/pdf",
-            folder=f"users/{current_user.id}/translated"
-        )
+    pdf_filename = project.original_filename.replace('.pdf', '_translated.pdf')
 
-        # Update project
-        project.pdf_translated_url = pdf_path
-        await db.commit()
-        await db.refresh(project)
+    # Return the existing artifact if nothing that affects the render has changed
+    cache_key = render_cache.key(
+        markdown_content=project.markdown_translated,
+        project_images=project.images,
+        title=pdf_filename,
+        language=project.target_language,
+        engine=render_engine,
+        original_path=project.original_file_url
+    )
+    cached_path = await async_storage.run(render_cache.get, current_user.id, project_id, cache_key)
 
-        logger.success(f"PDF generated for project {project_id}: {pdf_path}")
+    if cached_path:
+        if project.pdf_translated_url != cached_path:
+            project.pdf_translated_url = cached_path
+            await db.commit()
 
         return {
-            "message": "PDF generated successfully",
+            "message": "PDF is up to date",
             "project_id": str(project_id),
-            "pdf_url": pdf_path,
-            "download_url": f"/api/pdf/projects/{project_id}/download"
+            "pdf_url": cached_path,
+            "download_url": f"/api/pdf/projects/{project_id}/download",
+            "cached": True
         }
 
-    except Exception as e:
-        logger.error(f"PDF generation failed for project {project_id}: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"PDF generation failed: {str(e)}"
-        )
+    # Render stage budget: Markdown plus every embedded image ends up in memory
+    render_input_bytes = len(project.markdown_translated.encode()) + sum(
+        img.file_size or 0 for img in project.images
+    )
+    if render_engine == RenderEngine.OVERLAY.value:
+        render_input_bytes += project.file_size_bytes or 0
+
+    async with resource_governor.admit("render", render_input_bytes):
+        try:
+            logger.info(f"Generating PDF for project {project_id}")
+
+            # Load project images with position info
+            # Note: project.images is already loaded via relationship
+            # with order_by="ProjectImage.page_number, ProjectImage.image_index"
+
+            # Generate PDF from translated Markdown (with embedded images and positions)
+            # Only pages whose content changed are re-rendered (in the process
+            # pool, so this worker stays responsive); the rest come from cache.
+            # The PDF is streamed to storage under its cache key without
+            # passing through this process
+            pdf_path = await render_cache.render_document(
+                user_id=current_user.id,
+                project_id=project_id,
+                cache_key=cache_key,
+                markdown_content=project.markdown_translated,
+                project_images=project.images,  # Pass image position info
+                title=pdf_filename,
+                language=project.target_language,
+                engine=render_engine,
+                original_path=project.original_file_url
+            )
+
+            # Update project, then drop the renders it superseded
+            previous_path = project.pdf_translated_url
+            project.pdf_translated_url = pdf_path
+            await db.commit()
+            await render_cache.evict_superseded(db, current_user.id, project_id, pdf_path, previous_path)
+            await db.refresh(project)
+
+            logger.success(f"PDF generated for project {project_id}: {pdf_path}")
+
+            return {
+                "message": "PDF generated successfully",
+                "project_id": str(project_id),
+                "pdf_url": pdf_path,
+                "download_url": f"/api/pdf/projects/{project_id}/download",
+                "cached": False
+            }
+
+        except Exception as e:
+            logger.error(f"PDF generation failed for project {project_id}: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"PDF generation failed: {str(e)}"
+            )
 
 
 @router.get("/projects/{project_id}/download")
 async def download_pdf(
     project_id: UUID,
+    request: Request,
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Download translated PDF
 
-    Returns PDF file with appropriate headers
+    Streams the PDF from storage with download headers; supports Range
+    (206) and If-None-Match (304)
     """
     # Get project
     result = await db.execute(
@@ -139,9 +190,6 @@ async def download_pdf(
         )
 
     try:
-        # Download PDF from storage
-        pdf_bytes = storage_service.download_file(project.pdf_translated_url)
-
         # Generate filename
         filename = project.original_filename.replace('.pdf', '_translated.pdf')
 
@@ -149,9 +197,10 @@ async def download_pdf(
         # Support both ASCII and UTF-8 filenames for browser compatibility
         encoded_filename = quote(filename.encode('utf-8'))
 
-        # Return PDF with download headers
-        return Response(
-            content=pdf_bytes,
+        # Stream PDF with download headers
+        return await stored_file_response(
+            request,
+            project.pdf_translated_url,
             media_type="application/pdf",
             headers={
                 "Content-Disposition": f"attachment; filename*=UTF-8''{encoded_filename}"
@@ -169,11 +218,15 @@ async def download_pdf(
 @router.get("/projects/{project_id}/preview")
 async def preview_pdf(
     project_id: UUID,
+    request: Request,
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Preview translated PDF in browser (inline, not download)
+
+    Range requests let the viewer load pages lazily instead of fetching
+    the whole file first; unchanged PDFs revalidate with a 304
     """
     # Get project
     result = await db.execute(
@@ -198,12 +251,10 @@ async def preview_pdf(
         )
 
     try:
-        # Download PDF from storage
-        pdf_bytes = storage_service.download_file(project.pdf_translated_url)
-
-        # Return PDF for inline preview
-        return Response(
-            content=pdf_bytes,
+        # Stream PDF for inline preview
+        return await stored_file_response(
+            request,
+            project.pdf_translated_url,
             media_type="application/pdf",
             headers={
                 "Content-Disposition": "inline"
@@ -216,3 +267,69 @@ async def preview_pdf(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"PDF preview failed: {str(e)}"
         )
+
+
+@router.get("/projects/{project_id}/pages/{page_number}/image")
+async def page_image(
+    project_id: UUID,
+    page_number: int,
+    source: str = Query("translated", pattern="^(original|translated)$"),
+    width: int = Query(800, ge=64, le=2048),
+    format: str = Query("png", pattern="^(png|webp)$"),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Single page of the original or translated PDF as an image
+
+    Lets the editor show pages side by side, one at a time, instead of
+    downloading whole PDFs. Rasters are cached, so repeat views are cheap.
+    """
+    result = await db.execute(
+        select(Project)
+        .where(Project.id == project_id)
+        .where(Project.user_id == current_user.id)
+        .where(Project.deleted_at.is_(None))
+    )
+    project = result.scalar_one_or_none()
+
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+
+    pdf_path = project.original_file_url if source == "original" else project.pdf_translated_url
+    if not pdf_path:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Original PDF not available" if source == "original" else "Translated PDF not yet generated"
+        )
+
+    try:
+        # Rasterizing is CPU-bound; keep it off the event loop
+        image_bytes = await asyncio.to_thread(
+            page_raster.render_page, storage_service, pdf_path, page_number, width, format
+        )
+
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+
+    except Exception as e:
+        logger.error(f"Page image failed for project {project_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Page image failed: {str(e)}"
+        )
+
+    return Response(
+        content=image_bytes,
+        media_type=PREVIEW_CONTENT_TYPES[format],
+        headers={
+            # The URL doesn't change when the PDF is re-rendered, so keep it short
+            "Cache-Control": "private, max-age=60"
+        }
+    )
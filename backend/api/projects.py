@@ -3,73 +3,68 @@ Project API Routes - File upload and project management
 """
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import insert, select, func
 from typing import Optional
-from uuid import UUID
+from uuid import UUID, uuid4
 
 from core.database import get_db
-from core.dependencies import get_current_active_user
+from core.dependencies import get_current_active_user, get_rate_limited_user
 from core.config import settings
 from models.user import User
 from models.project import Project, ProjectStatus
 from models.project_image import ProjectImage
 from schemas.project import ProjectCreate, ProjectResponse, ProjectUpdate, ProjectList
 from services.pdf_parser import pdf_parser
-from services.storage import storage_service
+from services.storage import storage_service, async_storage, UploadTooLarge, STREAM_CHUNK_SIZE
+from services.blob_store import blob_store
+from services.image_pack import image_pack
+from services.governor import resource_governor, AdmissionRejected
+from services.jobs import job_registry
 from loguru import logger
+import asyncio
 
 router = APIRouter(prefix="/api/projects", tags=["Projects"])
 
 
-@router.post("/upload", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
-async def upload_pdf(
-    file: UploadFile = File(...),
-    source_language: str = Form(default="ko"),
-    target_language: str = Form(default="en"),
-    current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
-):
-    """
-    Upload PDF file and create new project
+async def read_chunks(file: UploadFile):
+    """Yield an upload in STREAM_CHUNK_SIZE pieces"""
+    while chunk := await file.read(STREAM_CHUNK_SIZE):
+        yield chunk
 
-    Steps:
-    1. Validate file (PDF, size limit)
-    2. Upload to S3
-    3. Parse PDF to extract text and tables
-    4. Convert to Markdown
-    5. Create project record
+
+async def ingest_pdf(
+    upload: dict,
+    filename: str,
+    source_language: str,
+    target_language: str,
+    current_user: User,
+    db: AsyncSession
+) -> Project:
     """
-    # Validate file type
-    if not file.filename.lower().endswith('.pdf'):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Only PDF files are allowed"
-        )
+    Create a project from an original PDF already in storage
 
-    # Read file content
-    file_content = await file.read()
-    file_size_mb = len(file_content) / (1024 * 1024)
+    Shared by the direct upload and resumable upload finalize routes.
+    If the project is not created (page limit, parse error, ...), the
+    original and any image pack written for it are deleted.
 
-    # Validate file size
-    if file_size_mb > settings.MAX_FILE_SIZE_MB:
-        raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail=f"File size exceeds {settings.MAX_FILE_SIZE_MB}MB limit"
-        )
+    Args:
+        upload: Dict with path, size and sha256 (from StorageService.save_stream)
+        filename: Original filename
 
-    try:
-        # Upload to S3
-        logger.info(f"Uploading file {file.filename} to S3")
-        file_url = storage_service.upload_file(
-            file_content=file_content,
-            filename=file.filename,
-            content_type="application/pdf",
-            folder=f"users/{current_user.id}/originals"
-        )
+    Returns:
+        New Project with its images saved
+    """
+    file_url = upload["path"]
+    pack_path = None
+    committed = False
 
-        # Parse PDF
-        logger.info(f"Parsing PDF {file.filename}")
-        pdf_document = pdf_parser.parse(file_content, file.filename)
+    try:
+        # Parse PDF by path (off the event loop, within the parse stage budget)
+        logger.info(f"Parsing PDF {filename}")
+        async with resource_governor.admit("parse", upload["size"]):
+            pdf_document = await asyncio.to_thread(
+                pdf_parser.parse, await async_storage.local_path(file_url), filename
+            )
 
         # Validate page count
         if pdf_document.total_pages > settings.MAX_PAGES:
@@ -79,14 +74,56 @@ async def upload_pdf(
             )
 
         # Convert to Markdown (exclude metadata for cleaner translation)
-        logger.info(f"Converting {file.filename} to Markdown")
+        logger.info(f"Converting {filename} to Markdown")
         markdown_content = pdf_parser.to_markdown(pdf_document, include_metadata=False)
 
+        # Store the images first, so the project, its images and the final
+        # Markdown go to the database in one transaction
+        project_id = uuid4()
+        pdf_images = [(page, pdf_image) for page in pdf_document.pages for pdf_image in page.images]
+        image_paths = []
+        if pdf_images:
+            pack_path = image_pack.pack_path(current_user.id, project_id)
+            try:
+                image_paths = await image_pack.write(
+                    db,
+                    pack_path,
+                    [(pdf_image.image_bytes, pdf_image.image_type.lower()) for _, pdf_image in pdf_images]
+                )
+            except Exception as e:
+                # The project is still usable without its images
+                logger.error(f"Failed to save images for project {project_id}: {e}")
+
+        image_rows = [
+            {
+                "project_id": project_id,
+                "page_number": page.page_number,
+                "image_index": pdf_image.image_index,
+                "storage_path": image_path,
+                "position_x": pdf_image.position_x,
+                "position_y": pdf_image.position_y,
+                "width": pdf_image.width,
+                "height": pdf_image.height,
+                "image_type": pdf_image.image_type,
+                "file_size": len(pdf_image.image_bytes),
+            }
+            for (page, pdf_image), image_path in zip(pdf_images, image_paths)
+        ]
+
+        # Replace image placeholders with actual storage paths
+        markdown_content = pdf_parser.replace_image_placeholders(
+            markdown_content,
+            {f"page_{row['page_number']}_img_{row['image_index']}": row["storage_path"] for row in image_rows}
+        )
+
         # Create project record
         new_project = Project(
+            id=project_id,
             user_id=current_user.id,
-            original_filename=file.filename,
+            original_filename=filename,
             original_file_url=file_url,
+            original_sha256=upload["sha256"],
+            file_size_bytes=upload["size"],
             source_language=source_language,
             target_language=target_language,
             page_count=pdf_document.total_pages,
@@ -95,72 +132,27 @@ async def upload_pdf(
             markdown_original=markdown_content
         )
 
+        # Deduplicate the original against identical earlier uploads (committed with the project)
+        stored = await blob_store.adopt(db, file_url, upload["sha256"], upload["size"])
+        if stored["deduplicated"]:
+            logger.info(f"{filename} is identical to an earlier upload; stored as a link")
+
         db.add(new_project)
+        if image_rows:
+            await db.flush()  # Project row first, for the images' foreign key
+            await db.execute(insert(ProjectImage), image_rows)
         await db.commit()
+        committed = True
         await db.refresh(new_project)
 
-        # Save images to storage and database
-        total_images = 0
-        image_mapping = {}  # Map placeholder keys to storage paths
-
-        for page in pdf_document.pages:
-            for pdf_image in page.images:
-                try:
-                    # Generate image filename
-                    image_filename = f"page_{page.page_number}_img_{pdf_image.image_index}.{pdf_image.image_type.lower()}"
-
-                    # Upload image to storage
-                    image_path = storage_service.upload_file(
-                        file_content=pdf_image.image_bytes,
-                        filename=image_filename,
-                        content_type=f"image/{pdf_image.image_type.lower()}",
-                        folder=f"users/{current_user.id}/projects/{new_project.id}/images"
-                    )
-
-                    # Build mapping for placeholder replacement
-                    placeholder_key = f"page_{page.page_number}_img_{pdf_image.image_index}"
-                    image_mapping[placeholder_key] = image_path
-
-                    # Create ProjectImage record
-                    project_image = ProjectImage(
-                        project_id=new_project.id,
-                        page_number=page.page_number,
-                        image_index=pdf_image.image_index,
-                        storage_path=image_path,
-                        position_x=pdf_image.position_x,
-                        position_y=pdf_image.position_y,
-                        width=pdf_image.width,
-                        height=pdf_image.height,
-                        image_type=pdf_image.image_type,
-                        file_size=len(pdf_image.image_bytes)
-                    )
-
-                    db.add(project_image)
-                    total_images += 1
-
-                    logger.debug(f"Saved image: {image_filename} -> {image_path}")
-
-                except Exception as e:
-                    logger.error(f"Failed to save image {pdf_image.image_index} from page {page.page_number}: {e}")
-                    # Continue with other images even if one fails
-                    continue
-
-        if total_images > 0:
-            await db.commit()
-            logger.success(f"Saved {total_images} images for project {new_project.id}")
-
-            # Replace image placeholders with actual storage paths
-            if image_mapping:
-                new_project.markdown_original = pdf_parser.replace_image_placeholders(
-                    new_project.markdown_original,
-                    image_mapping
-                )
-                await db.commit()
-                logger.debug(f"Updated markdown with {len(image_mapping)} image paths")
+        if image_rows:
+            logger.success(f"Saved {len(image_rows)} images for project {new_project.id}")
 
         logger.success(f"Project created: {new_project.id} for user {current_user.id}")
         return new_project
 
+    except (HTTPException, AdmissionRejected):
+        raise
     except ValueError as e:
         logger.error(f"PDF processing failed: {str(e)}")
         raise HTTPException(
@@ -173,6 +165,68 @@ async def upload_pdf(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An unexpected error occurred"
         )
+    finally:
+        if not committed:
+            await discard_ingest(db, [file_url, pack_path])
+
+
+async def discard_ingest(db: AsyncSession, paths: list):
+    """Roll back a failed ingest and delete the files it left in storage"""
+    try:
+        await db.rollback()
+        for path in paths:
+            if path:
+                await async_storage.delete_file(path)
+    except Exception as e:
+        logger.warning(f"Failed to clean up after ingest: {e}")
+
+
+@router.post("/upload", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
+async def upload_pdf(
+    file: UploadFile = File(...),
+    source_language: str = Form(default="ko"),
+    target_language: str = Form(default="en"),
+    current_user: User = Depends(get_rate_limited_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Upload PDF file and create new project
+
+    Steps:
+    1. Validate file (PDF, size limit while streaming to storage)
+    2. Upload to storage
+    3. Parse PDF to extract text and tables
+    4. Convert to Markdown
+    5. Create project record
+    """
+    # Validate file type
+    if not file.filename.lower().endswith('.pdf'):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only PDF files are allowed"
+        )
+
+    # Stream to storage in chunks (size limit enforced and SHA-256 computed on the fly)
+    try:
+        logger.info(f"Uploading file {file.filename} to storage")
+        upload = await async_storage.save_stream(
+            storage_service.unique_path(f"users/{current_user.id}/originals", file.filename),
+            read_chunks(file),
+            max_bytes=settings.MAX_FILE_SIZE_MB * 1024 * 1024
+        )
+    except UploadTooLarge:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File size exceeds {settings.MAX_FILE_SIZE_MB}MB limit"
+        )
+    except ValueError as e:
+        logger.error(f"Upload failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="File upload failed"
+        )
+
+    return await ingest_pdf(upload, file.filename, source_language, target_language, current_user, db)
 
 
 @router.get("/", response_model=ProjectList)
@@ -265,6 +319,9 @@ async def update_project(
     if project_update.status is not None:
         project.status = ProjectStatus(project_update.status)
 
+    if project_update.render_engine is not None:
+        project.render_engine = project_update.render_engine
+
     await db.commit()
     await db.refresh(project)
 
@@ -299,5 +356,8 @@ async def delete_project(
 
     await db.commit()
 
+    # Stop any running translation - nobody will read its result
+    job_registry.cancel(project_id, "Project deleted")
+
     logger.info(f"Project soft deleted: {project_id}")
     return None
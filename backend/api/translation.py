@@ -4,14 +4,22 @@ Translation API Routes - AI translation operations
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.orm import selectinload
 from uuid import UUID
 from typing import Optional
+import asyncio
 
 from core.database import get_db
-from core.dependencies import get_current_active_user
-from models.user import User
-from models.project import Project, ProjectStatus
+from core.dependencies import get_current_active_user, get_rate_limited_user
+from models.user import User, SubscriptionPlan
+from models.project import Project, ProjectStatus, RenderEngine
 from services.translator import translator_service
+from services.pipeline import translation_pipeline, markdown_page_source, pdf_page_source, PipelineResult, RenderFailed
+from services.storage import async_storage
+from services.render_cache import render_cache
+from services.scheduler import translation_scheduler
+from services.governor import resource_governor, AdmissionTicket
+from services.jobs import job_registry, JobCancelled, CancellationToken
 from loguru import logger
 
 router = APIRouter(prefix="/api/translation", tags=["Translation"])
@@ -21,14 +29,19 @@ router = APIRouter(prefix="/api/translation", tags=["Translation"])
 async def translate_project(
     project_id: UUID,
     background_tasks: BackgroundTasks,
-    current_user: User = Depends(get_current_active_user),
+    generate_pdf: bool = False,
+    current_user: User = Depends(get_rate_limited_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Start translation for a project (async background task)
 
     Returns immediately with 202 Accepted
-    Translation runs in background
+    Translation runs in background as a page-streamed pipeline.
+    With generate_pdf=true, pages are also rendered as their translations
+    land and the translated PDF is stored when the last page is done. A
+    failed render keeps the translation: the project still completes, with
+    the render error in error_message.
     """
     # Get project
     result = await db.execute(
@@ -45,8 +58,8 @@ async def translate_project(
             detail="Project not found"
         )
 
-    # Check if markdown is ready
-    if not project.markdown_original:
+    # Check if there is something to translate (parsed Markdown or the original PDF)
+    if not project.markdown_original and not project.original_file_url:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="PDF not yet parsed. Please wait for parsing to complete."
@@ -59,18 +72,41 @@ async def translate_project(
             detail="Translation already in progress"
         )
 
-    # Update status
-    project.status = ProjectStatus.TRANSLATING
-    project.progress_percent = 0
-    await db.commit()
-
-    # Add background task
-    background_tasks.add_task(
-        translate_project_task,
-        project_id=project_id,
-        db=db
+    # Reserve a translation job slot (held by the background task, shed with 429 if saturated)
+    admission_ticket = await resource_governor.acquire(
+        "translate",
+        len((project.markdown_original or "").encode()),
+        wait=False
     )
 
+    cancel_token = None
+    try:
+        # Update status
+        project.status = ProjectStatus.TRANSLATING
+        project.progress_percent = 0
+        project.error_message = None
+        await db.commit()
+
+        # Register before scheduling so the job can be cancelled even before it starts
+        cancel_token = job_registry.register(project_id)
+
+        # Add background task
+        background_tasks.add_task(
+            translate_project_task,
+            project_id=project_id,
+            db=db,
+            generate_pdf=generate_pdf,
+            plan=current_user.subscription_plan,
+            admission_ticket=admission_ticket,
+            cancel_token=cancel_token
+        )
+    except BaseException:
+        # The task never got the ticket (also on cancellation): hand the slot back here
+        if cancel_token:
+            job_registry.unregister(project_id, cancel_token)
+        await admission_ticket.release()
+        raise
+
     logger.info(f"Translation started for project {project_id}")
 
     return {
@@ -80,16 +116,25 @@ async def translate_project(
     }
 
 
-async def translate_project_task(project_id: UUID, db: AsyncSession):
+async def translate_project_task(
+    project_id: UUID,
+    db: AsyncSession,
+    generate_pdf: bool = False,
+    plan: Optional[SubscriptionPlan] = None,
+    admission_ticket: Optional[AdmissionTicket] = None,
+    cancel_token: Optional[CancellationToken] = None
+):
     """
     Background task to translate project
 
     This should ideally run in Celery, but for simplicity using BackgroundTasks
     """
     try:
-        # Get project
+        # Get project with images (needed for rendering and PDF re-parsing)
         result = await db.execute(
-            select(Project).where(Project.id == project_id)
+            select(Project)
+            .options(selectinload(Project.images))
+            .where(Project.id == project_id)
         )
         project = result.scalar_one_or_none()
 
@@ -99,28 +144,111 @@ async def translate_project_task(project_id: UUID, db: AsyncSession):
 
         logger.info(f"Starting translation for project {project_id}")
 
-        # Translate markdown
-        translated_markdown = translator_service.translate_markdown(
-            markdown=project.markdown_original,
-            source_lang=project.source_language,
-            target_lang=project.target_language,
-            chunk_size=2000
-        )
+        # Stream pages from parsed Markdown, or parse the original PDF on the fly
+        if project.markdown_original:
+            source = markdown_page_source(project.markdown_original)
+        else:
+            original_path = await async_storage.local_path(project.original_file_url)
+            image_mapping = {
+                f"page_{img.page_number}_img_{img.image_index}": img.storage_path
+                for img in project.images
+            }
+            source = pdf_page_source(original_path, image_mapping)
+
+        async def report_progress(page, pages_done: int):
+            """Persist per-page progress so clients see pages landing"""
+            if project.page_count:
+                project.progress_percent = min(99, pages_done * 100 // project.page_count)
+                await db.commit()
+
+        async def save_translation(result: PipelineResult):
+            """Commit the translation before rendering, so a failed render keeps it"""
+            if not project.markdown_original:
+                project.markdown_original = result.markdown_original
+            project.markdown_translated = result.markdown_translated
+            await db.commit()
+
+        pdf_filename = project.original_filename.replace('.pdf', '_translated.pdf')
+        render_engine = project.render_engine or RenderEngine.HTML.value
+        overlay = generate_pdf and render_engine == RenderEngine.OVERLAY.value and bool(project.original_file_url)
+
+        previous_path = project.pdf_translated_url
+
+        try:
+            # Parse, translate and render run as overlapping stages
+            # (the overlay engine needs the whole translation, so it renders afterwards)
+            pipeline_result = await translation_pipeline.run(
+                source=source,
+                source_lang=project.source_language,
+                target_lang=project.target_language,
+                render=generate_pdf and not overlay,
+                title=pdf_filename,
+                project_images=project.images,
+                on_page_translated=report_progress,
+                on_translated=save_translation,
+                user_id=project.user_id,
+                plan=plan,
+                cancel_token=cancel_token,
+                project_id=project.id
+            )
+
+            if overlay:
+                if cancel_token:
+                    cancel_token.raise_if_cancelled()
+                cache_key = render_cache.key(
+                    markdown_content=project.markdown_translated,
+                    project_images=project.images,
+                    title=pdf_filename,
+                    language=project.target_language,
+                    engine=render_engine,
+                    original_path=project.original_file_url
+                )
+                try:
+                    project.pdf_translated_url = await render_cache.render_document(
+                        user_id=project.user_id,
+                        project_id=project.id,
+                        cache_key=cache_key,
+                        markdown_content=project.markdown_translated,
+                        language=project.target_language,
+                        engine=render_engine,
+                        original_path=project.original_file_url
+                    )
+                except JobCancelled:
+                    raise
+                except Exception as e:
+                    raise RenderFailed(str(e)) from e
+
+            elif pipeline_result.pdf_path:
+                # Pipeline stored the render under its cache key
+                project.pdf_translated_url = pipeline_result.pdf_path
+
+        except RenderFailed as e:
+            # The translation is already committed: keep it, report the render
+            logger.error(f"PDF generation failed for project {project_id}: {str(e)}")
+            project.error_message = f"PDF generation failed: {str(e)}"
 
-        # Update project
-        project.markdown_translated = translated_markdown
         project.status = ProjectStatus.COMPLETED
         project.progress_percent = 100
 
         await db.commit()
 
+        if project.pdf_translated_url and project.pdf_translated_url != previous_path:
+            await render_cache.evict_superseded(
+                db, project.user_id, project.id, project.pdf_translated_url, previous_path
+            )
+
         logger.success(f"Translation completed for project {project_id}")
 
     except Exception as e:
-        logger.error(f"Translation failed for project {project_id}: {str(e)}")
+        cancelled = isinstance(e, JobCancelled)
+        if cancelled:
+            logger.info(f"Translation cancelled for project {project_id}: {str(e)}")
+        else:
+            logger.error(f"Translation failed for project {project_id}: {str(e)}")
 
         # Update project status to failed
         try:
+            await db.rollback()
             result = await db.execute(
                 select(Project).where(Project.id == project_id)
             )
@@ -129,11 +257,65 @@ async def translate_project_task(project_id: UUID, db: AsyncSession):
             if project:
                 project.status = ProjectStatus.FAILED
                 project.progress_percent = 0
+                project.error_message = f"Translation cancelled: {str(e)}" if cancelled else str(e)
                 await db.commit()
 
         except Exception as db_error:
             logger.error(f"Failed to update project status: {str(db_error)}")
 
+    finally:
+        if cancel_token:
+            job_registry.unregister(project_id, cancel_token)
+        if admission_ticket:
+            await admission_ticket.release()
+
+
+@router.post("/projects/{project_id}/cancel", status_code=status.HTTP_202_ACCEPTED)
+async def cancel_translation(
+    project_id: UUID,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Cancel a running translation
+
+    The job stops before its next provider call; an in-flight call is
+    abandoned and its result discarded.
+    """
+    result = await db.execute(
+        select(Project)
+        .where(Project.id == project_id)
+        .where(Project.user_id == current_user.id)
+        .where(Project.deleted_at.is_(None))
+    )
+    project = result.scalar_one_or_none()
+
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+
+    if not job_registry.cancel(project_id, "Cancelled by user"):
+        if project.status != ProjectStatus.TRANSLATING:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="No translation in progress"
+            )
+
+        # Status says translating but no job is running (e.g. server restarted)
+        project.status = ProjectStatus.FAILED
+        project.progress_percent = 0
+        project.error_message = "Translation cancelled: job was no longer running"
+        await db.commit()
+
+    logger.info(f"Translation cancellation requested for project {project_id}")
+
+    return {
+        "message": "Translation cancellation requested",
+        "project_id": str(project_id)
+    }
+
 
 @router.get("/projects/{project_id}/status")
 async def get_translation_status(
@@ -160,6 +342,7 @@ async def get_translation_status(
         "project_id": str(project.id),
         "status": project.status,
         "progress_percent": project.progress_percent,
+        "error_message": project.error_message,
         "has_translated_content": bool(project.markdown_translated)
     }
 
@@ -183,11 +366,13 @@ async def translate_text(
         )
 
     try:
-        translated = translator_service.translate_text(
-            text=text,
-            source_lang=source_lang,
-            target_lang=target_lang
-        )
+        async with translation_scheduler.slot(current_user.id, current_user.subscription_plan):
+            translated = await asyncio.to_thread(
+                translator_service.translate_text,
+                text=text,
+                source_lang=source_lang,
+                target_lang=target_lang
+            )
 
         return {
             "original": text,
@@ -202,3 +387,11 @@ async def translate_text(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Translation failed: {str(e)}"
         )
+
+
+@router.get("/scheduler/stats")
+async def get_scheduler_stats(
+    current_user: User = Depends(get_current_active_user)
+):
+    """Queue depth, in-flight calls and wait times per subscription lane"""
+    return translation_scheduler.stats()
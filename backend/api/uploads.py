@@ -0,0 +1,206 @@
+"""
+Upload API Routes - Resumable (tus-style) PDF uploads
+
+Flow:
+    POST   /api/uploads                    declare filename, length, sha256 → upload id
+    PATCH  /api/uploads/{id}               append a chunk (Upload-Offset header, raw body)
+    HEAD   /api/uploads/{id}               current Upload-Offset after a disconnect
+    POST   /api/uploads/{id}/finalize      verify and create the project
+    DELETE /api/uploads/{id}               abort
+"""
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import ClientDisconnect
+from loguru import logger
+
+from core.database import get_db
+from core.dependencies import get_current_active_user, get_rate_limited_user
+from core.config import settings
+from models.user import User
+from schemas.project import ProjectResponse
+from schemas.upload import UploadCreate, UploadStatus
+from services.resumable_uploads import resumable_uploads, UploadBusy, UploadChecksumMismatch, UploadOffsetMismatch
+from services.storage import UploadTooLarge
+from api.projects import ingest_pdf
+
+router = APIRouter(prefix="/api/uploads", tags=["Uploads"])
+
+CHUNK_CONTENT_TYPE = "application/offset+octet-stream"
+
+
+def offset_headers(upload: dict) -> dict:
+    return {
+        "Upload-Offset": str(upload["offset"]),
+        "Upload-Length": str(upload["length"]),
+        "Cache-Control": "no-store",
+    }
+
+
+async def get_upload(current_user: User, upload_id: str) -> dict:
+    """Load an upload owned by the current user, or 404"""
+    try:
+        return await resumable_uploads.status(current_user.id, upload_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload not found"
+        )
+
+
+@router.post("", response_model=UploadStatus, status_code=status.HTTP_201_CREATED)
+async def create_upload(
+    upload_data: UploadCreate,
+    current_user: User = Depends(get_rate_limited_user)
+):
+    """Start a resumable upload; send the bytes with PATCH, then finalize"""
+    if not upload_data.filename.lower().endswith('.pdf'):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only PDF files are allowed"
+        )
+
+    if upload_data.length > settings.MAX_FILE_SIZE_MB * 1024 * 1024:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File size exceeds {settings.MAX_FILE_SIZE_MB}MB limit"
+        )
+
+    upload = await resumable_uploads.create(
+        current_user.id,
+        filename=upload_data.filename,
+        length=upload_data.length,
+        sha256=upload_data.sha256,
+        source_language=upload_data.source_language,
+        target_language=upload_data.target_language
+    )
+
+    return JSONResponse(
+        status_code=status.HTTP_201_CREATED,
+        content=UploadStatus(**upload).model_dump(mode="json"),
+        headers={**offset_headers(upload), "Location": f"{router.prefix}/{upload['id']}"}
+    )
+
+
+@router.api_route("/{upload_id}", methods=["GET", "HEAD"], response_model=UploadStatus)
+async def get_upload_status(
+    upload_id: str,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Current offset of an upload (resume from here after a disconnect)"""
+    upload = await get_upload(current_user, upload_id)
+
+    return JSONResponse(
+        content=UploadStatus(**upload).model_dump(mode="json"),
+        headers=offset_headers(upload)
+    )
+
+
+@router.patch("/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def upload_chunk(
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(..., alias="Upload-Offset", ge=0),
+    content_type: str = Header(..., alias="Content-Type"),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Append the request body at Upload-Offset
+
+    The body is streamed to disk, so a chunk may be any size; whatever
+    arrived before a disconnect is kept and reported by HEAD.
+    """
+    if content_type.split(";")[0].strip() != CHUNK_CONTENT_TYPE:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Chunks must be sent as {CHUNK_CONTENT_TYPE}"
+        )
+
+    upload = await get_upload(current_user, upload_id)
+
+    try:
+        upload["offset"] = await resumable_uploads.append(
+            current_user.id, upload_id, upload_offset, request.stream()
+        )
+
+    except UploadBusy as e:
+        raise HTTPException(
+            status_code=status.HTTP_423_LOCKED,
+            detail=str(e)
+        )
+    except UploadOffsetMismatch as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e),
+            headers={"Upload-Offset": str(e.offset)}
+        )
+    except UploadTooLarge:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="Chunk exceeds the declared upload length"
+        )
+    except ClientDisconnect:
+        logger.info(f"Client disconnected during upload {upload_id}; it can resume")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Upload interrupted"
+        )
+
+    return Response(status_code=status.HTTP_204_NO_CONTENT, headers=offset_headers(upload))
+
+
+@router.post("/{upload_id}/finalize", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
+async def finalize_upload(
+    upload_id: str,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Verify the complete upload (length and SHA-256) and create the project from it"""
+    await get_upload(current_user, upload_id)
+
+    try:
+        upload = await resumable_uploads.finalize(
+            current_user.id, upload_id, target_folder=f"users/{current_user.id}/originals"
+        )
+
+    except UploadBusy as e:
+        raise HTTPException(
+            status_code=status.HTTP_423_LOCKED,
+            detail=str(e)
+        )
+    except UploadChecksumMismatch as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"{str(e)}; start a new upload"
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+
+    return await ingest_pdf(
+        upload,
+        upload["filename"],
+        upload["source_language"],
+        upload["target_language"],
+        current_user,
+        db
+    )
+
+
+@router.delete("/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def abort_upload(
+    upload_id: str,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Abort an upload and delete the bytes received so far"""
+    await get_upload(current_user, upload_id)
+
+    try:
+        await resumable_uploads.abort(current_user.id, upload_id)
+    except UploadBusy as e:
+        raise HTTPException(
+            status_code=status.HTTP_423_LOCKED,
+            detail=str(e)
+        )
@@ -0,0 +1,3 @@
+"""
+Benchmarks - Standalone performance scripts (run from backend/ with python -m)
+"""
@@ -0,0 +1,259 @@
+"""
+Generator benchmark - per-stage timings, peak memory and output size of PDF generation
+
+Runs PDFGeneratorService's HTML path stage by stage over synthetic translated
+Markdown fixtures and emits JSON that can be diffed between commits.
+
+Stages:
+    split       split_pages (# Page N markers + image lookup)
+    markdown    Markdown → HTML per page (RenderContext converter)
+    images      <img> rewriting (_apply_image_positions_for_page)
+    document    HTML document + stylesheets
+    fetch       url_fetcher time inside layout (storage reads, cold downsampling)
+    layout      WeasyPrint layout, excluding fetch
+    write       PDF serialization to a file
+    optimize    pdf_optimizer pass (garbage collection, stream dedup, deflate)
+
+Storage is pointed at a temporary directory for the run, so fixture images
+and their derivatives never touch the real volume and every run starts cold.
+
+Usage (from backend/):
+    python -m benchmarks.generator --output before.json
+    python -m benchmarks.generator --output after.json --compare before.json
+    python -m benchmarks.generator --fixtures text,table --languages en --pages 10
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from io import BytesIO
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import fitz  # PyMuPDF
+from PIL import Image
+from weasyprint import HTML
+
+from services.image_derivatives import image_derivatives
+from services.pdf_generator import ImageLayout, pdf_generator
+from services.pdf_optimizer import pdf_optimizer
+from services.storage import storage_service
+
+
+FIXTURE_KINDS = ("text", "table", "image")
+LANGUAGES = ("en", "ko")
+PAGE_COUNTS = (10, 50, 200)
+
+# Storage folder for fixture images
+FIXTURE_FOLDER = "benchmarks/fixtures"
+
+SENTENCES = {
+    "en": [
+        "The quarterly report summarizes revenue, costs and the outlook for the next period.",
+        "Each section links back to the original source so reviewers can check the translation.",
+        "Operational metrics improved after the scheduling changes were rolled out.",
+        "Further details are listed in the appendix together with the methodology.",
+    ],
+    "ko": [
+        "분기 보고서는 매출, 비용 및 다음 기간의 전망을 요약합니다.",
+        "각 섹션은 검토자가 번역을 확인할 수 있도록 원문과 연결됩니다.",
+        "일정 변경이 적용된 후 운영 지표가 개선되었습니다.",
+        "자세한 내용은 방법론과 함께 부록에 나와 있습니다.",
+    ],
+}
+
+
+def build_fixture(kind: str, language: str, page_count: int, rng: random.Random) -> Tuple[str, List[ImageLayout]]:
+    """Synthetic translated Markdown (with # Page N markers) and its image layouts"""
+    sentences = SENTENCES[language]
+    parts, images = [], []
+
+    for page_number in range(1, page_count + 1):
+        parts.append(f"# Page {page_number}\n\n## {sentences[0][:24]} {page_number}\n")
+
+        paragraphs = 6 if kind == "text" else 2
+        for _ in range(paragraphs):
+            parts.append(" ".join(rng.choice(sentences) for _ in range(5)) + "\n")
+
+        if kind == "table":
+            parts.append("| # | " + " | ".join(f"Col {c}" for c in range(1, 6)) + " |")
+            parts.append("| --- " * 6 + "|")
+            for row in range(1, 16):
+                parts.append(f"| {row} | " + " | ".join(str(rng.randint(0, 99999)) for _ in range(5)) + " |")
+            parts.append("")
+
+        if kind == "image":
+            for image_index in range(2):
+                # Per-case folder, so no case reuses another's derivatives
+                image_path = f"{FIXTURE_FOLDER}/{language}-{page_count}/page_{page_number}_img_{image_index}.jpg"
+                images.append(ImageLayout(page_number, image_path, width=320, height=240))
+                parts.append(f"![Image {image_index + 1}]({image_path})\n")
+
+        parts.append("\n---\n")
+
+    return "\n".join(parts), images
+
+
+def write_fixture_images(images: List[ImageLayout], rng: random.Random):
+    """Store camera-sized noise JPEGs for the image fixture"""
+    for image in images:
+        buffer = BytesIO()
+        Image.effect_noise((2400, 1800), rng.randint(20, 80)).convert("RGB").save(buffer, "JPEG", quality=90)
+        storage_service.save_file(image.storage_path, buffer.getvalue())
+
+
+def measure(fn: Callable):
+    """Run fn, returning (result, seconds, peak traced bytes)"""
+    tracemalloc.reset_peak()
+    started = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    return result, seconds, peak
+
+
+def run_case(markdown_content: str, images: List[ImageLayout], title: str, language: str) -> dict:
+    """Run every generator stage once and collect timings, memory and size"""
+    stages: Dict[str, dict] = {}
+
+    def record(name: str, fn: Callable):
+        result, seconds, peak = measure(fn)
+        stages[name] = {"seconds": round(seconds, 4), "peak_mb": round(peak / (1024 * 1024), 2)}
+        return result
+
+    pages = record("split", lambda: pdf_generator.split_pages(markdown_content, images))
+    converted = record("markdown", lambda: [pdf_generator.context.markdown_to_html(page['content']) for page in pages])
+    body_html = record("images", lambda: "".join(
+        pdf_generator._apply_image_positions_for_page(content_html, page['images'])
+        for content_html, page in zip(converted, pages)
+    ))
+    html_content, stylesheets = record("document", lambda: (
+        pdf_generator._build_html_document(body_html, title, language),
+        pdf_generator.context.stylesheets(title)
+    ))
+
+    # Time the url_fetcher separately from the layout that calls it
+    fetch_seconds = 0.0
+    storage_fetcher = pdf_generator._make_url_fetcher(storage_service)
+
+    def timed_fetcher(url, *args, **kwargs):
+        nonlocal fetch_seconds
+        started = time.perf_counter()
+        try:
+            return storage_fetcher(url, *args, **kwargs)
+        finally:
+            fetch_seconds += time.perf_counter() - started
+
+    document = record("layout", lambda: HTML(string=html_content, url_fetcher=timed_fetcher).render(
+        stylesheets=stylesheets, font_config=pdf_generator.font_config
+    ))
+    stages["layout"]["seconds"] = round(stages["layout"]["seconds"] - fetch_seconds, 4)
+    stages["fetch"] = {"seconds": round(fetch_seconds, 4), "peak_mb": None}
+
+    with tempfile.NamedTemporaryFile(suffix=".pdf") as output, tempfile.NamedTemporaryFile(suffix=".pdf") as optimized:
+        record("write", lambda: document.write_pdf(output))
+        output.flush()
+        output_bytes = output.tell()
+
+        def optimize():
+            with fitz.open(output.name) as written:
+                pdf_optimizer.save(written, optimized, before_bytes=output_bytes)
+
+        record("optimize", optimize)
+        optimized_bytes = os.path.getsize(optimized.name)
+
+    return {
+        "stages": stages,
+        "total_seconds": round(sum(stage["seconds"] for stage in stages.values()), 4),
+        "peak_mb": max(stage["peak_mb"] or 0 for stage in stages.values()),
+        "output_bytes": output_bytes,
+        "optimized_bytes": optimized_bytes,
+        "pages_per_second": round(len(pages) / max(sum(stage["seconds"] for stage in stages.values()), 1e-9), 2),
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(current: dict, baseline: dict):
+    """Print total-time and output-size deltas against a previous run"""
+    previous = {case["name"]: case for case in baseline["cases"]}
+    print(f"\nvs {baseline.get('revision', '?')}:")
+    for case in current["cases"]:
+        before = previous.get(case["name"])
+        if not before:
+            continue
+        time_delta = (case["total_seconds"] - before["total_seconds"]) / max(before["total_seconds"], 1e-9)
+        # Runs from before the optimize stage only have output_bytes
+        before_bytes = before.get("optimized_bytes", before["output_bytes"])
+        size_delta = (case["optimized_bytes"] - before_bytes) / max(before_bytes, 1)
+        print(f"  {case['name']:<16} time {time_delta:+7.1%}   size {size_delta:+7.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--fixtures", default=",".join(FIXTURE_KINDS))
+    parser.add_argument("--languages", default=",".join(LANGUAGES))
+    parser.add_argument("--pages", default=",".join(str(count) for count in PAGE_COUNTS))
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Previous JSON results to diff against")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    storage_service.unwrap().base_path = Path(tempfile.mkdtemp(prefix="generator-benchmark-"))
+    tracemalloc.start()
+    pdf_generator.warm_up()
+
+    results = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "image_dpi": image_derivatives.dpi,
+        "cases": [],
+    }
+
+    try:
+        for kind in args.fixtures.split(","):
+            for language in args.languages.split(","):
+                for page_count in (int(count) for count in args.pages.split(",")):
+                    markdown_content, images = build_fixture(kind, language, page_count, rng)
+                    write_fixture_images(images, rng)
+
+                    case = run_case(markdown_content, images, f"Benchmark {kind}", language)
+                    case["name"] = f"{kind}-{language}-{page_count}"
+                    results["cases"].append(case)
+
+                    slowest = max(case["stages"], key=lambda name: case["stages"][name]["seconds"])
+                    print(
+                        f"{case['name']:<16} {case['total_seconds']:8.3f}s  {case['pages_per_second']:7.1f} pages/s  "
+                        f"peak {case['peak_mb']:7.1f} MB  {case['output_bytes'] / 1024:9.1f} → {case['optimized_bytes'] / 1024:.1f} KB  "
+                        f"(slowest: {slowest})"
+                    )
+    finally:
+        shutil.rmtree(storage_service.unwrap().base_path, ignore_errors=True)
+
+    results["max_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
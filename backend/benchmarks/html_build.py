@@ -0,0 +1,92 @@
+"""
+HTML build micro-benchmark - fresh Markdown converter per page vs RenderContext
+
+Measures only the Markdown → HTML document step (no WeasyPrint layout), plus
+the one-off cost of parsing the stylesheet that RenderContext now pays once
+per worker instead of once per document.
+
+Usage (from backend/):
+    python -m benchmarks.html_build --pages 200 --repeat 5
+"""
+import argparse
+import statistics
+import time
+
+import markdown
+from weasyprint import CSS
+
+from services.pdf_generator import BASE_STYLESHEET, MARKDOWN_EXTENSIONS, pdf_generator
+
+
+PAGE_BODY = """
+## Section {n}
+
+Translated paragraph with **bold**, *italic* and `code` spans, long enough to
+wrap over several lines in the rendered document.
+
+- First point on page {n}
+- Second point with a [link](https://example.com)
+
+| Column A | Column B |
+| --- | --- |
+| {n} | value |
+
+```python
+print("page {n}")
+```
+"""
+
+
+def build_markdown(page_count: int) -> str:
+    return "".join(f"# Page {n}\n{PAGE_BODY.format(n=n)}\n" for n in range(1, page_count + 1))
+
+
+def build_fresh(markdown_content: str) -> str:
+    """Previous behaviour: new converter (extensions reloaded) for every page"""
+    pages = pdf_generator.split_pages(markdown_content)
+    body = "".join(
+        markdown.Markdown(extensions=MARKDOWN_EXTENSIONS).convert(page['content']) for page in pages
+    )
+    return pdf_generator._build_html_document(body, "benchmark", "en")
+
+
+def build_reused(markdown_content: str) -> str:
+    """Current behaviour: per-worker converter, reset() between pages"""
+    pages = pdf_generator.split_pages(markdown_content)
+    body = "".join(pdf_generator.context.markdown_to_html(page['content']) for page in pages)
+    return pdf_generator._build_html_document(body, "benchmark", "en")
+
+
+def median_seconds(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    markdown_content = build_markdown(args.pages)
+    if build_fresh(markdown_content) != build_reused(markdown_content):
+        raise SystemExit("Reused converter produced different HTML")
+
+    fresh = median_seconds(lambda: build_fresh(markdown_content), args.repeat)
+    reused = median_seconds(lambda: build_reused(markdown_content), args.repeat)
+    stylesheet = median_seconds(lambda: CSS(string=BASE_STYLESHEET), args.repeat)
+    cached_stylesheet = median_seconds(lambda: pdf_generator.context.stylesheets("benchmark"), args.repeat)
+
+    print(f"{args.pages}-page document, median of {args.repeat} runs")
+    print(f"  HTML build, fresh converter per page  {fresh * 1000:8.1f} ms")
+    print(f"  HTML build, reused converter          {reused * 1000:8.1f} ms  ({fresh / reused:.1f}x)")
+    print(f"  Stylesheet parse per document         {stylesheet * 1000:8.1f} ms")
+    print(f"  Stylesheet from RenderContext         {cached_stylesheet * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Render engine benchmark - WeasyPrint (HTML) vs PyMuPDF overlay, in pages/sec
+
+Usage (from backend/):
+    python -m benchmarks.render_engines --pages 50 --repeat 3
+"""
+import argparse
+import statistics
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+
+from services.pdf_generator import pdf_generator
+from services.pdf_overlay import pdf_overlay
+from services.pdf_parser import pdf_parser
+
+
+PARAGRAPH = (
+    "Translation quality depends on context. Each paragraph on this page is a "
+    "separate text block, so the overlay engine has several boxes to fill."
+)
+
+
+def build_original(page_count: int, blocks_per_page: int = 6) -> bytes:
+    """Synthetic source PDF: A4 pages with a heading and wrapped text blocks"""
+    doc = fitz.open()
+    for page_number in range(1, page_count + 1):
+        page = doc.new_page(width=595, height=842)
+        page.insert_textbox(fitz.Rect(72, 60, 523, 100), f"Chapter {page_number}", fontsize=20)
+        for block in range(blocks_per_page):
+            top = 120 + block * 110
+            page.insert_textbox(fitz.Rect(72, top, 523, top + 90), PARAGRAPH, fontsize=11)
+    pdf_bytes = doc.tobytes()
+    doc.close()
+    return pdf_bytes
+
+
+def fake_translate(markdown_content: str) -> str:
+    """Stand-in for the provider: same line structure, ~15% longer text"""
+    lines = []
+    for line in markdown_content.splitlines():
+        if line.strip() and not line.startswith(("# Page", "![", "|", "---")):
+            line = f"{line} {line[:len(line) // 6]}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def time_engine(render, repeat: int) -> float:
+    """Median wall time of render() over repeat runs (after one warm-up run)"""
+    render()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        render()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def render_html(markdown_translated: str, language: str):
+    """HTML engine run, streamed into a throwaway file like a real render"""
+    with tempfile.TemporaryFile() as output:
+        pdf_generator.markdown_to_pdf(markdown_translated, output, title="benchmark", language=language)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--language", default="en")
+    args = parser.parse_args()
+
+    original = build_original(args.pages)
+    markdown_original = "\n".join(
+        pdf_parser.page_to_markdown(page, include_images=False)
+        for page in pdf_parser.iter_pages(original)
+    )
+    markdown_translated = fake_translate(markdown_original)
+
+    engines = {
+        "html": lambda: render_html(markdown_translated, args.language),
+        "overlay": lambda: pdf_overlay.render(original, markdown_translated, language=args.language),
+    }
+
+    print(f"{args.pages} pages, median of {args.repeat} runs")
+    results = {}
+    for name, render in engines.items():
+        seconds = time_engine(render, args.repeat)
+        results[name] = args.pages / seconds
+        print(f"  {name:<8} {seconds:8.3f}s  {results[name]:8.1f} pages/sec")
+
+    print(f"  overlay speedup: {results['overlay'] / results['html']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
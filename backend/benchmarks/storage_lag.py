@@ -0,0 +1,148 @@
+"""
+Storage lag benchmark - event-loop lag under concurrent file downloads
+
+Runs the same burst of concurrent downloads twice, once calling the
+blocking StorageService directly from coroutines (the old route handlers)
+and once through AsyncStorage, while a ticker coroutine measures how late
+the event loop wakes it. Low lag means other requests keep being served
+while files are read.
+
+A per-read latency can be added to simulate a slow (network) volume.
+
+Usage (from backend/):
+    python -m benchmarks.storage_lag
+    python -m benchmarks.storage_lag --files 32 --size-mb 8 --concurrency 64 --latency-ms 20
+    python -m benchmarks.storage_lag --output lag.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from loguru import logger
+
+from services.storage import AsyncStorage, StorageService
+
+
+BENCHMARK_FOLDER = "benchmarks/storage"
+
+# Ticker wake-up interval
+TICK_SECONDS = 0.005
+
+
+def write_files(storage: StorageService, count: int, size_mb: float) -> List[str]:
+    """Create count files of random content in the temporary storage"""
+    size = int(size_mb * 1024 * 1024)
+    return [
+        storage.save_file(f"{BENCHMARK_FOLDER}/file_{index}.bin", os.urandom(size))
+        for index in range(count)
+    ]
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def run_case(download: Callable, paths: List[str], concurrency: int) -> dict:
+    """Download concurrency files (round-robin over paths) while sampling loop lag"""
+    lags = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            expected = time.perf_counter() + TICK_SECONDS
+            await asyncio.sleep(TICK_SECONDS)
+            lags.append(max(0.0, time.perf_counter() - expected))
+
+    async def fetch(index: int) -> int:
+        return len(await download(paths[index % len(paths)]))
+
+    ticker_task = asyncio.create_task(ticker())
+    await asyncio.sleep(TICK_SECONDS * 2)  # Let the ticker take its first samples
+
+    start = time.perf_counter()
+    sizes = await asyncio.gather(*[fetch(index) for index in range(concurrency)])
+    seconds = time.perf_counter() - start
+
+    done.set()
+    await ticker_task
+
+    lags_ms = [lag * 1000 for lag in lags] or [0.0]
+    return {
+        "seconds": round(seconds, 3),
+        "mb_per_second": round(sum(sizes) / 1024 / 1024 / max(seconds, 1e-9), 1),
+        "lag_p50_ms": round(statistics.median(lags_ms), 2),
+        "lag_p99_ms": round(percentile(lags_ms, 0.99), 2),
+        "lag_max_ms": round(max(lags_ms), 2),
+        "samples": len(lags),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=16)
+    parser.add_argument("--size-mb", type=float, default=4)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency-ms", type=float, default=0, help="Simulated per-read volume latency")
+    parser.add_argument("--threads", type=int, help="AsyncStorage pool size (default STORAGE_IO_THREADS)")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    logger.remove()  # Per-file download logs would dominate the measured loop time
+    logger.add(sys.stderr, level="WARNING")
+
+    # Uncached filesystem backend, so every download really reads the volume
+    storage = StorageService()
+    storage.base_path = Path(tempfile.mkdtemp(prefix="storage-benchmark-"))
+    download_file = storage.download_file
+
+    def slow_download(file_path: str) -> bytes:
+        time.sleep(args.latency_ms / 1000)
+        return download_file(file_path)
+
+    storage.download_file = slow_download
+    async_storage = AsyncStorage(storage, max_workers=args.threads)
+
+    async def blocking(file_path: str) -> bytes:
+        return storage.download_file(file_path)
+
+    results = {
+        "files": args.files,
+        "size_mb": args.size_mb,
+        "concurrency": args.concurrency,
+        "latency_ms": args.latency_ms,
+        "threads": async_storage.max_workers,
+        "cases": {},
+    }
+
+    try:
+        paths = write_files(storage, args.files, args.size_mb)
+
+        for name, download in (("blocking", blocking), ("async", async_storage.download_file)):
+            case = asyncio.run(run_case(download, paths, args.concurrency))
+            results["cases"][name] = case
+            print(
+                f"{name:<9} {case['seconds']:7.3f}s  {case['mb_per_second']:8.1f} MB/s  "
+                f"lag p50 {case['lag_p50_ms']:7.2f} ms  p99 {case['lag_p99_ms']:7.2f} ms  "
+                f"max {case['lag_max_ms']:7.2f} ms"
+            )
+    finally:
+        async_storage.shutdown()
+        shutil.rmtree(storage.base_path, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
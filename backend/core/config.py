@@ -21,10 +21,18 @@ class Settings(BaseSettings):
     REDIS_URL: Optional[str] = None
     
     # Storage (Railway Volume or AWS S3)
+    STORAGE_BACKEND: str = "local"  # local or s3
     AWS_ACCESS_KEY_ID: str = ""
     AWS_SECRET_ACCESS_KEY: str = ""
     AWS_REGION: str = "ap-northeast-2"
     S3_BUCKET_NAME: str = ""
+    S3_ENDPOINT_URL: Optional[str] = None  # MinIO or another S3-compatible server (unset for AWS)
+    S3_MAX_POOL_CONNECTIONS: int = 32  # Shared HTTP connection pool of the S3 client
+    S3_MULTIPART_THRESHOLD_MB: int = 16  # Larger uploads/downloads are split into parts
+    S3_MULTIPART_CHUNK_MB: int = 8
+    S3_MULTIPART_CONCURRENCY: int = 8  # Parts transferred in parallel per file
+    S3_SCRATCH_DIR: str = ""  # Node-local temp files and parser copies (default: system temp)
+    S3_SCRATCH_MAX_MB: int = 2048  # local_path copies of objects kept per node (LRU)
     
     # AI APIs
     OPENAI_API_KEY: Optional[str] = None
@@ -49,11 +57,43 @@ class Settings(BaseSettings):
     ALLOWED_ORIGINS: str = "http://localhost:3000,http://localhost:5173"
     
     # Rate Limiting
-    RATE_LIMIT_PER_HOUR: int = 100
+    RATE_LIMIT_PER_HOUR: int = 100  # Expensive requests (upload/translate/generate) per user
+
+    # Admission Control (per-stage concurrency and memory budgets)
+    PARSE_MAX_CONCURRENCY: int = 2
+    PARSE_MEMORY_BUDGET_MB: int = 512
+    TRANSLATE_MAX_JOBS: int = 8
+    TRANSLATE_MEMORY_BUDGET_MB: int = 256
+    RENDER_MAX_CONCURRENCY: int = 2
+    RENDER_MEMORY_BUDGET_MB: int = 768
+    ADMISSION_MAX_WAIT_SECONDS: float = 10.0  # Queue this long before shedding with 429
+    ADMISSION_MAX_QUEUE: int = 16  # Waiters per stage before shedding immediately
+
+    # PDF Rendering (process pool)
+    RENDER_WORKERS: int = 2
+    RENDER_TIMEOUT_SECONDS: float = 120.0
+    RENDER_WORKER_MEMORY_MB: int = 1536  # Address-space cap per worker (0 = unlimited)
+    IMAGE_RENDER_DPI: int = 150  # Downsample embedded images to this resolution (0 = keep originals)
+    IMAGE_JPEG_QUALITY: int = 85
+    STORAGE_IO_THREADS: int = 16  # Max concurrent blocking storage operations from the event loop
+    READ_CACHE_MAX_MB: int = 128  # In-memory LRU of hot images and PDFs per process (0 = off)
+    PREVIEW_CACHE_MAX_MB: int = 512  # Page preview rasters kept on the storage volume (LRU)
+    PDF_OPTIMIZE: bool = True  # Garbage-collect and dedup rendered PDFs before storing them
+    PDF_OPTIMIZE_GARBAGE: int = 4  # PyMuPDF garbage level (4 = also merge identical images/fonts)
     
     # File Upload
     MAX_FILE_SIZE_MB: int = 50
     MAX_PAGES: int = 200
+    RESUMABLE_UPLOAD_EXPIRY_HOURS: int = 24  # Idle partial uploads are deleted after this
+    RESUMABLE_UPLOAD_CLEANUP_MINUTES: int = 30
+    DELETED_PROJECT_RETENTION_DAYS: int = 30  # Soft-deleted projects and their files are purged after this
+    STORAGE_GC_INTERVAL_MINUTES: int = 60  # Sweep for deleted projects and orphaned blobs (0 = off)
+    STORAGE_GC_BATCH_SIZE: int = 50  # Projects / blob files per batch
+    STORAGE_GC_BATCH_PAUSE_SECONDS: float = 1.0  # Pause between batches, leaving room for live traffic
+
+    # Translation Pipeline
+    PIPELINE_QUEUE_SIZE: int = 8  # Max pages buffered between pipeline stages
+    TRANSLATION_MAX_CONCURRENCY: int = 4  # Provider calls in flight across all users
     
     class Config:
         # .env file is optional - prioritize system environment variables
@@ -13,6 +13,7 @@ from .database import get_db
 from .security import decode_token
 from .config import settings
 from models.user import User, SubscriptionPlan
+from services.governor import resource_governor
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
 
@@ -108,6 +109,14 @@ async def get_current_verified_user(
     return current_user
 
 
+async def get_rate_limited_user(
+    current_user: User = Depends(get_current_active_user)
+) -> User:
+    """Get current active user, counting the request against RATE_LIMIT_PER_HOUR"""
+    resource_governor.check_rate_limit(current_user.id)
+    return current_user
+
+
 def require_subscription(required_plan: str):
     """Dependency factory for subscription-based access control"""
     async def check_subscription(
@@ -0,0 +1,147 @@
+"""
+Streamed file responses with Range and conditional request support
+Lets PDF.js fetch a PDF in byte ranges (first page shows before the rest
+arrives) and lets browsers revalidate a cached copy with a 304 instead of
+downloading it again.
+"""
+import re
+from email.utils import formatdate
+from typing import Optional, Tuple
+
+from fastapi import Request, status
+from fastapi.responses import Response, StreamingResponse
+
+from services.storage import async_storage
+
+
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def make_etag(info: dict) -> str:
+    """Strong ETag from size and mtime (renders are written atomically, so these change together)"""
+    return f'"{info["size"]:x}-{info["modified_ns"]:x}"'
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match / If-Range header value lists etag (or *)"""
+    if not header:
+        return False
+
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range Range header
+
+    Args:
+        header: Range header value
+        size: File size in bytes
+
+    Returns:
+        (start, end) inclusive, or None to send the whole file (no header,
+        multiple ranges, an invalid range such as bytes=5-3, or a syntax we
+        don't serve - all allowed by RFC 9110)
+
+    Raises:
+        ValueError: Range not satisfiable
+    """
+    if not header:
+        return None
+
+    match = RANGE_PATTERN.match(header.strip())
+    if not match:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError("Range not satisfiable")
+        return max(0, size - length), size - 1
+
+    start = int(first)
+    if last and int(last) < start:
+        return None  # Invalid range spec (last < first): ignore the header
+
+    if start >= size:
+        raise ValueError("Range not satisfiable")
+
+    end = min(int(last), size - 1) if last else size - 1
+
+    return start, end
+
+
+async def stored_file_response(
+    request: Request,
+    file_path: str,
+    media_type: str,
+    headers: Optional[dict] = None
+) -> Response:
+    """
+    Stream a stored file, honouring Range, If-Range and If-None-Match
+
+    Returns 304 when the client's copy is current, 206 with Content-Range
+    for a satisfiable range, 416 for an unsatisfiable one and 200 otherwise.
+    The body is read in chunks on the storage I/O pool.
+
+    Args:
+        request: Incoming request (for its conditional and Range headers)
+        file_path: Relative storage path
+        media_type: Content-Type of the file
+        headers: Extra headers (e.g. Content-Disposition)
+
+    Raises:
+        ValueError: File not found
+    """
+    info = await async_storage.file_info(file_path)
+    etag = make_etag(info)
+
+    response_headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(info["modified_ns"] / 1e9, usegmt=True),
+        "Accept-Ranges": "bytes",
+        # Download URLs stay the same across re-renders, so always revalidate
+        "Cache-Control": "private, no-cache",
+        **(headers or {}),
+    }
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=response_headers)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if if_range and if_range.strip() != etag:
+        range_header = None  # File changed since the client's partial copy: send it whole
+
+    try:
+        byte_range = parse_range(range_header, info["size"])
+    except ValueError:
+        return Response(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={**response_headers, "Content-Range": f"bytes */{info['size']}"}
+        )
+
+    if byte_range is None:
+        return StreamingResponse(
+            async_storage.iter_range(file_path),
+            media_type=media_type,
+            headers={**response_headers, "Content-Length": str(info["size"])}
+        )
+
+    start, end = byte_range
+    return StreamingResponse(
+        async_storage.iter_range(file_path, start, end),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=media_type,
+        headers={
+            **response_headers,
+            "Content-Range": f"bytes {start}-{end}/{info['size']}",
+            "Content-Length": str(end - start + 1),
+        }
+    )
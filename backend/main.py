@@ -1,7 +1,7 @@
 """
 All-Rounder Translation - FastAPI Main Application
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import uvicorn
@@ -11,10 +11,16 @@ from api.auth import router as auth_router
 from api.projects import router as projects_router
 from api.translation import router as translation_router
 from api.pdf import router as pdf_router
+from api.uploads import router as uploads_router
 from core.database import engine, Base
+from services.governor import resource_governor, AdmissionRejected
+from services.render_pool import render_pool
+from services.resumable_uploads import resumable_uploads
+from services.storage import async_storage, storage_service
+from services.storage_gc import storage_gc
 # Import ALL models to ensure they're registered with Base.metadata
 from models import (
-    User, Project, ProjectImage, Glossary, UsageLog, Payment
+    User, Project, ProjectImage, Glossary, UsageLog, Payment, Blob, BlobRef
 )
 from loguru import logger
 
@@ -29,10 +35,23 @@ async def lifespan(app: FastAPI):
         await conn.run_sync(Base.metadata.create_all)
     logger.success(f"Database tables created successfully: {list(Base.metadata.tables.keys())}")
 
+    # Spawn and pre-warm PDF render workers
+    await render_pool.start()
+
+    # Delete abandoned resumable uploads in the background
+    resumable_uploads.start()
+
+    # Purge deleted projects and orphaned blobs in the background
+    storage_gc.start()
+
     yield
 
     # Shutdown
     logger.info("Shutting down...")
+    storage_gc.shutdown()
+    resumable_uploads.shutdown()
+    render_pool.shutdown()
+    async_storage.shutdown()
 
 
 # App initialization
@@ -56,13 +75,28 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[
+        "Upload-Offset", "Upload-Length", "Location",  # Resumable uploads
+        "Accept-Ranges", "Content-Range", "Content-Length", "ETag",  # Ranged PDF downloads
+    ],
 )
 
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    """Shed load with 429 so clients back off instead of piling on"""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": exc.detail},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+
 # Register API Routers
 app.include_router(auth_router)
 app.include_router(projects_router)
 app.include_router(translation_router)
 app.include_router(pdf_router)
+app.include_router(uploads_router)
 
 
 @app.get("/")
@@ -81,7 +115,10 @@ async def health_check():
     """Detailed health check"""
     return {
         "status": "healthy",
-        "message": "All systems operational"
+        "message": "All systems operational",
+        "admission": resource_governor.stats(),
+        "read_cache": storage_service.cache.stats(),
+        "storage_gc": storage_gc.stats()
     }
 
 
@@ -3,11 +3,12 @@ Database Models
 """
 from .base import Base, TimestampMixin
 from .user import User
-from .project import Project, ProjectStatus
+from .project import Project, ProjectStatus, RenderEngine
 from .project_image import ProjectImage
 from .glossary import Glossary
 from .usage_log import UsageLog
 from .payment import Payment
+from .blob import Blob, BlobRef
 
 __all__ = [
     "Base",
@@ -15,8 +16,11 @@ __all__ = [
     "User",
     "Project",
     "ProjectStatus",
+    "RenderEngine",
     "ProjectImage",
     "Glossary",
     "UsageLog",
     "Payment",
+    "Blob",
+    "BlobRef",
 ]
@@ -0,0 +1,35 @@
+"""
+Blob Models - Content-addressed storage bookkeeping
+One Blob row per distinct file content; one BlobRef row per logical storage
+path pointing at it, so duplicate uploads cost a row instead of a copy
+"""
+from sqlalchemy import Column, String, Integer, BigInteger, ForeignKey, DateTime
+from datetime import datetime
+
+from .base import Base, TimestampMixin
+
+
+class Blob(Base, TimestampMixin):
+    """Distinct file content, stored once under blobs/ by SHA-256"""
+
+    __tablename__ = "blobs"
+
+    sha256 = Column(String(64), primary_key=True)  # Hex digest
+    size = Column(BigInteger, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)  # Number of BlobRef rows
+
+    def __repr__(self):
+        return f"<Blob(sha256={self.sha256[:12]}, refs={self.ref_count})>"
+
+
+class BlobRef(Base):
+    """Logical storage path (e.g. users/.../originals/x.pdf) → content hash"""
+
+    __tablename__ = "blob_refs"
+
+    path = Column(String(1000), primary_key=True)
+    sha256 = Column(String(64), ForeignKey("blobs.sha256"), nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<BlobRef(path={self.path}, sha256={self.sha256[:12]})>"
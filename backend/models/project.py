@@ -18,6 +18,12 @@ class ProjectStatus(str, enum.Enum):
     FAILED = "failed"
 
 
+class RenderEngine(str, enum.Enum):
+    """How the translated PDF is produced"""
+    HTML = "html"  # Re-flow Markdown through WeasyPrint
+    OVERLAY = "overlay"  # Write translations into the original PDF's text boxes
+
+
 class Project(Base, TimestampMixin):
     """Translation project model"""
     
@@ -37,7 +43,9 @@ class Project(Base, TimestampMixin):
     # File Information
     original_filename = Column(String(500), nullable=False)
     original_file_url = Column(String(1000))  # S3 URL
+    original_sha256 = Column(String(64), index=True)  # Hex digest of the uploaded original
     pdf_translated_url = Column(String(1000))  # S3 URL
+    render_engine = Column(String(20), default=RenderEngine.HTML.value)  # RenderEngine value
     
     # Language
     source_language = Column(String(10), default="ko", nullable=False)
@@ -20,6 +20,7 @@ class ProjectResponse(BaseModel):
     original_filename: str
     original_file_url: Optional[str]
     pdf_translated_url: Optional[str]
+    render_engine: Optional[str] = None
     source_language: str
     target_language: str
     page_count: Optional[int]
@@ -38,6 +39,7 @@ class ProjectUpdate(BaseModel):
     """Project update schema"""
     markdown_translated: Optional[str] = None
     status: Optional[str] = None
+    render_engine: Optional[str] = Field(default=None, pattern="^(html|overlay)$")
 
 
 class ProjectList(BaseModel):
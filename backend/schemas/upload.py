@@ -0,0 +1,24 @@
+"""
+Upload Schemas - Pydantic models for resumable upload requests/responses
+"""
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+
+
+class UploadCreate(BaseModel):
+    """Resumable upload creation schema"""
+    filename: str = Field(min_length=1, max_length=500)
+    length: int = Field(gt=0)
+    sha256: Optional[str] = Field(default=None, pattern="^[0-9a-fA-F]{64}$")
+    source_language: str = Field(default="ko", pattern="^[a-z]{2}$")
+    target_language: str = Field(default="en", pattern="^[a-z]{2}$")
+
+
+class UploadStatus(BaseModel):
+    """Resumable upload state"""
+    id: str
+    filename: str
+    length: int
+    offset: int
+    expires_at: datetime
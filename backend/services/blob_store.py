@@ -0,0 +1,144 @@
+"""
+Blob Store - Content-addressed deduplication on top of StorageService
+Files are kept once per SHA-256 under blobs/; every logical path (an
+original, an image pack) is a hard link to its blob, so identical
+uploads and images take one copy on the volume and existing readers keep
+opening logical paths unchanged. Reference counts live in the DB.
+"""
+from datetime import datetime
+
+from loguru import logger
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.blob import Blob, BlobRef
+from services.storage import storage_service, async_storage
+
+
+BLOB_FOLDER = "blobs"
+
+
+class BlobStore:
+    """
+    Deduplicating writes and reference-counted deletes
+
+    Layout:
+        blobs/{sha[:2]}/{sha[2:4]}/{sha256}   (one per distinct content)
+
+    The blob file only serves as the dedup index: data stays readable as
+    long as any logical path links to it, so losing a race with a delete
+    (or a rolled-back transaction) never loses content - the next write of
+    the same bytes just re-publishes the blob.
+
+    Usage:
+        await blob_store.adopt(db, upload["path"], upload["sha256"], upload["size"])
+        await db.commit()
+    """
+
+    def blob_path(self, sha256: str) -> str:
+        return f"{BLOB_FOLDER}/{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+    async def adopt(self, db: AsyncSession, path: str, sha256: str, size: int) -> dict:
+        """
+        Register a file already written at path (writers hash as they write)
+
+        If the content is already stored, the fresh copy is replaced by a link
+        to the existing blob and its space is freed.
+
+        Returns:
+            Dict with path, size, sha256 and deduplicated
+        """
+        blob_path = self.blob_path(sha256)
+
+        deduplicated = await async_storage.run(self._link_existing, blob_path, path)
+        if not deduplicated:
+            await async_storage.run(self._publish, path, blob_path)
+
+        await self._add_ref(db, path, sha256, size)
+        return {"path": path, "size": size, "sha256": sha256, "deduplicated": deduplicated}
+
+    async def release(self, db: AsyncSession, path: str) -> int:
+        """
+        Delete a logical path and drop its reference; the blob goes with its last reference
+
+        Paths written before the blob store (no BlobRef row) are simply deleted.
+
+        Returns:
+            Bytes freed in storage: a file's size once no other link keeps
+            its content (on the local volume a path freed nothing while its
+            blob exists; on S3 every path is its own copy)
+        """
+        ref = await db.get(BlobRef, path)
+        reclaimed = await async_storage.run(storage_service.reclaim_file, path)
+
+        if ref is None:
+            return reclaimed
+
+        sha256 = ref.sha256
+        await db.delete(ref)
+
+        result = await db.execute(
+            update(Blob)
+            .where(Blob.sha256 == sha256)
+            .values(ref_count=Blob.ref_count - 1, updated_at=datetime.utcnow())
+            .returning(Blob.ref_count)
+        )
+        row = result.one_or_none()
+
+        if row is not None and row.ref_count <= 0:
+            await db.execute(delete(Blob).where(Blob.sha256 == sha256, Blob.ref_count <= 0))
+            reclaimed += await async_storage.run(storage_service.reclaim_file, self.blob_path(sha256))
+            logger.debug(f"Released last reference to blob {sha256[:12]}")
+
+        return reclaimed
+
+    async def stats(self, db: AsyncSession) -> dict:
+        """Distinct blobs, stored bytes and bytes saved by deduplication"""
+        row = (await db.execute(
+            select(
+                func.count(Blob.sha256),
+                func.coalesce(func.sum(Blob.size), 0),
+                func.coalesce(func.sum(Blob.size * Blob.ref_count), 0)
+            )
+        )).one()
+
+        blobs, stored_bytes, logical_bytes = row
+        return {
+            "blobs": blobs,
+            "stored_bytes": int(stored_bytes),
+            "saved_bytes": int(logical_bytes - stored_bytes),
+        }
+
+    def _publish(self, path: str, blob_path: str):
+        """Register path as the blob for its content"""
+        storage_service.link_file(path, blob_path)
+
+    def _link_existing(self, blob_path: str, path: str) -> bool:
+        """Point path at an existing blob; False if there is none (or it just vanished)"""
+        if not storage_service.file_exists(blob_path):
+            return False
+
+        try:
+            storage_service.link_file(blob_path, path)
+        except (OSError, ValueError):
+            return False  # Released concurrently - store this copy as the blob instead
+
+        logger.debug(f"Deduplicated {path} -> {blob_path}")
+        return True
+
+    async def _add_ref(self, db: AsyncSession, path: str, sha256: str, size: int):
+        now = datetime.utcnow()
+        await db.execute(
+            pg_insert(Blob)
+            .values(sha256=sha256, size=size, ref_count=1, created_at=now, updated_at=now)
+            .on_conflict_do_update(
+                index_elements=[Blob.sha256],
+                set_={"ref_count": Blob.ref_count + 1, "updated_at": now}
+            )
+        )
+        db.add(BlobRef(path=path, sha256=sha256))
+
+
+# Singleton instance
+blob_store = BlobStore()
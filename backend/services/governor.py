@@ -0,0 +1,248 @@
+"""
+Resource Governor - Admission control and backpressure for expensive stages
+Bounds how many parses, translations and PDF renders run at once (by count
+and by estimated memory), queues briefly when saturated and sheds load with
+429 + Retry-After instead of letting the container run out of memory
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Deque, Dict
+from uuid import UUID
+
+from loguru import logger
+
+from core.config import settings
+
+
+# Rough peak-memory multipliers over the stage's input size
+# (parsed pages + extracted images, prompt/response buffers, HTML + layout tree)
+STAGE_MEMORY_FACTORS: Dict[str, int] = {
+    "parse": 6,
+    "translate": 4,
+    "render": 10,
+}
+
+# How often check_rate_limit drops idle users' empty hourly windows
+RATE_SWEEP_SECONDS = 300
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted; mapped to 429 Too Many Requests"""
+
+    def __init__(self, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+@dataclass
+class _StageBudget:
+    """Concurrency and memory budget for one pipeline stage"""
+    name: str
+    max_concurrency: int
+    memory_budget_bytes: int
+    memory_factor: int
+    active: int = 0
+    reserved_bytes: int = 0
+    queued: int = 0
+    admitted_total: int = 0
+    shed_total: int = 0
+    avg_hold_seconds: float = 1.0
+    condition: asyncio.Condition = field(default_factory=asyncio.Condition)
+
+    def fits(self, cost_bytes: int) -> bool:
+        """A job fits if a slot is free and its memory estimate is within budget
+        (an oversized job is still admitted when the stage is otherwise idle)"""
+        if self.active >= self.max_concurrency:
+            return False
+        return self.active == 0 or self.reserved_bytes + cost_bytes <= self.memory_budget_bytes
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "max_concurrency": self.max_concurrency,
+            "queued": self.queued,
+            "reserved_mb": round(self.reserved_bytes / (1024 * 1024), 1),
+            "memory_budget_mb": round(self.memory_budget_bytes / (1024 * 1024), 1),
+            "admitted_total": self.admitted_total,
+            "shed_total": self.shed_total,
+            "avg_hold_seconds": round(self.avg_hold_seconds, 2),
+        }
+
+
+class AdmissionTicket:
+    """Slot held in a stage; must be released exactly once"""
+
+    def __init__(self, governor: "ResourceGovernor", stage: _StageBudget, cost_bytes: int):
+        self._governor = governor
+        self._stage = stage
+        self._cost_bytes = cost_bytes
+        self._admitted_at = time.monotonic()
+        self._released = False
+
+    async def release(self):
+        if self._released:
+            return
+        self._released = True
+        await self._governor._release(self._stage, self._cost_bytes, time.monotonic() - self._admitted_at)
+
+
+class ResourceGovernor:
+    """
+    Per-stage concurrency/memory budgets plus per-user hourly rate limit
+
+    Usage:
+        async with resource_governor.admit("render", input_bytes):
+            ...
+
+        # Background jobs hold the slot past the request:
+        ticket = await resource_governor.acquire("translate", input_bytes, wait=False)
+        ...
+        await ticket.release()
+    """
+
+    def __init__(self):
+        mb = 1024 * 1024
+        self.stages: Dict[str, _StageBudget] = {
+            "parse": _StageBudget(
+                name="parse",
+                max_concurrency=settings.PARSE_MAX_CONCURRENCY,
+                memory_budget_bytes=settings.PARSE_MEMORY_BUDGET_MB * mb,
+                memory_factor=STAGE_MEMORY_FACTORS["parse"],
+            ),
+            "translate": _StageBudget(
+                name="translate",
+                max_concurrency=settings.TRANSLATE_MAX_JOBS,
+                memory_budget_bytes=settings.TRANSLATE_MEMORY_BUDGET_MB * mb,
+                memory_factor=STAGE_MEMORY_FACTORS["translate"],
+            ),
+            "render": _StageBudget(
+                name="render",
+                max_concurrency=settings.RENDER_MAX_CONCURRENCY,
+                memory_budget_bytes=settings.RENDER_MEMORY_BUDGET_MB * mb,
+                memory_factor=STAGE_MEMORY_FACTORS["render"],
+            ),
+        }
+        self.max_wait_seconds = settings.ADMISSION_MAX_WAIT_SECONDS
+        self.max_queue = settings.ADMISSION_MAX_QUEUE
+        self.rate_limit_per_hour = settings.RATE_LIMIT_PER_HOUR
+        self._rate_windows: Dict[UUID, Deque[float]] = {}
+        self._rate_swept_at = time.monotonic()
+
+    async def acquire(self, stage_name: str, input_bytes: int = 0, wait: bool = True) -> AdmissionTicket:
+        """
+        Reserve a slot in a stage
+
+        Args:
+            stage_name: parse, translate or render
+            input_bytes: Size of the stage input (scaled by the stage memory factor)
+            wait: Queue for up to ADMISSION_MAX_WAIT_SECONDS when saturated;
+                  if False, shed immediately
+
+        Returns:
+            AdmissionTicket to release when the work is done
+
+        Raises:
+            AdmissionRejected: Stage saturated (queue full or wait timed out)
+        """
+        stage = self.stages[stage_name]
+        cost_bytes = input_bytes * stage.memory_factor
+
+        async with stage.condition:
+            if not stage.fits(cost_bytes):
+                if not wait or stage.queued >= self.max_queue:
+                    raise self._reject(stage)
+
+                stage.queued += 1
+                try:
+                    await asyncio.wait_for(
+                        stage.condition.wait_for(lambda: stage.fits(cost_bytes)),
+                        timeout=self.max_wait_seconds
+                    )
+                except asyncio.TimeoutError:
+                    raise self._reject(stage)
+                finally:
+                    stage.queued -= 1
+
+            stage.active += 1
+            stage.reserved_bytes += cost_bytes
+            stage.admitted_total += 1
+
+        return AdmissionTicket(self, stage, cost_bytes)
+
+    @asynccontextmanager
+    async def admit(self, stage_name: str, input_bytes: int = 0, wait: bool = True) -> AsyncIterator[None]:
+        """Hold a stage slot for the duration of the block"""
+        ticket = await self.acquire(stage_name, input_bytes, wait=wait)
+        try:
+            yield
+        finally:
+            await ticket.release()
+
+    def check_rate_limit(self, user_id: UUID):
+        """
+        Count one expensive request against the user's hourly budget
+
+        Raises:
+            AdmissionRejected: RATE_LIMIT_PER_HOUR exceeded
+        """
+        now = time.monotonic()
+        if now - self._rate_swept_at >= RATE_SWEEP_SECONDS:
+            self._sweep_rate_windows(now)
+
+        window = self._rate_windows.setdefault(user_id, deque())
+        self._prune_window(window, now)
+
+        if len(window) >= self.rate_limit_per_hour:
+            retry_after = max(1, math.ceil(3600 - (now - window[0])))
+            logger.warning(f"Rate limit exceeded for user {user_id}")
+            raise AdmissionRejected(
+                f"Rate limit of {self.rate_limit_per_hour} requests per hour exceeded",
+                retry_after
+            )
+
+        window.append(now)
+
+    def stats(self) -> dict:
+        """Current load per stage"""
+        return {name: stage.stats() for name, stage in self.stages.items()}
+
+    def _sweep_rate_windows(self, now: float):
+        """Drop users whose requests have all left the hourly window"""
+        for user_id, window in list(self._rate_windows.items()):
+            self._prune_window(window, now)
+            if not window:
+                del self._rate_windows[user_id]
+        self._rate_swept_at = now
+
+    @staticmethod
+    def _prune_window(window: Deque[float], now: float):
+        while window and now - window[0] >= 3600:
+            window.popleft()
+
+    async def _release(self, stage: _StageBudget, cost_bytes: int, held_seconds: float):
+        async with stage.condition:
+            stage.active -= 1
+            stage.reserved_bytes -= cost_bytes
+            # Exponential moving average feeds the Retry-After estimate
+            stage.avg_hold_seconds = 0.8 * stage.avg_hold_seconds + 0.2 * held_seconds
+            stage.condition.notify_all()
+
+    def _reject(self, stage: _StageBudget) -> AdmissionRejected:
+        stage.shed_total += 1
+        retry_after = max(1, math.ceil(
+            stage.avg_hold_seconds * (stage.queued + 1) / stage.max_concurrency
+        ))
+        logger.warning(f"Shedding {stage.name} request: {stage.active} active, {stage.queued} queued")
+        return AdmissionRejected(
+            f"Server is busy ({stage.name}). Please retry shortly.",
+            retry_after
+        )
+
+
+# Singleton instance
+resource_governor = ResourceGovernor()
@@ -0,0 +1,173 @@
+"""
+Image Derivatives - Downsample images to their rendered size before embedding
+Extracted images are stored at intrinsic resolution; a 4000px photo shown at
+200pt only needs ~400px at print resolution. Derivatives are cached on the
+storage volume by source hash + target size, so each is computed once.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from typing import Optional, Tuple
+
+from loguru import logger
+from PIL import Image
+
+from core.config import settings
+
+
+# Bump when resampling/encoding changes, so old derivatives are not reused
+DERIVATIVE_VERSION = "1"
+
+DERIVATIVE_FOLDER = "derivatives/images"
+
+# Only downsample when it saves something meaningful
+MIN_SHRINK_RATIO = 1.25
+
+
+class ImageDerivativeService:
+    """
+    Produce (and cache) render-sized copies of stored images
+
+    Usage:
+        path = image_derivatives.resolve(storage_service, "users/.../img.png", 200, 150)
+    """
+
+    # Source hashes memoized by (path, size, mtime) and resolved paths by
+    # (hash, target size), so a render doesn't re-read every source image
+    # just to find its cached derivative (or learn it needs none)
+    MEMO_SIZE = 4096
+
+    def __init__(self, dpi: Optional[int] = None, jpeg_quality: Optional[int] = None):
+        self.dpi = settings.IMAGE_RENDER_DPI if dpi is None else dpi
+        self.jpeg_quality = jpeg_quality or settings.IMAGE_JPEG_QUALITY
+        self._hashes: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+        self._resolved: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.dpi > 0
+
+    def target_pixels(self, width_pt: float, height_pt: float) -> Tuple[int, int]:
+        """Pixel size of an image rendered at width_pt x height_pt at the configured DPI"""
+        scale = self.dpi / 72
+        return max(1, round(width_pt * scale)), max(1, round(height_pt * scale))
+
+    def resolve(self, storage_service, image_path: str, width_pt: float, height_pt: float) -> str:
+        """
+        Storage path of the image to embed at the given rendered size
+
+        Returns the source path when downsampling is disabled, would not save
+        anything, or fails (the original is always a valid fallback).
+        """
+        if not self.enabled or not width_pt or not height_pt:
+            return image_path
+
+        target_size = self.target_pixels(width_pt, height_pt)
+
+        try:
+            source_hash = self._source_hash(storage_service, image_path)
+            memo_key = (source_hash, *target_size)
+
+            resolved_path = self._memo_get(self._resolved, memo_key)
+            if resolved_path and storage_service.file_exists(resolved_path):
+                return resolved_path
+
+            resolved_path = self._find_or_create(storage_service, image_path, source_hash, target_size)
+            self._memo_put(self._resolved, memo_key, resolved_path)
+            return resolved_path
+
+        except Exception as e:
+            logger.warning(f"Image downsampling failed for {image_path}: {e}")
+            return image_path
+
+    def _find_or_create(
+        self,
+        storage_service,
+        image_path: str,
+        source_hash: str,
+        target_size: Tuple[int, int]
+    ) -> str:
+        derivative_path = (
+            f"{DERIVATIVE_FOLDER}/{source_hash[:2]}/"
+            f"{source_hash}_{target_size[0]}x{target_size[1]}_v{DERIVATIVE_VERSION}"
+        )
+
+        for extension in ("jpg", "png"):
+            if storage_service.file_exists(f"{derivative_path}.{extension}"):
+                return f"{derivative_path}.{extension}"
+
+        derivative = self._downsample(storage_service.download_file(image_path), target_size)
+        if derivative is None:
+            return image_path
+
+        content, extension = derivative
+        return storage_service.save_file(f"{derivative_path}.{extension}", content)
+
+    def _downsample(self, source: bytes, target_size: Tuple[int, int]) -> Optional[Tuple[bytes, str]]:
+        """
+        Resample to fit target_size and recompress
+
+        Returns:
+            (bytes, extension), or None if the source is already small enough
+        """
+        with Image.open(BytesIO(source)) as image:
+            width, height = image.size
+            if width < target_size[0] * MIN_SHRINK_RATIO and height < target_size[1] * MIN_SHRINK_RATIO:
+                return None
+
+            image.draft("RGB", target_size)  # Cheap JPEG DCT scaling before the real resample
+            has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+
+            image = image.convert("RGBA" if has_alpha else "RGB")
+            image.thumbnail(target_size, Image.LANCZOS)
+
+            buffer = BytesIO()
+            if has_alpha:
+                image.save(buffer, format="PNG", optimize=True)
+                extension = "png"
+            else:
+                image.save(buffer, format="JPEG", quality=self.jpeg_quality, optimize=True, progressive=True)
+                extension = "jpg"
+
+        content = buffer.getvalue()
+        if len(content) >= len(source):
+            return None
+
+        logger.debug(f"Downsampled {width}x{height} → {image.size[0]}x{image.size[1]} ({len(source)} → {len(content)} bytes)")
+        return content, extension
+
+    def _source_hash(self, storage_service, image_path: str) -> str:
+        info = storage_service.file_info(image_path)
+        memo_key = (image_path, info["size"], info["modified_ns"])
+
+        source_hash = self._memo_get(self._hashes, memo_key)
+        if source_hash:
+            return source_hash
+
+        digest = hashlib.sha256()
+        with storage_service.open_file(image_path) as source:
+            for chunk in iter(lambda: source.read(1024 * 1024), b""):
+                digest.update(chunk)
+        source_hash = digest.hexdigest()
+
+        self._memo_put(self._hashes, memo_key, source_hash)
+        return source_hash
+
+    def _memo_get(self, memo: OrderedDict, key: tuple) -> Optional[str]:
+        with self._lock:
+            value = memo.get(key)
+            if value is not None:
+                memo.move_to_end(key)
+            return value
+
+    def _memo_put(self, memo: OrderedDict, key: tuple, value: str):
+        with self._lock:
+            memo[key] = value
+            if len(memo) > self.MEMO_SIZE:
+                memo.popitem(last=False)
+
+
+# Singleton instance
+image_derivatives = ImageDerivativeService()
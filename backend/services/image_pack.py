@@ -0,0 +1,77 @@
+"""
+Image Pack - One append-only file per project for its extracted images
+Image-heavy decks used to produce hundreds of tiny files (an open/write/close
+and an inode each, reopened by every render); packing them into one file
+turns ingest into a single sequential write and reads into ranged reads.
+"""
+import hashlib
+from typing import List, Tuple
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from services.blob_store import blob_store
+from services.packed_storage import pack_ref, PACK_EXTENSION
+from services.storage import storage_service, async_storage
+
+
+class ImagePackService:
+    """
+    Write project image packs
+
+    Layout:
+        users/{user_id}/projects/{project_id}/images.pack
+
+    Images are appended back to back; the returned reference paths
+    ({pack}#{offset}-{length}.{ext}) are the offset index and are stored as
+    each ProjectImage's storage_path, where PackedStorage resolves them.
+    A pack is registered with the blob store once written, so re-uploads of
+    the same deck share it.
+
+    Usage:
+        refs = await image_pack.write(db, image_pack.pack_path(user.id, project.id), [(png_bytes, "png")])
+        await db.commit()
+    """
+
+    def pack_path(self, user_id, project_id) -> str:
+        return f"users/{user_id}/projects/{project_id}/images{PACK_EXTENSION}"
+
+    async def write(self, db: AsyncSession, pack_path: str, images: List[Tuple[bytes, str]]) -> List[str]:
+        """
+        Write images into a new pack
+
+        Args:
+            db: Session the blob reference is added to (caller commits)
+            pack_path: Storage path of the pack
+            images: (content, extension) per image, in pack order
+
+        Returns:
+            Reference path per image, in the same order
+        """
+        refs, sha256, size = await async_storage.run(self._write_pack, pack_path, images)
+        stored = await blob_store.adopt(db, pack_path, sha256, size)
+
+        logger.info(
+            f"Packed {len(images)} images ({size} bytes) into {pack_path}"
+            + (" (deduplicated)" if stored["deduplicated"] else "")
+        )
+        return refs
+
+    def _write_pack(self, pack_path: str, images: List[Tuple[bytes, str]]) -> Tuple[List[str], str, int]:
+        """Write the pack in one pass; returns (refs, sha256, size)"""
+        digest = hashlib.sha256()
+        refs = []
+        offset = 0
+
+        with storage_service.open_for_write(pack_path) as f:
+            for content, extension in images:
+                f.write(content)
+                digest.update(content)
+                refs.append(pack_ref(pack_path, offset, len(content), extension))
+                offset += len(content)
+
+        return refs, digest.hexdigest(), offset
+
+
+# Singleton instance
+image_pack = ImagePackService()
@@ -0,0 +1,113 @@
+"""
+Job Registry - Cooperative cancellation for long-running project jobs
+Lets the API stop a running translation (explicit cancel or project delete)
+so provider calls stop burning money and throughput
+"""
+import asyncio
+import threading
+from typing import Awaitable, Dict, Optional, TypeVar
+from uuid import UUID
+
+from loguru import logger
+
+T = TypeVar("T")
+
+
+class JobCancelled(Exception):
+    """Raised inside a job once its cancellation has been requested"""
+
+
+class CancellationToken:
+    """
+    Cancellation flag shared between the API, the job coroutine and its worker threads
+
+    - raise_if_cancelled(): cheap check, safe to call from worker threads
+      (the translator calls it between chunks)
+    - guard(awaitable): races in-flight work against cancellation and abandons
+      it as soon as cancel() is called
+    """
+
+    def __init__(self):
+        self._flag = threading.Event()
+        self._event = asyncio.Event()
+        self.reason: Optional[str] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._flag.is_set()
+
+    def cancel(self, reason: str = "Cancelled by user"):
+        """Request cancellation (must be called from the event loop)"""
+        if self.cancelled:
+            return
+        self.reason = reason
+        self._flag.set()
+        self._event.set()
+
+    def raise_if_cancelled(self):
+        if self._flag.is_set():
+            raise JobCancelled(self.reason)
+
+    async def guard(self, awaitable: Awaitable[T]) -> T:
+        """
+        Await work unless cancellation arrives first
+
+        On cancellation the work is cancelled (a worker thread finishes its
+        current call in the background; its result is discarded) and
+        JobCancelled is raised.
+        """
+        self.raise_if_cancelled()
+
+        work = asyncio.ensure_future(awaitable)
+        cancel_wait = asyncio.create_task(self._event.wait())
+        try:
+            await asyncio.wait({work, cancel_wait}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            cancel_wait.cancel()
+
+        if work.done():
+            return work.result()
+
+        work.cancel()
+        await asyncio.gather(work, return_exceptions=True)
+        raise JobCancelled(self.reason)
+
+
+class JobRegistry:
+    """Running jobs keyed by project id"""
+
+    def __init__(self):
+        self._tokens: Dict[UUID, CancellationToken] = {}
+
+    def register(self, project_id: UUID) -> CancellationToken:
+        """Create the cancellation token for a job about to start"""
+        token = CancellationToken()
+        self._tokens[project_id] = token
+        return token
+
+    def unregister(self, project_id: UUID, token: CancellationToken):
+        """Forget a finished job (no-op if a newer job replaced it)"""
+        if self._tokens.get(project_id) is token:
+            del self._tokens[project_id]
+
+    def is_running(self, project_id: UUID) -> bool:
+        return project_id in self._tokens
+
+    def cancel(self, project_id: UUID, reason: str = "Cancelled by user") -> bool:
+        """
+        Request cancellation of a project's running job
+
+        Returns:
+            True if a running job was signalled
+        """
+        token = self._tokens.get(project_id)
+        if not token:
+            return False
+
+        token.cancel(reason)
+        logger.info(f"Cancellation requested for project {project_id}: {reason}")
+        return True
+
+
+# Singleton instance
+job_registry = JobRegistry()
@@ -0,0 +1,93 @@
+"""
+Packed Storage - Random-access reads of images stored inside image packs
+A project's extracted images live back to back in one pack file; each image
+is addressed by a reference path naming the pack and its byte range, so
+every reader (renders, derivatives, the read cache) keeps using plain
+storage paths.
+"""
+import re
+from io import BytesIO
+from typing import BinaryIO, Iterator, NamedTuple, Optional
+
+from services.storage import StorageWrapper, STREAM_CHUNK_SIZE
+
+
+PACK_EXTENSION = ".pack"
+
+# {pack}.pack#{offset}-{length}.{ext}  (the extension keeps content types guessable)
+PACK_REF_PATTERN = re.compile(r"^(?P<pack>.+\.pack)#(?P<offset>\d+)-(?P<length>\d+)(?:\.\w+)?$")
+
+
+class PackRef(NamedTuple):
+    pack_path: str
+    offset: int
+    length: int
+
+
+def pack_ref(pack_path: str, offset: int, length: int, extension: str) -> str:
+    """Reference path of length bytes at offset in a pack"""
+    return f"{pack_path}#{offset}-{length}.{extension}"
+
+
+def parse_pack_ref(file_path: str) -> Optional[PackRef]:
+    """PackRef for a reference path, or None for an ordinary path"""
+    match = PACK_REF_PATTERN.match(file_path)
+    if not match:
+        return None
+    return PackRef(match["pack"], int(match["offset"]), int(match["length"]))
+
+
+class PackedStorage(StorageWrapper):
+    """
+    Storage layer resolving pack references to ranged reads of their pack
+
+    Packs are append-only, so a reference stays valid for the pack's
+    lifetime. Ordinary paths pass straight through to the backend.
+    """
+
+    def download_file(self, file_path: str) -> bytes:
+        ref = parse_pack_ref(file_path)
+        if ref is None:
+            return self.backend.download_file(file_path)
+
+        content = b"".join(self.read_chunks(file_path))
+        if len(content) != ref.length:
+            raise ValueError(f"Truncated image pack entry: {file_path}")
+        return content
+
+    def open_file(self, file_path: str) -> BinaryIO:
+        if parse_pack_ref(file_path) is None:
+            return self.backend.open_file(file_path)
+        return BytesIO(self.download_file(file_path))
+
+    def read_chunks(
+        self,
+        file_path: str,
+        start: int = 0,
+        end: Optional[int] = None,
+        chunk_size: int = STREAM_CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        ref = parse_pack_ref(file_path)
+        if ref is None:
+            yield from self.backend.read_chunks(file_path, start, end, chunk_size)
+            return
+
+        last = ref.length - 1 if end is None else min(end, ref.length - 1)
+        if start > last:
+            return
+        yield from self.backend.read_chunks(ref.pack_path, ref.offset + start, ref.offset + last, chunk_size)
+
+    def local_path(self, file_path: str) -> str:
+        if parse_pack_ref(file_path) is not None:
+            raise ValueError(f"Image pack entries have no local path: {file_path}")
+        return self.backend.local_path(file_path)
+
+    def file_exists(self, file_path: str) -> bool:
+        ref = parse_pack_ref(file_path)
+        return self.backend.file_exists(ref.pack_path if ref else file_path)
+
+    def file_info(self, file_path: str) -> dict:
+        ref = parse_pack_ref(file_path)
+        if ref is None:
+            return self.backend.file_info(file_path)
+        return {**self.backend.file_info(ref.pack_path), "size": ref.length}
@@ -0,0 +1,143 @@
+"""
+Page Raster Service - Per-page PNG/WebP previews of original and translated PDFs
+Lets the editor show one page at a time side by side instead of downloading
+whole PDFs. Rasters are cached on the storage volume with LRU eviction.
+"""
+import hashlib
+import threading
+from io import BytesIO
+from typing import Optional
+
+import fitz  # PyMuPDF
+from loguru import logger
+from PIL import Image
+
+from core.config import settings
+
+
+PREVIEW_FOLDER = "previews/pages"
+
+PREVIEW_CONTENT_TYPES = {
+    "png": "image/png",
+    "webp": "image/webp",
+}
+
+WEBP_QUALITY = 80
+
+
+class PageRasterService:
+    """
+    Rasterize single PDF pages and cache the results
+
+    Cache entries are keyed by source path + size + mtime, page, width and
+    format, so a re-rendered translated PDF never serves stale previews.
+    Hits refresh the entry's mtime; when the cache exceeds
+    PREVIEW_CACHE_MAX_MB the least recently used entries are deleted.
+    """
+
+    def __init__(self, max_cache_mb: Optional[int] = None):
+        self.max_cache_bytes = (max_cache_mb or settings.PREVIEW_CACHE_MAX_MB) * 1024 * 1024
+        self._cache_bytes: Optional[int] = None  # Lazily measured on first write
+        self._lock = threading.Lock()
+
+    def render_page(
+        self,
+        storage_service,
+        pdf_path: str,
+        page_number: int,
+        width: int,
+        image_format: str = "png"
+    ) -> bytes:
+        """
+        Return one page as an image, rendering it only on a cache miss
+
+        Args:
+            storage_service: Storage service instance
+            pdf_path: Storage path of the PDF
+            page_number: Page number (1-based)
+            width: Output width in pixels (height follows the page aspect ratio)
+            image_format: png or webp
+
+        Returns:
+            Image bytes
+
+        Raises:
+            ValueError: Unknown format, missing PDF or page out of range
+        """
+        if image_format not in PREVIEW_CONTENT_TYPES:
+            raise ValueError(f"Unsupported preview format: {image_format}")
+
+        info = storage_service.file_info(pdf_path)
+        cache_key = hashlib.sha256(
+            f"{pdf_path}|{info['size']}|{info['modified_ns']}|{page_number}|{width}".encode()
+        ).hexdigest()
+        preview_path = f"{PREVIEW_FOLDER}/{cache_key[:2]}/{cache_key}.{image_format}"
+
+        if storage_service.file_exists(preview_path):
+            storage_service.touch_file(preview_path)  # Refresh LRU position
+            return storage_service.download_file(preview_path)
+
+        image_bytes = self._rasterize(storage_service.download_file(pdf_path), page_number, width, image_format)
+
+        storage_service.save_file(preview_path, image_bytes)
+        self._account(storage_service, len(image_bytes))
+
+        return image_bytes
+
+    def _rasterize(self, pdf_bytes: bytes, page_number: int, width: int, image_format: str) -> bytes:
+        with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+            if not 1 <= page_number <= doc.page_count:
+                raise ValueError(f"Page {page_number} out of range (1-{doc.page_count})")
+
+            page = doc[page_number - 1]
+            zoom = width / page.rect.width
+            pixmap = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+
+            if image_format == "png":
+                return pixmap.tobytes("png")
+
+            buffer = BytesIO()
+            Image.frombytes("RGB", (pixmap.width, pixmap.height), pixmap.samples).save(
+                buffer, format="WEBP", quality=WEBP_QUALITY
+            )
+            return buffer.getvalue()
+
+    def _entries(self, storage_service) -> list:
+        """(last_used_ns, size, path) for every cached preview"""
+        entries = []
+        for shard in storage_service.list_folders(PREVIEW_FOLDER):
+            for path in storage_service.list_files(shard):
+                info = storage_service.file_info(path)
+                entries.append((info["modified_ns"], info["size"], path))
+        return entries
+
+    def _account(self, storage_service, added_bytes: int):
+        """Track cache size and evict least recently used previews over budget"""
+        with self._lock:
+            if self._cache_bytes is None:
+                self._cache_bytes = sum(size for _, size, _ in self._entries(storage_service))
+            else:
+                self._cache_bytes += added_bytes
+
+            if self._cache_bytes <= self.max_cache_bytes:
+                return
+
+            entries = sorted(self._entries(storage_service))
+            total = sum(size for _, size, _ in entries)
+
+            # Evict down to 90% so the next few writes don't rescan
+            target = self.max_cache_bytes * 0.9
+            evicted = 0
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                storage_service.delete_file(path)
+                total -= size
+                evicted += 1
+
+            self._cache_bytes = total
+            logger.info(f"Evicted {evicted} page previews (cache now {total // (1024 * 1024)} MB)")
+
+
+# Singleton instance
+page_raster = PageRasterService()
@@ -2,61 +2,427 @@
 PDF Generator Service - Markdown to PDF conversion
 Uses WeasyPrint for HTML/CSS to PDF rendering
 """
-from typing import Optional
+from typing import BinaryIO, Dict, List, Optional, Tuple
+from dataclasses import dataclass
+import html
 import markdown
-import base64
 import re
-from weasyprint import HTML, CSS
+import tempfile
+import threading
+from urllib.parse import parse_qs, quote, unquote
+from weasyprint import HTML, CSS, default_url_fetcher
 from weasyprint.text.fonts import FontConfiguration
-from io import BytesIO
+import fitz  # PyMuPDF
 from loguru import logger
 
+from services.image_derivatives import image_derivatives
+from services.pdf_optimizer import pdf_optimizer
+
+# Image sources that point into StorageService are rewritten to this scheme
+# and resolved by the url_fetcher straight from the storage volume
+STORAGE_URL_SCHEME = "storage:"
+
+# Bump whenever the HTML template or stylesheet changes the rendered output,
+# so cached renders from the old template are not served
+TEMPLATE_VERSION = "3"
+
+# Page number stamp for merged fragments (matches the @bottom-center margin box)
+PAGE_NUMBER_FONT_SIZE = 10
+PAGE_NUMBER_COLOR = (0.4, 0.4, 0.4)  # #666
+PAGE_NUMBER_BOTTOM_OFFSET = 2.5 / 2 * 72 / 2.54  # Middle of the 2.5cm bottom margin, in pt
+
+MARKDOWN_EXTENSIONS = ['extra', 'codehilite', 'toc', 'nl2br']
+
+# Document stylesheet, parsed once per worker by RenderContext
+BASE_STYLESHEET = """
+body {
+    font-family: "Noto Sans", "Malgun Gothic", Arial, sans-serif;
+    font-size: 11pt;
+    line-height: 1.6;
+    color: #333;
+}
+
+h1 {
+    font-size: 24pt;
+    font-weight: bold;
+    margin-top: 20pt;
+    margin-bottom: 12pt;
+    color: #222;
+    page-break-after: avoid;
+}
+
+h2 {
+    font-size: 18pt;
+    font-weight: bold;
+    margin-top: 16pt;
+    margin-bottom: 10pt;
+    color: #333;
+    page-break-after: avoid;
+}
+
+h3 {
+    font-size: 14pt;
+    font-weight: bold;
+    margin-top: 12pt;
+    margin-bottom: 8pt;
+    color: #444;
+    page-break-after: avoid;
+}
+
+h4, h5, h6 {
+    font-size: 12pt;
+    font-weight: bold;
+    margin-top: 10pt;
+    margin-bottom: 6pt;
+    color: #555;
+    page-break-after: avoid;
+}
+
+p {
+    margin-top: 0;
+    margin-bottom: 10pt;
+    text-align: justify;
+}
+
+ul, ol {
+    margin-top: 6pt;
+    margin-bottom: 10pt;
+    padding-left: 20pt;
+}
+
+li {
+    margin-bottom: 4pt;
+}
+
+table {
+    width: 100%;
+    border-collapse: collapse;
+    margin-top: 10pt;
+    margin-bottom: 10pt;
+    page-break-inside: avoid;
+}
+
+th {
+    background-color: #f5f5f5;
+    border: 1px solid #ddd;
+    padding: 8pt;
+    text-align: left;
+    font-weight: bold;
+}
+
+td {
+    border: 1px solid #ddd;
+    padding: 8pt;
+}
+
+code {
+    background-color: #f5f5f5;
+    padding: 2pt 4pt;
+    border-radius: 3px;
+    font-family: "Courier New", monospace;
+    font-size: 9pt;
+}
+
+pre {
+    background-color: #f5f5f5;
+    padding: 10pt;
+    border-radius: 5px;
+    overflow-x: auto;
+    page-break-inside: avoid;
+}
+
+pre code {
+    background-color: transparent;
+    padding: 0;
+}
+
+blockquote {
+    border-left: 4px solid #ddd;
+    padding-left: 12pt;
+    margin-left: 0;
+    color: #666;
+    font-style: italic;
+}
+
+hr {
+    border: none;
+    border-top: 1px solid #ddd;
+    margin: 20pt 0;
+}
+
+a {
+    color: #0066cc;
+    text-decoration: none;
+}
+
+img {
+    max-width: 100%;
+    height: auto;
+    page-break-inside: avoid;
+}
+
+.page-container {
+    page-break-after: always;
+}
+
+.page-content {
+    /* Page content wrapper */
+}
+
+.page-break {
+    page-break-before: always;
+}
+"""
+
+
+@dataclass
+class ImageLayout:
+    """Picklable subset of ProjectImage needed for rendering (sent to render workers)"""
+    page_number: int
+    storage_path: str
+    width: Optional[float] = None
+    height: Optional[float] = None
+
+    @classmethod
+    def from_project_image(cls, project_image) -> "ImageLayout":
+        return cls(
+            page_number=project_image.page_number,
+            storage_path=project_image.storage_path,
+            width=project_image.width,
+            height=project_image.height
+        )
+
+
+class RenderContext:
+    """
+    Rendering state built once per worker and reused across renders
+
+    - Markdown converter with its extensions loaded once and reset() between
+      pages (one per thread, since converters keep per-document state)
+    - BASE_STYLESHEET parsed into a weasyprint.CSS once and shared
+    - Margin-box stylesheets (running title, page numbers) cached per title
+    """
+
+    # Titles are per document, so keep only the most recent few parsed
+    PAGE_STYLESHEET_CACHE_SIZE = 32
+
+    def __init__(self, font_config: FontConfiguration):
+        self.font_config = font_config
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._base_stylesheet: Optional[CSS] = None
+        self._page_stylesheets: Dict[Tuple[Optional[str], bool], CSS] = {}
+
+    def markdown_to_html(self, content: str) -> str:
+        """Convert Markdown with this thread's reusable converter"""
+        converter = getattr(self._local, "markdown", None)
+        if converter is None:
+            converter = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS)
+            self._local.markdown = converter
+
+        return converter.reset().convert(content)
+
+    def stylesheets(self, title: Optional[str], page_numbers: bool = True) -> List[CSS]:
+        """
+        Stylesheets for one document
+
+        Args:
+            title: Running header text
+            page_numbers: Number pages with the page counter (fragments are
+                numbered after merging instead)
+        """
+        with self._lock:
+            if self._base_stylesheet is None:
+                self._base_stylesheet = CSS(string=BASE_STYLESHEET, font_config=self.font_config)
+
+            key = (title, page_numbers)
+            page_stylesheet = self._page_stylesheets.get(key)
+            if page_stylesheet is None:
+                if len(self._page_stylesheets) >= self.PAGE_STYLESHEET_CACHE_SIZE:
+                    self._page_stylesheets.pop(next(iter(self._page_stylesheets)))
+                page_stylesheet = CSS(string=self._page_css(title, page_numbers), font_config=self.font_config)
+                self._page_stylesheets[key] = page_stylesheet
+
+            return [self._base_stylesheet, page_stylesheet]
+
+    @staticmethod
+    def _page_css(title: Optional[str], page_numbers: bool) -> str:
+        """@page rule with the running title and (optionally) page counter"""
+        escaped_title = (title or '').replace('\\', '\\\\').replace('"', '\\"')
+        page_number_content = "counter(page)" if page_numbers else "none"
+
+        return f"""
+@page {{
+    size: letter;  /* US Letter (8.5" x 11") */
+    margin: 2.5cm 2cm;
+    @top-center {{
+        content: "{escaped_title}";
+        font-size: 10pt;
+        color: #666;
+    }}
+    @bottom-center {{
+        content: {page_number_content};
+        font-size: 10pt;
+        color: #666;
+    }}
+}}
+"""
+
 
 class PDFGeneratorService:
     """Convert Markdown to PDF with styling"""
 
     def __init__(self):
         self.font_config = FontConfiguration()
+        self.context = RenderContext(self.font_config)
+
+    def warm_up(self):
+        """
+        Render a tiny document once so fontconfig, font loading and the
+        stylesheet parse are paid before the first real request
+        """
+        with tempfile.TemporaryFile() as output:
+            self.markdown_to_pdf("# Page 1\n\nWarm-up 준비", output, title="warm-up")
 
     def markdown_to_pdf(
         self,
         markdown_content: str,
+        target: BinaryIO,
         title: Optional[str] = None,
         language: str = "en",
         storage_service = None,
         project_images: list = None
-    ) -> bytes:
+    ):
         """
-        Convert Markdown to PDF
+        Convert Markdown to a single PDF, streamed into target
 
         Args:
             markdown_content: Markdown text
+            target: Binary file to write the PDF into
             title: Document title
             language: Language code for font selection
             storage_service: Storage service instance for loading images
             project_images: List of ProjectImage objects with position info
 
-        Returns:
-            PDF file bytes
+        Raises:
+            ValueError: Rendering failed
         """
         try:
             # Convert Markdown to HTML
             html_content = self._markdown_to_html(markdown_content, title, language, project_images)
 
-            # Replace image paths with Base64 data URIs
-            if storage_service:
-                html_content = self._embed_images_as_base64(html_content, storage_service)
-
-            # Generate PDF
-            pdf_bytes = self._html_to_pdf(html_content)
+            # Generate PDF (images are streamed from storage by the url_fetcher)
+            self._html_to_pdf(html_content, target, storage_service, self.context.stylesheets(title))
 
-            logger.success(f"Generated PDF ({len(pdf_bytes)} bytes)")
-            return pdf_bytes
+            logger.success(f"Generated PDF ({target.tell()} bytes)")
 
         except Exception as e:
             logger.error(f"PDF generation failed: {str(e)}")
             raise ValueError(f"PDF generation failed: {str(e)}")
 
+    def split_pages(self, markdown_content: str, project_images: list = None) -> list:
+        """
+        Split Markdown into page dicts (page_number, content, images)
+
+        Unlike _split_by_pages, Markdown without any # Page N marker becomes a
+        single page instead of an empty document.
+        """
+        pages_data = self._split_by_pages(markdown_content, project_images)
+
+        if not pages_data and markdown_content.strip():
+            pages_data = [{
+                'page_number': 1,
+                'content': markdown_content,
+                'images': [img for img in project_images or [] if img.page_number == 1]
+            }]
+
+        return pages_data
+
+    def render_page_fragment(
+        self,
+        page_data: dict,
+        title: Optional[str] = None,
+        language: str = "en",
+        storage_service = None,
+        output_path: str = None
+    ) -> str:
+        """
+        Render one page dict (from split_pages) as a standalone PDF fragment
+
+        Fragments carry no page numbers; merge_fragments stamps them once the
+        final page order is known.
+
+        Args:
+            output_path: Storage path the fragment is streamed to
+
+        Returns:
+            output_path
+        """
+        try:
+            page_html = self._convert_page_to_html(page_data)
+            html_content = self._build_html_document(page_html, title, language)
+            stylesheets = self.context.stylesheets(title, page_numbers=False)
+
+            with storage_service.open_for_write(output_path) as output:
+                self._html_to_pdf(html_content, output, storage_service, stylesheets)
+
+            return output_path
+
+        except Exception as e:
+            logger.error(f"Page {page_data['page_number']} render failed: {str(e)}")
+            raise ValueError(f"PDF generation failed: {str(e)}")
+
+    def merge_fragments(self, fragment_paths: list, storage_service, output_path: str) -> str:
+        """
+        Concatenate PDF fragments with PyMuPDF, stamp page numbers and
+        save through the optimizer (fragments repeat shared fonts and images)
+
+        Args:
+            fragment_paths: Storage paths of fragments, in page order
+            storage_service: Storage service instance for loading fragments
+            output_path: Storage path the merged PDF is streamed to
+
+        Returns:
+            output_path
+        """
+        merged = fitz.open()
+        fragment_bytes = 0
+        try:
+            for fragment_path in fragment_paths:
+                fragment_pdf = storage_service.download_file(fragment_path)
+                fragment_bytes += len(fragment_pdf)
+                with fitz.open(stream=fragment_pdf, filetype="pdf") as fragment:
+                    merged.insert_pdf(fragment)
+
+            self._stamp_page_numbers(merged)
+
+            with storage_service.open_for_write(output_path) as output:
+                pdf_optimizer.save(merged, output, before_bytes=fragment_bytes)
+
+        except Exception as e:
+            logger.error(f"PDF merge failed: {str(e)}")
+            raise ValueError(f"PDF generation failed: {str(e)}")
+
+        finally:
+            merged.close()
+
+        logger.success(f"Merged {len(fragment_paths)} fragments into {output_path}")
+        return output_path
+
+    def _stamp_page_numbers(self, document: "fitz.Document"):
+        """Write centered page numbers into the bottom margin of every page"""
+        for index, page in enumerate(document):
+            label = str(index + 1)
+            text_width = fitz.get_text_length(label, fontname="helv", fontsize=PAGE_NUMBER_FONT_SIZE)
+            baseline = page.rect.height - PAGE_NUMBER_BOTTOM_OFFSET + PAGE_NUMBER_FONT_SIZE / 3
+            page.insert_text(
+                ((page.rect.width - text_width) / 2, baseline),
+                label,
+                fontname="helv",
+                fontsize=PAGE_NUMBER_FONT_SIZE,
+                color=PAGE_NUMBER_COLOR
+            )
+
     def _markdown_to_html(
         self,
         markdown_content: str,
@@ -75,6 +441,16 @@ class PDFGeneratorService:
             page_html = self._convert_page_to_html(page_data)
             body_html += page_html
 
+        return self._build_html_document(body_html, title, language)
+
+    def _build_html_document(
+        self,
+        body_html: str,
+        title: Optional[str],
+        language: str
+    ) -> str:
+        """Wrap page HTML in a complete HTML document (styles come from RenderContext)"""
+
         # Build complete HTML document
         html_template = f"""
 <!DOCTYPE html>
@@ -82,161 +458,7 @@ class PDFGeneratorService:
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{title or 'Translated Document'}</title>
-    <style>
-        @page {{
-            size: letter;  /* US Letter (8.5" x 11") */
-            margin: 2.5cm 2cm;
-            @top-center {{
-                content: "{title or ''}";
-                font-size: 10pt;
-                color: #666;
-            }}
-            @bottom-center {{
-                content: counter(page);
-                font-size: 10pt;
-                color: #666;
-            }}
-        }}
-
-        body {{
-            font-family: "Noto Sans", "Malgun Gothic", Arial, sans-serif;
-            font-size: 11pt;
-            line-height: 1.6;
-            color: #333;
-        }}
-
-        h1 {{
-            font-size: 24pt;
-            font-weight: bold;
-            margin-top: 20pt;
-            margin-bottom: 12pt;
-            color: #222;
-            page-break-after: avoid;
-        }}
-
-        h2 {{
-            font-size: 18pt;
-            font-weight: bold;
-            margin-top: 16pt;
-            margin-bottom: 10pt;
-            color: #333;
-            page-break-after: avoid;
-        }}
-
-        h3 {{
-            font-size: 14pt;
-            font-weight: bold;
-            margin-top: 12pt;
-            margin-bottom: 8pt;
-            color: #444;
-            page-break-after: avoid;
-        }}
-
-        h4, h5, h6 {{
-            font-size: 12pt;
-            font-weight: bold;
-            margin-top: 10pt;
-            margin-bottom: 6pt;
-            color: #555;
-            page-break-after: avoid;
-        }}
-
-        p {{
-            margin-top: 0;
-            margin-bottom: 10pt;
-            text-align: justify;
-        }}
-
-        ul, ol {{
-            margin-top: 6pt;
-            margin-bottom: 10pt;
-            padding-left: 20pt;
-        }}
-
-        li {{
-            margin-bottom: 4pt;
-        }}
-
-        table {{
-            width: 100%;
-            border-collapse: collapse;
-            margin-top: 10pt;
-            margin-bottom: 10pt;
-            page-break-inside: avoid;
-        }}
-
-        th {{
-            background-color: #f5f5f5;
-            border: 1px solid #ddd;
-            padding: 8pt;
-            text-align: left;
-            font-weight: bold;
-        }}
-
-        td {{
-            border: 1px solid #ddd;
-            padding: 8pt;
-        }}
-
-        code {{
-            background-color: #f5f5f5;
-            padding: 2pt 4pt;
-            border-radius: 3px;
-            font-family: "Courier New", monospace;
-            font-size: 9pt;
-        }}
-
-        pre {{
-            background-color: #f5f5f5;
-            padding: 10pt;
-            border-radius: 5px;
-            overflow-x: auto;
-            page-break-inside: avoid;
-        }}
-
-        pre code {{
-            background-color: transparent;
-            padding: 0;
-        }}
-
-        blockquote {{
-            border-left: 4px solid #ddd;
-            padding-left: 12pt;
-            margin-left: 0;
-            color: #666;
-            font-style: italic;
-        }}
-
-        hr {{
-            border: none;
-            border-top: 1px solid #ddd;
-            margin: 20pt 0;
-        }}
-
-        a {{
-            color: #0066cc;
-            text-decoration: none;
-        }}
-
-        img {{
-            max-width: 100%;
-            height: auto;
-            page-break-inside: avoid;
-        }}
-
-        .page-container {{
-            page-break-after: always;
-        }}
-
-        .page-content {{
-            /* Page content wrapper */
-        }}
-
-        .page-break {{
-            page-break-before: always;
-        }}
-    </style>
+    <title>{html.escape(title or 'Translated Document')}</title>
 </head>
 <body>
     {body_html}
@@ -246,65 +468,50 @@ class PDFGeneratorService:
 
         return html_template
 
-    def _embed_images_as_base64(self, html_content: str, storage_service) -> str:
+    def _make_url_fetcher(self, storage_service):
         """
-        Replace image file paths with Base64 data URIs
+        Build a WeasyPrint url_fetcher that opens storage: URLs as file handles
 
-        Args:
-            html_content: HTML with img tags containing file paths
-            storage_service: Storage service to load image files
-
-        Returns:
-            HTML with embedded Base64 images
+        WeasyPrint reads the image straight from the storage volume (no Base64
+        round trip) and caches it by URL, so an image repeated across pages
+        is decoded once per document. URLs carrying the rendered size
+        (?w=..&h=.. in pt) are served from a copy downsampled to that size;
+        a missing or malformed size falls back to the original image.
         """
-        # Pattern to match img src attributes
-        # Matches: <img ... src="path/to/image.png" ...>
-        img_pattern = r'<img\s+([^>]*\s+)?src=["\']([^"\']+)["\']([^>]*)>'
-
-        def replace_image(match):
-            """Replace single image path with Base64 data URI"""
-            before_src = match.group(1) or ''
-            image_path = match.group(2)
-            after_src = match.group(3) or ''
-
-            # Skip if already a data URI or external URL
-            if image_path.startswith('data:') or image_path.startswith('http'):
-                return match.group(0)
-
-            try:
-                # Load image from storage
-                image_bytes = storage_service.download_file(image_path)
-
-                # Determine MIME type from file extension
-                if image_path.lower().endswith('.png'):
-                    mime_type = 'image/png'
-                elif image_path.lower().endswith(('.jpg', '.jpeg')):
-                    mime_type = 'image/jpeg'
-                elif image_path.lower().endswith('.gif'):
-                    mime_type = 'image/gif'
-                elif image_path.lower().endswith('.webp'):
-                    mime_type = 'image/webp'
+        def url_fetcher(url: str, *args, **kwargs) -> dict:
+            if not url.startswith(STORAGE_URL_SCHEME):
+                return default_url_fetcher(url, *args, **kwargs)
+
+            image_path, _, query = url[len(STORAGE_URL_SCHEME):].partition("?")
+            image_path = unquote(image_path)
+
+            source_path = image_path
+            if query:
+                size = parse_qs(query)
+                try:
+                    width_pt, height_pt = float(size["w"][0]), float(size["h"][0])
+                except (KeyError, IndexError, ValueError):
+                    logger.warning(f"Ignoring malformed image size in {url}")
                 else:
-                    mime_type = 'image/png'  # Default
-
-                # Encode to Base64
-                base64_data = base64.b64encode(image_bytes).decode('utf-8')
-
-                # Create data URI
-                data_uri = f"data:{mime_type};base64,{base64_data}"
-
-                # Rebuild img tag with data URI
-                return f'<img {before_src}src="{data_uri}"{after_src}>'
+                    if width_pt > 0 and height_pt > 0:
+                        image_path = image_derivatives.resolve(storage_service, image_path, width_pt, height_pt)
 
-            except Exception as e:
-                logger.warning(f"Failed to embed image {image_path}: {e}")
-                # Keep original path if embedding fails
-                return match.group(0)
-
-        # Replace all images
-        result = re.sub(img_pattern, replace_image, html_content)
-
-        return result
+            try:
+                file_obj = storage_service.open_file(image_path)
+            except ValueError:
+                if image_path == source_path:
+                    raise
+                # Derivative deleted since it was resolved (storage GC): embed the original
+                image_path = source_path
+                file_obj = storage_service.open_file(image_path)
+
+            return {
+                "file_obj": file_obj,
+                "mime_type": storage_service.sniff_content_type(file_obj, image_path),
+                "redirected_url": url,
+            }
+
+        return url_fetcher
 
     def _split_by_pages(self, markdown_content: str, project_images: list = None) -> list:
         """
@@ -355,19 +562,15 @@ class PDFGeneratorService:
         Returns:
             HTML string for the page
         """
-        import markdown
-
         page_num = page_data['page_number']
         content = page_data['content']
         images = page_data['images']
 
         # Convert markdown to HTML
-        md = markdown.Markdown(extensions=['extra', 'codehilite', 'toc', 'nl2br'])
-        content_html = md.convert(content)
+        content_html = self.context.markdown_to_html(content)
 
-        # Apply image positioning
-        if images:
-            content_html = self._apply_image_positions_for_page(content_html, images)
+        # Apply image positioning and point sources at storage
+        content_html = self._apply_image_positions_for_page(content_html, images)
 
         # Wrap in page container
         page_html = f'''
@@ -381,7 +584,8 @@ class PDFGeneratorService:
 
     def _apply_image_positions_for_page(self, html_content: str, page_images: list) -> str:
         """
-        Apply sizing to images (keep in normal flow, just resize)
+        Apply sizing to images (keep in normal flow, just resize) and rewrite
+        storage paths to storage: URLs for the url_fetcher
 
         Args:
             html_content: HTML content for one page
@@ -391,7 +595,7 @@ class PDFGeneratorService:
             HTML with sized images
         """
         # Create a mapping of storage_path -> ProjectImage
-        image_map = {img.storage_path: img for img in page_images}
+        image_map = {img.storage_path: img for img in page_images or []}
 
         # Pattern to match img tags
         img_pattern = r'<img\s+([^>]*\s+)?src=["\']([^"\']+)["\']([^>]*)>'
@@ -402,41 +606,55 @@ class PDFGeneratorService:
             image_path = match.group(2)
             after_src = match.group(3) or ''
 
+            # Skip if already a data URI or external URL
+            if image_path.startswith(('data:', 'http')):
+                return match.group(0)
+
+            image_url = STORAGE_URL_SCHEME + quote(image_path)
+
             # Find matching ProjectImage
             project_image = image_map.get(image_path)
 
             if project_image and project_image.width:
                 # Use rendered size from PDF
                 # Keep image in normal flow, just resize it
-                style = f'style="width: {project_image.width}pt; height: {project_image.height}pt; display: block; margin: 10pt auto;"'
-                return f'<img {before_src}src="{image_path}"{after_src} {style}>'
+                height = f"height: {project_image.height}pt; " if project_image.height else ""
+                style = f'style="width: {project_image.width}pt; {height}display: block; margin: 10pt auto;"'
+                if project_image.width > 0 and project_image.height and project_image.height > 0:
+                    # Let the url_fetcher embed a copy downsampled to this size
+                    image_url += f"?w={project_image.width}&amp;h={project_image.height}"
+                return f'<img {before_src}src="{image_url}"{after_src} {style}>'
             else:
-                # No size info - return original
-                return match.group(0)
+                # No size info - keep intrinsic size
+                return f'<img {before_src}src="{image_url}"{after_src}>'
 
         # Replace all images
         result = re.sub(img_pattern, replace_with_size, html_content)
 
         return result
 
-    def _html_to_pdf(self, html_content: str) -> bytes:
-        """Convert HTML to PDF using WeasyPrint"""
+    def _html_to_pdf(
+        self,
+        html_content: str,
+        target: BinaryIO,
+        storage_service = None,
+        stylesheets: Optional[List[CSS]] = None
+    ):
+        """
+        Convert HTML to PDF using WeasyPrint, streaming it into target
+        (no in-memory copy of the document)
+        """
 
-        # Create BytesIO buffer
-        pdf_buffer = BytesIO()
+        # Resolve storage: image URLs directly from the storage volume
+        url_fetcher = self._make_url_fetcher(storage_service) if storage_service else default_url_fetcher
 
         # Generate PDF
-        HTML(string=html_content).write_pdf(
-            pdf_buffer,
+        HTML(string=html_content, url_fetcher=url_fetcher).write_pdf(
+            target,
+            stylesheets=stylesheets,
             font_config=self.font_config
         )
 
-        # Get bytes
-        pdf_bytes = pdf_buffer.getvalue()
-        pdf_buffer.close()
-
-        return pdf_bytes
-
 
 # Singleton instance
 pdf_generator = PDFGeneratorService()
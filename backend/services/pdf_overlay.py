@@ -0,0 +1,202 @@
+"""
+PDF Overlay Service - Write translations into the original PDF in place
+Redacts each source text block and inserts the translated text into the same
+box, so layout, vector graphics and images stay exactly as uploaded and no
+HTML layout pass is needed
+"""
+import re
+from dataclasses import dataclass
+from typing import BinaryIO, Dict, List, Optional
+
+import fitz  # PyMuPDF
+from loguru import logger
+
+from services.pdf_generator import pdf_generator
+from services.pdf_optimizer import pdf_optimizer
+
+
+# Built-in PyMuPDF fonts per target language (CJK fonts ship with MuPDF)
+OVERLAY_FONTS: Dict[str, str] = {
+    "ko": "korea",
+    "ja": "japan",
+    "zh": "china-s",
+}
+DEFAULT_OVERLAY_FONT = "helv"
+
+# Font-size fitting: shrink from the source size until the text fits its box
+MIN_FONT_SIZE = 4.0
+FONT_SIZE_STEP = 0.5
+
+
+@dataclass
+class TextBlock:
+    """Source text block on a page"""
+    rect: fitz.Rect
+    line_count: int
+    char_count: int
+    font_size: float
+    color: tuple
+
+
+class PDFOverlayService:
+    """Render translations by overlaying them on the original PDF"""
+
+    def render(
+        self,
+        original_pdf: bytes,
+        markdown_content: str,
+        language: str = "en",
+        target: Optional[BinaryIO] = None
+    ) -> Optional[bytes]:
+        """
+        Replace the text of each page with its translation
+
+        Args:
+            original_pdf: Original uploaded PDF bytes
+            markdown_content: Translated Markdown with # Page N markers
+            language: Target language code (selects the font)
+            target: File to stream the PDF into (returns bytes if omitted)
+
+        Returns:
+            PDF file bytes, or None when written to target
+        """
+        translated_pages = {
+            page_data['page_number']: page_data['content']
+            for page_data in pdf_generator.split_pages(markdown_content)
+        }
+        fontname = OVERLAY_FONTS.get(language, DEFAULT_OVERLAY_FONT)
+
+        try:
+            doc = fitz.open(stream=original_pdf, filetype="pdf")
+        except Exception as e:
+            raise ValueError(f"Cannot open original PDF: {str(e)}")
+
+        try:
+            for page in doc:
+                translation = translated_pages.get(page.number + 1)
+                if translation is not None:
+                    self._overlay_page(page, translation, fontname)
+
+            if target is None:
+                return doc.tobytes(**pdf_optimizer.save_options())
+
+            pdf_optimizer.save(doc, target, before_bytes=len(original_pdf))
+            logger.success(f"Generated overlay PDF ({doc.page_count} pages)")
+
+        except Exception as e:
+            logger.error(f"PDF overlay failed: {str(e)}")
+            raise ValueError(f"PDF generation failed: {str(e)}")
+
+        finally:
+            doc.close()
+
+    def _overlay_page(self, page: "fitz.Page", translation: str, fontname: str):
+        """Redact a page's text blocks and write the translation into them"""
+        blocks = self._text_blocks(page)
+        if not blocks:
+            return
+
+        texts = self._assign_lines(blocks, self._translated_lines(translation))
+
+        for block in blocks:
+            page.add_redact_annot(block.rect)
+        # Remove text only - images and vector graphics stay untouched
+        page.apply_redactions(images=fitz.PDF_REDACT_IMAGE_NONE)
+
+        for block, text in zip(blocks, texts):
+            if text:
+                self._insert_fitted(page, block, text, fontname)
+
+    def _text_blocks(self, page: "fitz.Page") -> List[TextBlock]:
+        """Text blocks in reading order, with their dominant font size and color"""
+        blocks = []
+
+        for block in page.get_text("dict")["blocks"]:
+            if block.get("type") != 0:
+                continue
+
+            lines = [
+                "".join(span["text"] for span in line["spans"])
+                for line in block["lines"]
+            ]
+            lines = [line for line in lines if line.strip()]
+            if not lines:
+                continue
+
+            spans = [span for line in block["lines"] for span in line["spans"] if span["text"].strip()]
+            largest = max(spans, key=lambda span: len(span["text"]))
+
+            blocks.append(TextBlock(
+                rect=fitz.Rect(block["bbox"]),
+                line_count=len(lines),
+                char_count=sum(len(line) for line in lines),
+                font_size=largest["size"],
+                color=fitz.sRGB_to_pdf(largest["color"])
+            ))
+
+        return blocks
+
+    def _translated_lines(self, translation: str) -> List[str]:
+        """Plain-text lines of a translated page (images, tables and separators dropped)"""
+        lines = []
+
+        for line in translation.splitlines():
+            line = line.strip()
+
+            if not line or line == "---" or line.startswith(("![", "|")):
+                continue
+            # Table captions emitted by the parser ("**Table 1:**")
+            if re.fullmatch(r'\*\*[^*]+\*\*', line):
+                continue
+
+            line = re.sub(r'^#+\s*', '', line)
+            line = re.sub(r'(\*\*|__)(.+?)\1', r'\2', line)
+            lines.append(line)
+
+        return lines
+
+    def _assign_lines(self, blocks: List[TextBlock], lines: List[str]) -> List[str]:
+        """
+        Distribute translated lines over the source blocks
+
+        The parser emits one line per source line, and translators keep line
+        structure most of the time, so an equal line count maps 1:1. Otherwise
+        lines are split across blocks in proportion to the source text length.
+        """
+        if sum(block.line_count for block in blocks) == len(lines):
+            counts = [block.line_count for block in blocks]
+        else:
+            total_chars = sum(block.char_count for block in blocks) or 1
+            counts, assigned, seen_chars = [], 0, 0
+            for block in blocks:
+                seen_chars += block.char_count
+                end = round(len(lines) * seen_chars / total_chars)
+                counts.append(end - assigned)
+                assigned = end
+
+        texts, start = [], 0
+        for count in counts:
+            texts.append(" ".join(lines[start:start + count]))
+            start += count
+
+        return texts
+
+    def _insert_fitted(self, page: "fitz.Page", block: TextBlock, text: str, fontname: str):
+        """Insert text into the block's box, shrinking the font until it fits"""
+        font_size = block.font_size
+
+        while font_size >= MIN_FONT_SIZE:
+            # Leave room for the line gap insert_textbox adds below the last line
+            rect = fitz.Rect(block.rect.x0, block.rect.y0, block.rect.x1, block.rect.y1 + font_size * 0.3)
+            if page.insert_textbox(rect, text, fontsize=font_size, fontname=fontname, color=block.color) >= 0:
+                return
+            font_size -= FONT_SIZE_STEP
+
+        # Still too long: let it run down the page rather than drop it
+        logger.debug(f"Overlay text overflows its block on page {page.number + 1}")
+        rect = fitz.Rect(block.rect.x0, block.rect.y0, block.rect.x1, page.rect.y1)
+        page.insert_textbox(rect, text, fontsize=MIN_FONT_SIZE, fontname=fontname, color=block.color)
+
+
+# Singleton instance
+pdf_overlay = PDFOverlayService()
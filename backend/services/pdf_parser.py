@@ -3,7 +3,8 @@ PDF Parser Service - ODIN-AI verified multi-parser strategy
 Uses: pdfplumber (tables) → PyMuPDF (layout) → PyPDF2 (fallback)
 """
 import io
-from typing import Optional, Dict, List, Any
+import re
+from typing import Optional, Dict, List, Any, Iterator, Union
 from dataclasses import dataclass
 import pdfplumber
 import fitz  # PyMuPDF
@@ -11,6 +12,14 @@ import PyPDF2
 from loguru import logger
 
 
+# PDF bytes, or a filesystem path (opened lazily, so the whole file is never
+# loaded into memory)
+PDFSource = Union[bytes, str]
+
+# ![Image](IMAGE_PLACEHOLDER:page_X_img_Y), filled in once images are stored
+IMAGE_PLACEHOLDER_PATTERN = re.compile(r"IMAGE_PLACEHOLDER:(page_\d+_img_\d+)")
+
+
 @dataclass
 class PDFImage:
     """Single PDF image data"""
@@ -50,12 +59,12 @@ class PDFParser:
         # PyMuPDF를 먼저 시도 (이미지 추출 지원)
         self.parsers = ["pymupdf", "pdfplumber", "pypdf2"]
 
-    def parse(self, file_content: bytes, filename: str) -> PDFDocument:
+    def parse(self, file_content: PDFSource, filename: str) -> PDFDocument:
         """
         Parse PDF with automatic fallback strategy
 
         Args:
-            file_content: PDF file bytes
+            file_content: PDF file bytes or filesystem path
             filename: Original filename for logging
 
         Returns:
@@ -81,11 +90,22 @@ class PDFParser:
 
         raise ValueError(f"All parsers failed to parse {filename}")
 
-    def _parse_with_pdfplumber(self, file_content: bytes) -> PDFDocument:
+    @staticmethod
+    def _as_file(file_content: PDFSource):
+        """Path or file object accepted by pdfplumber and PyPDF2"""
+        return io.BytesIO(file_content) if isinstance(file_content, bytes) else file_content
+
+    @staticmethod
+    def _open_fitz(file_content: PDFSource) -> "fitz.Document":
+        if isinstance(file_content, bytes):
+            return fitz.open(stream=file_content, filetype="pdf")
+        return fitz.open(file_content, filetype="pdf")
+
+    def _parse_with_pdfplumber(self, file_content: PDFSource) -> PDFDocument:
         """Parse with pdfplumber (best for tables)"""
         pages_data = []
 
-        with pdfplumber.open(io.BytesIO(file_content)) as pdf:
+        with pdfplumber.open(self._as_file(file_content)) as pdf:
             metadata = pdf.metadata or {}
 
             for page_num, page in enumerate(pdf.pages, start=1):
@@ -120,147 +140,168 @@ class PDFParser:
             parser_used="pdfplumber"
         )
 
-    def _parse_with_pymupdf(self, file_content: bytes) -> PDFDocument:
+    def _parse_with_pymupdf(self, file_content: PDFSource) -> PDFDocument:
         """Parse with PyMuPDF/fitz (best for layout and images)"""
-        pages_data = []
-
-        doc = fitz.open(stream=file_content, filetype="pdf")
+        doc = self._open_fitz(file_content)
         metadata = doc.metadata
 
-        for page_num in range(len(doc)):
-            page = doc[page_num]
+        pages_data = [self._extract_pymupdf_page(doc, page_num) for page_num in range(len(doc))]
 
-            # Extract text with layout preservation
-            text = page.get_text("text")
+        doc.close()
 
-            # Extract tables (basic)
-            tables = []
-            try:
-                tabs = page.find_tables()
-                if tabs:
-                    for table in tabs:
-                        tables.append(table.extract())
-            except Exception as e:
-                logger.debug(f"Table extraction failed on page {page_num + 1}: {e}")
+        return PDFDocument(
+            pages=pages_data,
+            total_pages=len(pages_data),
+            metadata=metadata,
+            parser_used="pymupdf"
+        )
 
-            # Extract images with position info
-            images = []
+    def iter_pages(self, file_content: PDFSource) -> Iterator[PDFPage]:
+        """
+        Parse PDF lazily, one page at a time (PyMuPDF only)
 
-            # Method 1: Try to get image positions from page dict
-            page_dict = page.get_text("dict")
-            image_positions = {}  # Map xref -> bbox
+        Used by the translation pipeline so downstream stages can start
+        working on page 1 while later pages are still being parsed.
 
-            for block in page_dict.get("blocks", []):
-                if block.get("type") == 1:  # Image block
-                    xref = block.get("number")
-                    bbox = block.get("bbox")  # (x0, y0, x1, y1)
-                    if xref and bbox:
-                        image_positions[xref] = bbox
+        Args:
+            file_content: PDF file bytes or filesystem path
 
-            # Method 2: Parse page content stream for image transformation matrices
-            # This handles Form XObjects and images rendered via Do operator
+        Yields:
+            PDFPage for each page in order
+        """
+        doc = self._open_fitz(file_content)
+        try:
+            for page_num in range(len(doc)):
+                yield self._extract_pymupdf_page(doc, page_num)
+        finally:
+            doc.close()
+
+    def _extract_pymupdf_page(self, doc: "fitz.Document", page_num: int) -> PDFPage:
+        """Extract text, tables and images from a single PyMuPDF page"""
+        page = doc[page_num]
+
+        # Extract text with layout preservation
+        text = page.get_text("text")
+
+        # Extract tables (basic)
+        tables = []
+        try:
+            tabs = page.find_tables()
+            if tabs:
+                for table in tabs:
+                    tables.append(table.extract())
+        except Exception as e:
+            logger.debug(f"Table extraction failed on page {page_num + 1}: {e}")
+
+        # Extract images with position info
+        images = []
+
+        # Method 1: Try to get image positions from page dict
+        page_dict = page.get_text("dict")
+        image_positions = {}  # Map xref -> bbox
+
+        for block in page_dict.get("blocks", []):
+            if block.get("type") == 1:  # Image block
+                xref = block.get("number")
+                bbox = block.get("bbox")  # (x0, y0, x1, y1)
+                if xref and bbox:
+                    image_positions[xref] = bbox
+
+        # Method 2: Parse page content stream for image transformation matrices
+        # This handles Form XObjects and images rendered via Do operator
+        try:
+            # Get all image instances with their transformation matrices
+            for item in page.get_image_info():
+                xref = item.get("xref")
+                bbox = item.get("bbox")  # Already has the bbox!
+                if xref and bbox:
+                    image_positions[xref] = bbox
+                    logger.debug(f"Got image position from get_image_info: xref={xref}, bbox={bbox}")
+        except Exception as e:
+            logger.debug(f"get_image_info failed: {e}")
+
+        # Now extract image data
+        image_list = page.get_images(full=True)
+
+        for img_index, img in enumerate(image_list):
             try:
-                # Get all image instances with their transformation matrices
-                for item in page.get_image_info():
-                    xref = item.get("xref")
-                    bbox = item.get("bbox")  # Already has the bbox!
-                    if xref and bbox:
-                        image_positions[xref] = bbox
-                        logger.debug(f"Got image position from get_image_info: xref={xref}, bbox={bbox}")
-            except Exception as e:
-                logger.debug(f"get_image_info failed: {e}")
-
-            # Now extract image data
-            image_list = page.get_images(full=True)
-
-            for img_index, img in enumerate(image_list):
-                try:
-                    xref = img[0]  # Image reference number
-
-                    # First check if image is actually rendered on this page
-                    # get_image_rects returns empty list if image is not rendered
-                    img_rects = page.get_image_rects(xref)
-                    if not img_rects:
-                        # Image is referenced but not rendered on this page - skip it
-                        logger.debug(f"Skipping image xref={xref} (not rendered on page {page_num + 1})")
-                        continue
-
-                    # Extract image data
-                    img_info = doc.extract_image(xref)
-                    image_bytes = img_info["image"]
-                    image_ext = img_info["ext"]  # png, jpeg 등
-
-                    # Get image position from page_dict first
-                    if xref in image_positions:
-                        bbox = image_positions[xref]
-                        position_x = bbox[0]  # x0
-                        position_y = bbox[1]  # y0
-                        img_width = bbox[2] - bbox[0]  # x1 - x0
-                        img_height = bbox[3] - bbox[1]  # y1 - y0
-                        logger.debug(f"Found position for image {img_index} xref={xref}: ({position_x:.1f}, {position_y:.1f})")
-                    else:
-                        # Use get_image_rects (we already checked it's not empty)
-                        rect = img_rects[0]
-                        position_x = rect.x0
-                        position_y = rect.y0
-                        img_width = rect.width
-                        img_height = rect.height
-                        logger.debug(f"Got position from get_image_rects for {img_index}")
-
-                    bbox = (position_x, position_y, position_x + img_width, position_y + img_height)
-
-                    # Use rendered size (bbox size), not intrinsic image size
-                    # This ensures the image displays at the correct size in the PDF
-                    images.append(PDFImage(
-                        image_index=img_index,
-                        image_bytes=image_bytes,
-                        image_type=image_ext.upper(),
-                        width=int(img_width),  # Rendered width from bbox
-                        height=int(img_height),  # Rendered height from bbox
-                        position_x=position_x,
-                        position_y=position_y,
-                        bbox=bbox
-                    ))
-
-                    logger.debug(
-                        f"Extracted image {img_index} from page {page_num + 1}: "
-                        f"{img_info['width']}x{img_info['height']} {image_ext} "
-                        f"at ({position_x:.1f}, {position_y:.1f})"
-                    )
-
-                except Exception as e:
-                    logger.warning(f"Failed to extract image {img_index} from page {page_num + 1}: {e}")
+                xref = img[0]  # Image reference number
+
+                # First check if image is actually rendered on this page
+                # get_image_rects returns empty list if image is not rendered
+                img_rects = page.get_image_rects(xref)
+                if not img_rects:
+                    # Image is referenced but not rendered on this page - skip it
+                    logger.debug(f"Skipping image xref={xref} (not rendered on page {page_num + 1})")
                     continue
 
-            # Page metadata
-            page_metadata = {
-                "width": page.rect.width,
-                "height": page.rect.height,
-                "rotation": page.rotation
-            }
+                # Extract image data
+                img_info = doc.extract_image(xref)
+                image_bytes = img_info["image"]
+                image_ext = img_info["ext"]  # png, jpeg 등
+
+                # Get image position from page_dict first
+                if xref in image_positions:
+                    bbox = image_positions[xref]
+                    position_x = bbox[0]  # x0
+                    position_y = bbox[1]  # y0
+                    img_width = bbox[2] - bbox[0]  # x1 - x0
+                    img_height = bbox[3] - bbox[1]  # y1 - y0
+                    logger.debug(f"Found position for image {img_index} xref={xref}: ({position_x:.1f}, {position_y:.1f})")
+                else:
+                    # Use get_image_rects (we already checked it's not empty)
+                    rect = img_rects[0]
+                    position_x = rect.x0
+                    position_y = rect.y0
+                    img_width = rect.width
+                    img_height = rect.height
+                    logger.debug(f"Got position from get_image_rects for {img_index}")
+
+                bbox = (position_x, position_y, position_x + img_width, position_y + img_height)
+
+                # Use rendered size (bbox size), not intrinsic image size
+                # This ensures the image displays at the correct size in the PDF
+                images.append(PDFImage(
+                    image_index=img_index,
+                    image_bytes=image_bytes,
+                    image_type=image_ext.upper(),
+                    width=int(img_width),  # Rendered width from bbox
+                    height=int(img_height),  # Rendered height from bbox
+                    position_x=position_x,
+                    position_y=position_y,
+                    bbox=bbox
+                ))
 
-            pages_data.append(PDFPage(
-                page_number=page_num + 1,
-                text=text,
-                tables=tables,
-                images=images,
-                metadata=page_metadata
-            ))
+                logger.debug(
+                    f"Extracted image {img_index} from page {page_num + 1}: "
+                    f"{img_info['width']}x{img_info['height']} {image_ext} "
+                    f"at ({position_x:.1f}, {position_y:.1f})"
+                )
 
-        doc.close()
+            except Exception as e:
+                logger.warning(f"Failed to extract image {img_index} from page {page_num + 1}: {e}")
+                continue
 
-        return PDFDocument(
-            pages=pages_data,
-            total_pages=len(pages_data),
-            metadata=metadata,
-            parser_used="pymupdf"
+        # Page metadata
+        page_metadata = {
+            "width": page.rect.width,
+            "height": page.rect.height,
+            "rotation": page.rotation
+        }
+
+        return PDFPage(
+            page_number=page_num + 1,
+            text=text,
+            tables=tables,
+            images=images,
+            metadata=page_metadata
         )
 
-    def _parse_with_pypdf2(self, file_content: bytes) -> PDFDocument:
+    def _parse_with_pypdf2(self, file_content: PDFSource) -> PDFDocument:
         """Parse with PyPDF2 (fallback)"""
         pages_data = []
 
-        pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
+        pdf_reader = PyPDF2.PdfReader(self._as_file(file_content))
         metadata = pdf_reader.metadata or {}
 
         for page_num in range(len(pdf_reader.pages)):
@@ -316,30 +357,45 @@ class PDFParser:
 
         # Process each page
         for page in document.pages:
-            markdown_parts.append(f"# Page {page.page_number}\n")
-
-            # Add images first (if any)
-            if include_images and page.images:
-                for img in page.images:
-                    # Use placeholder that will be replaced with actual storage path later
-                    # Format: ![Image](IMAGE_PLACEHOLDER:page_X_img_Y)
-                    placeholder = f"IMAGE_PLACEHOLDER:page_{page.page_number}_img_{img.image_index}"
-                    img_metadata = f"{img.width}x{img.height} {img.image_type}"
-                    markdown_parts.append(f"![Image {img.image_index + 1} ({img_metadata})]({placeholder})\n")
-
-            # Add text content
-            if page.text:
-                markdown_parts.append(page.text.strip())
-                markdown_parts.append("")  # Empty line
-
-            # Add tables
-            if page.tables:
-                for table_idx, table in enumerate(page.tables, start=1):
-                    markdown_parts.append(f"\n**Table {table_idx}:**\n")
-                    markdown_parts.append(self._table_to_markdown(table))
-                    markdown_parts.append("")
-
-            markdown_parts.append("\n---\n")  # Page separator
+            markdown_parts.append(self.page_to_markdown(page, include_images=include_images))
+
+        return "\n".join(markdown_parts)
+
+    def page_to_markdown(self, page: PDFPage, include_images: bool = True) -> str:
+        """
+        Convert a single PDFPage to Markdown (starting with its # Page N marker)
+
+        Args:
+            page: Parsed PDF page
+            include_images: Whether to include image placeholders (default: True)
+
+        Returns:
+            Markdown formatted string for the page
+        """
+        markdown_parts = [f"# Page {page.page_number}\n"]
+
+        # Add images first (if any)
+        if include_images and page.images:
+            for img in page.images:
+                # Use placeholder that will be replaced with actual storage path later
+                # Format: ![Image](IMAGE_PLACEHOLDER:page_X_img_Y)
+                placeholder = f"IMAGE_PLACEHOLDER:page_{page.page_number}_img_{img.image_index}"
+                img_metadata = f"{img.width}x{img.height} {img.image_type}"
+                markdown_parts.append(f"![Image {img.image_index + 1} ({img_metadata})]({placeholder})\n")
+
+        # Add text content
+        if page.text:
+            markdown_parts.append(page.text.strip())
+            markdown_parts.append("")  # Empty line
+
+        # Add tables
+        if page.tables:
+            for table_idx, table in enumerate(page.tables, start=1):
+                markdown_parts.append(f"\n**Table {table_idx}:**\n")
+                markdown_parts.append(self._table_to_markdown(table))
+                markdown_parts.append("")
+
+        markdown_parts.append("\n---\n")  # Page separator
 
         return "\n".join(markdown_parts)
 
@@ -367,6 +423,9 @@ class PDFParser:
         """
         Replace image placeholders with actual storage paths
 
+        Single pass over the Markdown however many images there are; unmapped
+        placeholders are left as they are.
+
         Args:
             markdown: Markdown content with placeholders
             image_mapping: Dict mapping placeholder keys to storage URLs
@@ -375,11 +434,13 @@ class PDFParser:
         Returns:
             Markdown with placeholders replaced
         """
-        result = markdown
-        for placeholder_key, storage_path in image_mapping.items():
-            placeholder = f"IMAGE_PLACEHOLDER:{placeholder_key}"
-            result = result.replace(placeholder, storage_path)
-        return result
+        if not image_mapping:
+            return markdown
+
+        return IMAGE_PLACEHOLDER_PATTERN.sub(
+            lambda match: image_mapping.get(match.group(1), match.group(0)),
+            markdown
+        )
 
 
 # Singleton instance
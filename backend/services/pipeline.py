@@ -0,0 +1,328 @@
+"""
+Translation Pipeline - Page-streamed parse → translate → render
+Pages flow through bounded queues so the stages overlap: page 1 is translated
+while later pages are still being parsed, and each page's PDF fragment is
+rendered as soon as its translation lands
+"""
+import asyncio
+import functools
+import re
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from uuid import UUID
+
+from loguru import logger
+
+from core.config import settings
+from models.user import SubscriptionPlan
+from services.pdf_parser import PDFSource, pdf_parser
+from services.translator import translator_service
+from services.pdf_generator import pdf_generator
+from services.render_cache import render_cache
+from services.scheduler import translation_scheduler
+from services.jobs import CancellationToken, JobCancelled
+
+# Same marker the parser emits and the generator splits on
+PAGE_MARKER_PATTERN = r'# Page (\d+)'
+
+# Queue sentinel marking the end of a stage's output
+_END = None
+
+
+class RenderFailed(Exception):
+    """Every page was translated but the PDF could not be rendered"""
+
+
+@dataclass
+class PipelinePage:
+    """Single page flowing through the pipeline"""
+    page_number: int
+    markdown_original: str  # Page body without the # Page N marker
+    markdown_translated: Optional[str] = None
+    fragment_path: Optional[str] = None  # Rendered PDF fragment (render=True)
+
+    @property
+    def translated_section(self) -> str:
+        """Translated page with its # Page N marker, as stored in the project"""
+        return f"# Page {self.page_number}\n\n{self.markdown_translated}\n\n"
+
+
+@dataclass
+class PipelineResult:
+    """Output of a pipeline run, pages in document order"""
+    pages: List[PipelinePage]
+    pdf_path: Optional[str] = None  # Stored render (render=True), keyed by render_cache.key
+
+    @property
+    def markdown_original(self) -> str:
+        """Reassembled source Markdown (with # Page N markers)"""
+        return "".join(f"# Page {page.page_number}{page.markdown_original}" for page in self.pages)
+
+    @property
+    def markdown_translated(self) -> str:
+        """Reassembled translated Markdown (with # Page N markers)"""
+        return "".join(page.translated_section for page in self.pages)
+
+
+async def markdown_page_source(markdown: str) -> AsyncIterator[PipelinePage]:
+    """
+    Yield pages from already-parsed Markdown
+
+    Content before the first # Page N marker is dropped, matching
+    PDFGeneratorService._split_by_pages. Markdown without any markers is
+    treated as a single page.
+    """
+    parts = re.split(PAGE_MARKER_PATTERN, markdown)
+
+    if len(parts) == 1:
+        yield PipelinePage(page_number=1, markdown_original=f"\n{markdown}")
+        return
+
+    # parts[1] = page_number, parts[2] = content, parts[3] = page_number, ...
+    for i in range(1, len(parts) - 1, 2):
+        yield PipelinePage(page_number=int(parts[i]), markdown_original=parts[i + 1])
+
+
+async def pdf_page_source(
+    file_content: PDFSource,
+    image_mapping: Optional[Dict[str, str]] = None
+) -> AsyncIterator[PipelinePage]:
+    """
+    Yield pages while the PDF is still being parsed
+
+    Each page is parsed in a worker thread so the event loop (and the
+    downstream stages) keep running between pages.
+
+    Args:
+        file_content: PDF file bytes or filesystem path
+        image_mapping: Placeholder key -> storage path for already-saved images
+    """
+    pages = pdf_parser.iter_pages(file_content)
+
+    while True:
+        page = await asyncio.to_thread(next, pages, None)
+        if page is None:
+            break
+
+        page_markdown = pdf_parser.page_to_markdown(page, include_images=bool(image_mapping))
+        if image_mapping:
+            page_markdown = pdf_parser.replace_image_placeholders(page_markdown, image_mapping)
+
+        marker = f"# Page {page.page_number}"
+        yield PipelinePage(page_number=page.page_number, markdown_original=page_markdown[len(marker):])
+
+
+class TranslationPipeline:
+    """Runs parse, translate and render as concurrent stages joined by bounded queues"""
+
+    def __init__(self, queue_size: Optional[int] = None):
+        # Bounded queues give backpressure: a fast parser cannot run
+        # arbitrarily far ahead of translation and hold every page in memory
+        self.queue_size = queue_size or settings.PIPELINE_QUEUE_SIZE
+
+    async def run(
+        self,
+        source: AsyncIterator[PipelinePage],
+        source_lang: str = "ko",
+        target_lang: str = "en",
+        render: bool = False,
+        title: Optional[str] = None,
+        project_images: list = None,
+        on_page_translated: Optional[Callable[[PipelinePage, int], Awaitable[None]]] = None,
+        on_translated: Optional[Callable[["PipelineResult"], Awaitable[None]]] = None,
+        user_id: Optional[UUID] = None,
+        plan: Optional[SubscriptionPlan] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        project_id: Optional[UUID] = None
+    ) -> PipelineResult:
+        """
+        Stream pages from source through translation (and optionally rendering)
+
+        Args:
+            source: Async iterator of pages (markdown_page_source / pdf_page_source)
+            source_lang: Source language
+            target_lang: Target language
+            render: Whether to render the translated pages to PDF
+            title: Document title for the rendered PDF
+            project_images: List of ProjectImage objects with position info
+            on_page_translated: Callback(page, pages_done) after each page is translated
+            on_translated: Callback(result) once every page is translated, before
+                the remaining fragments are rendered and merged (to persist the
+                translation, so a failed render cannot lose it)
+            user_id: Owner of the job (for per-user scheduling caps)
+            plan: Owner's subscription plan (selects the scheduler lane)
+            cancel_token: Aborts the run (raises JobCancelled) when cancelled
+            project_id: Project the page fragments are cached under (required if render=True)
+
+        Returns:
+            PipelineResult with translated pages (and the stored PDF path if render=True)
+
+        Raises:
+            RenderFailed: A fragment render or the merge failed after every
+                page was translated
+        """
+        if render and project_id is None:
+            raise ValueError("project_id is required to render")
+
+        translate_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        render_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        finished_pages: List[PipelinePage] = []
+        fragment_tasks: Dict[int, asyncio.Task] = {}
+        started_at = time.perf_counter()
+
+        render_page = functools.partial(
+            render_cache.render_page, user_id, project_id, title=title, language=target_lang
+        ) if render else None
+
+        tasks = [
+            asyncio.create_task(self._parse_stage(source, translate_queue)),
+            asyncio.create_task(self._translate_stage(
+                translate_queue, render_queue, source_lang, target_lang, on_page_translated,
+                started_at, user_id, plan, cancel_token
+            )),
+            asyncio.create_task(self._render_stage(
+                render_queue, finished_pages, fragment_tasks, render_page, project_images
+            )),
+        ]
+
+        try:
+            await asyncio.gather(*tasks)
+
+            finished_pages.sort(key=lambda page: page.page_number)
+            result = PipelineResult(pages=finished_pages)
+
+            if on_translated:
+                await on_translated(result)
+
+            if render:
+                try:
+                    fragments = asyncio.gather(*[fragment_tasks[page.page_number] for page in finished_pages])
+                    fragment_paths = await cancel_token.guard(fragments) if cancel_token else await fragments
+
+                    for page, fragment_path in zip(finished_pages, fragment_paths):
+                        page.fragment_path = fragment_path
+
+                    cache_key = render_cache.key(
+                        result.markdown_translated, project_images, title=title, language=target_lang
+                    )
+                    result.pdf_path = await render_cache.merge(
+                        user_id, project_id, fragment_paths, render_cache.path(user_id, project_id, cache_key)
+                    )
+                except JobCancelled:
+                    raise
+                except Exception as e:
+                    raise RenderFailed(str(e)) from e
+
+        except BaseException:
+            # One stage failed (or we were cancelled) - stop the others
+            for task in [*tasks, *fragment_tasks.values()]:
+                task.cancel()
+            await asyncio.gather(*tasks, *fragment_tasks.values(), return_exceptions=True)
+            raise
+
+        logger.info(
+            f"Pipeline finished {len(finished_pages)} pages in "
+            f"{time.perf_counter() - started_at:.2f}s"
+        )
+        return result
+
+    async def _parse_stage(self, source: AsyncIterator[PipelinePage], out_queue: asyncio.Queue):
+        """Pull pages from the source and hand them to translation"""
+        async for page in source:
+            await out_queue.put(page)
+
+        await out_queue.put(_END)
+
+    async def _translate_stage(
+        self,
+        in_queue: asyncio.Queue,
+        out_queue: asyncio.Queue,
+        source_lang: str,
+        target_lang: str,
+        on_page_translated: Optional[Callable[[PipelinePage, int], Awaitable[None]]],
+        started_at: float,
+        user_id: Optional[UUID],
+        plan: Optional[SubscriptionPlan],
+        cancel_token: Optional[CancellationToken]
+    ):
+        """Translate pages in order, carrying context from the previous page"""
+        context = None
+        pages_done = 0
+
+        while True:
+            page = await in_queue.get()
+            if page is _END:
+                break
+
+            translation = self._translate_page(
+                page, source_lang, target_lang, context, user_id, plan, cancel_token
+            )
+            if cancel_token:
+                # Abandons a queued or in-flight provider call as soon as the job is cancelled
+                translated = await cancel_token.guard(translation)
+            else:
+                translated = await translation
+
+            page.markdown_translated = translated.strip()
+            context = translated[-200:] if len(translated) > 200 else translated
+
+            pages_done += 1
+            if pages_done == 1:
+                logger.info(f"First page translated after {time.perf_counter() - started_at:.2f}s")
+
+            if on_page_translated:
+                await on_page_translated(page, pages_done)
+
+            await out_queue.put(page)
+
+        await out_queue.put(_END)
+
+    async def _translate_page(
+        self,
+        page: PipelinePage,
+        source_lang: str,
+        target_lang: str,
+        context: Optional[str],
+        user_id: Optional[UUID],
+        plan: Optional[SubscriptionPlan],
+        cancel_token: Optional[CancellationToken]
+    ) -> str:
+        """Translate one page in a worker thread, holding a scheduler slot"""
+        # Yield the provider between pages so other lanes get their share
+        async with translation_scheduler.slot(user_id, plan):
+            return await asyncio.to_thread(
+                translator_service.translate_markdown,
+                markdown=page.markdown_original,
+                source_lang=source_lang,
+                target_lang=target_lang,
+                chunk_size=2000,
+                context=context,
+                cancel_check=cancel_token.raise_if_cancelled if cancel_token else None
+            )
+
+    async def _render_stage(
+        self,
+        in_queue: asyncio.Queue,
+        finished_pages: List[PipelinePage],
+        fragment_tasks: Dict[int, asyncio.Task],
+        render_page: Optional[Callable[[dict], Awaitable[str]]],
+        project_images: list
+    ):
+        """Start rendering each translated page's PDF fragment as it arrives"""
+        while True:
+            page = await in_queue.get()
+            if page is _END:
+                break
+
+            if render_page:
+                # Split the stored form of the page so the fragment key matches
+                # what a later /generate of the same project computes
+                page_data = pdf_generator.split_pages(page.translated_section, project_images)[0]
+                fragment_tasks[page.page_number] = asyncio.create_task(render_page(page_data))
+
+            finished_pages.append(page)
+
+
+# Singleton instance
+translation_pipeline = TranslationPipeline()
@@ -0,0 +1,292 @@
+"""
+Read Cache - Byte-bounded in-memory LRU in front of storage reads
+Project images and PDFs are read again by every render, merge and preview;
+keeping the hot ones in memory saves the volume (or S3) round trips.
+"""
+import mimetypes
+import threading
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from io import BytesIO
+from typing import BinaryIO, Dict, Iterator, Optional
+
+from loguru import logger
+
+from core.config import settings
+from services.storage import StorageBackend, StorageWrapper, STREAM_CHUNK_SIZE
+
+
+MB = 1024 * 1024
+
+# Content types worth keeping in memory, with the largest object admitted.
+# Everything else (upload parts, metadata, previews served once) bypasses the cache.
+READ_CACHE_ADMISSION: Dict[str, int] = {
+    "image/": 8 * MB,  # Project images and derivatives, fetched by every render
+    "application/pdf": 32 * MB,  # Page fragments (merges) and renders (previews)
+}
+
+# Recent invalidations remembered to check racing reads against; a read that
+# started before the oldest one remembered is not cached
+INVALIDATION_LOG_SIZE = 4096
+
+
+class ReadCache:
+    """
+    Thread-safe LRU of file contents, bounded by total bytes
+
+    Reads racing an invalidation never repopulate stale data: a reader takes
+    a generation before reading from storage and its put() is dropped if
+    its path (or a prefix of it) was invalidated in between. Invalidations
+    of other paths don't affect it.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._generation = 0
+        self._invalidation_log: "deque[tuple]" = deque(maxlen=INVALIDATION_LOG_SIZE)  # (generation, path or prefix, is_prefix)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejected = 0
+        self.invalidations = 0
+
+    def admits(self, path: str, size: Optional[int] = None) -> bool:
+        """Whether path's content type is cached (and size, if known, fits its limit)"""
+        if self.max_bytes <= 0:
+            return False
+
+        content_type = mimetypes.guess_type(path)[0] or ""
+        for prefix, max_object_bytes in READ_CACHE_ADMISSION.items():
+            if content_type.startswith(prefix):
+                # One object may not take more than a quarter of the cache
+                return size is None or size <= min(max_object_bytes, self.max_bytes // 4)
+        return False
+
+    def generation(self) -> int:
+        """Token to pass to put() for content about to be read"""
+        return self._generation
+
+    def get(self, path: str) -> Optional[bytes]:
+        with self._lock:
+            content = self._entries.get(path)
+            if content is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(path)
+            self.hits += 1
+            return content
+
+    def put(self, path: str, content: bytes, generation: int) -> bool:
+        """
+        Cache content read at generation (see generation())
+
+        Returns:
+            True if cached
+        """
+        with self._lock:
+            if not self.admits(path, len(content)):
+                self.rejected += 1
+                return False
+
+            if self._invalidated_since(path, generation):
+                return False
+
+            previous = self._entries.pop(path, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+
+            self._entries[path] = content
+            self._bytes += len(content)
+
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+        return True
+
+    def invalidate(self, path: str):
+        with self._lock:
+            self._log_invalidation(path, is_prefix=False)
+            content = self._entries.pop(path, None)
+            if content is not None:
+                self._bytes -= len(content)
+                self.invalidations += 1
+
+    def invalidate_prefix(self, prefix: str):
+        with self._lock:
+            self._log_invalidation(prefix, is_prefix=True)
+            for path in [path for path in self._entries if path.startswith(prefix)]:
+                self._bytes -= len(self._entries.pop(path))
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._log_invalidation("", is_prefix=True)
+            self._entries.clear()
+            self._bytes = 0
+
+    def _log_invalidation(self, key: str, is_prefix: bool):
+        self._generation += 1
+        self._invalidation_log.append((self._generation, key, is_prefix))
+
+    def _invalidated_since(self, path: str, generation: int) -> bool:
+        """Whether path was invalidated after generation (caller holds the lock)"""
+        if generation == self._generation:
+            return False
+
+        log = self._invalidation_log
+        if not log or log[0][0] > generation + 1:
+            return True  # Older than the log: assume the worst
+
+        for logged, key, is_prefix in reversed(log):
+            if logged <= generation:
+                return False
+            if path.startswith(key) if is_prefix else path == key:
+                return True
+        return False
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "size_mb": round(self._bytes / MB, 1),
+            "max_mb": round(self.max_bytes / MB, 1),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "rejected": self.rejected,
+            "invalidations": self.invalidations,
+        }
+
+
+class CachedStorage(StorageWrapper):
+    """
+    Storage layer serving admitted reads from a ReadCache
+
+    download_file, open_file and read_chunks hit memory for cached paths;
+    every write, move, link and delete made through this process invalidates
+    the paths it touches (and image pack references into them). Files
+    written by other processes (render workers, other nodes) are picked up
+    because those writers only create new content-keyed paths; nothing
+    overwrites an admitted path in place.
+    """
+
+    def __init__(self, backend: StorageBackend, cache: ReadCache):
+        super().__init__(backend)
+        self.cache = cache
+
+    def download_file(self, file_path: str) -> bytes:
+        if not self.cache.admits(file_path):
+            return self.backend.download_file(file_path)
+
+        content = self.cache.get(file_path)
+        if content is not None:
+            return content
+
+        generation = self.cache.generation()
+        content = self.backend.download_file(file_path)
+        self.cache.put(file_path, content, generation)
+        return content
+
+    def save_file(self, file_path: str, file_content: bytes) -> str:
+        try:
+            return self.backend.save_file(file_path, file_content)
+        finally:
+            self._invalidate(file_path)
+
+    @contextmanager
+    def open_for_write(self, file_path: str) -> Iterator[BinaryIO]:
+        try:
+            with self.backend.open_for_write(file_path) as f:
+                yield f
+        finally:
+            self._invalidate(file_path)
+
+    def open_for_append(self, file_path: str) -> BinaryIO:
+        # Appends only add bytes: cached pack references stay valid, and
+        # appended files themselves (upload parts) are never admitted
+        self.cache.invalidate(file_path)
+        return self.backend.open_for_append(file_path)
+
+    def open_file(self, file_path: str) -> BinaryIO:
+        if not self.cache.admits(file_path):
+            return self.backend.open_file(file_path)
+
+        content = self.cache.get(file_path)
+        if content is not None:
+            return BytesIO(content)
+
+        generation = self.cache.generation()
+        f = self.backend.open_file(file_path)
+        f.seek(0, 2)
+        size = f.tell()
+        f.seek(0)
+
+        if not self.cache.admits(file_path, size):
+            return f
+
+        with f:
+            content = f.read()
+        self.cache.put(file_path, content, generation)
+        return BytesIO(content)
+
+    def read_chunks(
+        self,
+        file_path: str,
+        start: int = 0,
+        end: Optional[int] = None,
+        chunk_size: int = STREAM_CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        content = self.cache.get(file_path) if self.cache.admits(file_path) else None
+        if content is None:
+            # Streams (downloads, hashing) don't populate the cache
+            yield from self.backend.read_chunks(file_path, start, end, chunk_size)
+            return
+
+        view = memoryview(content)
+        stop = len(content) if end is None else min(end + 1, len(content))
+        for offset in range(start, stop, chunk_size):
+            yield bytes(view[offset:min(offset + chunk_size, stop)])
+
+    def move_file(self, source_path: str, target_path: str) -> str:
+        try:
+            return self.backend.move_file(source_path, target_path)
+        finally:
+            self._invalidate(source_path)
+            self._invalidate(target_path)
+
+    def link_file(self, source_path: str, target_path: str) -> str:
+        try:
+            return self.backend.link_file(source_path, target_path)
+        finally:
+            self._invalidate(target_path)
+
+    def delete_file(self, file_path: str) -> bool:
+        try:
+            return self.backend.delete_file(file_path)
+        finally:
+            self._invalidate(file_path)
+
+    def delete_folder(self, folder: str) -> bool:
+        try:
+            return self.backend.delete_folder(folder)
+        finally:
+            self.cache.invalidate_prefix(f"{folder.rstrip('/')}/")
+
+    def _invalidate(self, file_path: str):
+        self.cache.invalidate(file_path)
+        self.cache.invalidate_prefix(f"{file_path}#")  # Image pack references into the file
+
+
+def cached(backend: StorageBackend, max_mb: Optional[int] = None) -> CachedStorage:
+    """Wrap a backend with a READ_CACHE_MAX_MB read cache"""
+    max_mb = settings.READ_CACHE_MAX_MB if max_mb is None else max_mb
+    logger.info(f"Storage read cache: {max_mb} MB")
+    return CachedStorage(backend, ReadCache(max_mb * MB))
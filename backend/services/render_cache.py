@@ -0,0 +1,326 @@
+"""
+Render Cache - Rendered PDFs keyed by a hash of their inputs
+Regenerating an unchanged project returns the existing artifact instead of
+re-rendering and uploading another timestamped copy; below that, each page
+is cached as a PDF fragment so an edit only re-renders the pages it touched
+"""
+import asyncio
+import hashlib
+import json
+import time
+from typing import List, Optional, Set
+from uuid import UUID
+
+from loguru import logger
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.project import Project, RenderEngine
+from services.image_derivatives import image_derivatives
+from services.pdf_generator import TEMPLATE_VERSION, pdf_generator
+from services.render_pool import render_pool
+from services.storage import storage_service, async_storage
+
+
+# Renders written this recently are never evicted: they may belong to a
+# concurrent render of the same project that has not committed its URL yet
+RENDER_EVICT_GRACE_SECONDS = 600
+
+# Same for fragments, counted from when a render last wrote or reused them
+# (a long translation can hold fragments for a while before merging them)
+FRAGMENT_EVICT_GRACE_SECONDS = 6 * 3600
+
+class RenderCache:
+    """
+    Content-addressed store for translated PDFs
+
+    Layout:
+        users/{user_id}/translated/{project_id}/{cache_key}.pdf        (documents)
+        users/{user_id}/projects/{project_id}/fragments/{page_key}.pdf (pages)
+
+    Only the newest render per project is kept; older ones are evicted
+    once the new one is committed (renders younger than
+    RENDER_EVICT_GRACE_SECONDS are spared, they may belong to a concurrent
+    render that has not committed yet).
+    Fragments used by the newest render are kept as well, and so are
+    fragments any render wrote or reused within FRAGMENT_EVICT_GRACE_SECONDS
+    (a concurrent render of the project may be about to merge them).
+    """
+
+    def key(
+        self,
+        markdown_content: str,
+        project_images: list = None,
+        title: Optional[str] = None,
+        language: str = "en",
+        engine: str = RenderEngine.HTML.value,
+        original_path: Optional[str] = None
+    ) -> str:
+        """
+        Hash everything that affects the rendered output
+
+        Args:
+            markdown_content: Translated Markdown
+            project_images: List of ProjectImage objects (manifest: path, size, bytes)
+            title: Document title (rendered in the page header)
+            language: Language code
+            engine: RenderEngine value
+            original_path: Original upload (the overlay engine draws on top of it)
+
+        Returns:
+            Hex SHA-256 cache key
+        """
+        image_manifest = [
+            [img.page_number, img.storage_path, img.width, img.height, getattr(img, "file_size", None)]
+            for img in project_images or []
+        ]
+
+        digest = hashlib.sha256()
+        digest.update(json.dumps({
+            "template_version": TEMPLATE_VERSION,
+            "image_dpi": image_derivatives.dpi,
+            "language": language,
+            "title": title,
+            "images": image_manifest,
+            "engine": engine,
+            "original": original_path if engine == RenderEngine.OVERLAY.value else None,
+        }, sort_keys=True).encode())
+        digest.update(markdown_content.encode())
+
+        return digest.hexdigest()
+
+    def fragment_key(
+        self,
+        content: str,
+        page_images: list = None,
+        title: Optional[str] = None,
+        language: str = "en"
+    ) -> str:
+        """
+        Hash everything that affects one rendered page
+
+        The page number is left out (fragments are numbered when merged), so
+        inserting or removing a page does not invalidate the pages after it.
+        """
+        image_manifest = sorted(
+            [img.storage_path, img.width, img.height, getattr(img, "file_size", None)]
+            for img in page_images or []
+        )
+
+        digest = hashlib.sha256()
+        digest.update(json.dumps({
+            "template_version": TEMPLATE_VERSION,
+            "image_dpi": image_derivatives.dpi,
+            "language": language,
+            "title": title,
+            "images": image_manifest,
+        }, sort_keys=True).encode())
+        digest.update(content.encode())
+
+        return digest.hexdigest()
+
+    def folder(self, user_id: UUID, project_id: UUID) -> str:
+        return f"users/{user_id}/translated/{project_id}"
+
+    def path(self, user_id: UUID, project_id: UUID, cache_key: str) -> str:
+        return f"{self.folder(user_id, project_id)}/{cache_key}.pdf"
+
+    def fragment_folder(self, user_id: UUID, project_id: UUID) -> str:
+        return f"users/{user_id}/projects/{project_id}/fragments"
+
+    def get(self, user_id: UUID, project_id: UUID, cache_key: str) -> Optional[str]:
+        """Return the storage path of a cached render, or None on a miss"""
+        pdf_path = self.path(user_id, project_id, cache_key)
+
+        if storage_service.file_exists(pdf_path):
+            logger.info(f"Render cache hit for project {project_id}")
+            return pdf_path
+
+        return None
+
+    async def render_page(
+        self,
+        user_id: UUID,
+        project_id: UUID,
+        page_data: dict,
+        title: Optional[str] = None,
+        language: str = "en"
+    ) -> str:
+        """
+        Return the fragment for one page, rendering it only on a miss
+
+        Args:
+            user_id: Project owner
+            project_id: Project id
+            page_data: Page dict from PDFGeneratorService.split_pages
+            title: Document title
+            language: Language code
+
+        Returns:
+            Storage path of the page's PDF fragment
+        """
+        page_key = self.fragment_key(page_data['content'], page_data['images'], title, language)
+        fragment_path = f"{self.fragment_folder(user_id, project_id)}/{page_key}.pdf"
+
+        if await async_storage.run(self._reuse_fragment, fragment_path):
+            return fragment_path
+
+        return await render_pool.render_fragment(page_data, fragment_path, title=title, language=language)
+
+    async def render_document(
+        self,
+        user_id: UUID,
+        project_id: UUID,
+        cache_key: str,
+        markdown_content: str,
+        project_images: list = None,
+        title: Optional[str] = None,
+        language: str = "en",
+        engine: str = RenderEngine.HTML.value,
+        original_path: Optional[str] = None
+    ) -> str:
+        """
+        Render Markdown to PDF with the project's engine and store it under cache_key
+
+        HTML engine: changed pages are rendered concurrently in the render
+        pool, unchanged pages come from the fragment cache, and the fragments
+        are merged and page-numbered with PyMuPDF.
+        Overlay engine: the translation is written into original_path in one
+        pass (no fragments, the original fixes the page layout).
+
+        The PDF is streamed to storage by the render worker and never held
+        in this process. Callers commit it as pdf_translated_url, then call
+        evict_superseded() to drop the project's older renders.
+
+        Args:
+            cache_key: Key from key()
+
+        Returns:
+            Storage path of the stored render
+        """
+        pdf_path = self.path(user_id, project_id, cache_key)
+
+        if engine == RenderEngine.OVERLAY.value:
+            if not original_path:
+                raise ValueError("Overlay rendering needs the original PDF")
+            await render_pool.overlay_to_pdf(original_path, markdown_content, pdf_path, language=language)
+
+        else:
+            pages_data = pdf_generator.split_pages(markdown_content, project_images)
+
+            fragment_paths = await asyncio.gather(*[
+                self.render_page(user_id, project_id, page_data, title, language)
+                for page_data in pages_data
+            ])
+
+            await self.merge(user_id, project_id, list(fragment_paths), pdf_path)
+
+        return pdf_path
+
+    async def merge(
+        self,
+        user_id: UUID,
+        project_id: UUID,
+        fragment_paths: List[str],
+        output_path: str
+    ) -> str:
+        """Merge fragments in page order into output_path and evict fragments no longer in use"""
+        await render_pool.merge_fragments(fragment_paths, output_path)
+
+        evicted = await async_storage.run(self._evict_fragments, user_id, project_id, set(fragment_paths))
+
+        logger.info(
+            f"Merged {len(fragment_paths)} page fragments for project {project_id} "
+            f"({evicted} stale evicted)"
+        )
+        return output_path
+
+    def _reuse_fragment(self, fragment_path: str) -> bool:
+        """Whether a fragment is cached; hits refresh its mtime so concurrent merges keep it"""
+        if not storage_service.file_exists(fragment_path):
+            return False
+        storage_service.touch_file(fragment_path)
+        return True
+
+    def _evict_fragments(self, user_id: UUID, project_id: UUID, in_use: set) -> int:
+        """Delete fragments not in use and not rendered or reused within FRAGMENT_EVICT_GRACE_SECONDS"""
+        cutoff_ns = (time.time() - FRAGMENT_EVICT_GRACE_SECONDS) * 1e9
+        evicted = 0
+
+        for path in storage_service.list_files(self.fragment_folder(user_id, project_id)):
+            if path in in_use:
+                continue
+            try:
+                if storage_service.file_info(path)["modified_ns"] >= cutoff_ns:
+                    continue  # May be waiting for a concurrent render's merge
+            except ValueError:
+                continue
+            storage_service.delete_file(path)
+            evicted += 1
+
+        return evicted
+
+    async def evict_superseded(
+        self,
+        db: AsyncSession,
+        user_id: UUID,
+        project_id: UUID,
+        keep_path: str,
+        previous_path: Optional[str] = None
+    ):
+        """
+        Delete the project's older renders, once keep_path is committed as its pdf_translated_url
+
+        The URL is read back from the database, so a concurrent render that
+        committed after this one keeps its file.
+
+        Args:
+            keep_path: Render just committed
+            previous_path: pdf_translated_url before this render (evicted if stale)
+        """
+        try:
+            current_path = (await db.execute(
+                select(Project.pdf_translated_url).where(Project.id == project_id)
+            )).scalar_one_or_none()
+
+            await async_storage.run(
+                self.evict_stale, user_id, project_id, {keep_path, current_path}, previous_path
+            )
+        except Exception as e:
+            # The new render is committed; stale ones just wait for the next eviction
+            logger.warning(f"Render eviction failed for project {project_id}: {e}")
+
+    def evict_stale(
+        self,
+        user_id: UUID,
+        project_id: UUID,
+        keep_paths: Set[str],
+        previous_path: Optional[str] = None
+    ):
+        """Delete every render of the project except keep_paths and those still in their grace period"""
+        stale_paths = [
+            path for path in storage_service.list_files(self.folder(user_id, project_id))
+            if path not in keep_paths
+        ]
+
+        # Renders from before the cache lived directly under users/{id}/translated/
+        if previous_path and previous_path not in keep_paths and previous_path not in stale_paths:
+            stale_paths.append(previous_path)
+
+        cutoff_ns = (time.time() - RENDER_EVICT_GRACE_SECONDS) * 1e9
+        evicted = 0
+        for path in stale_paths:
+            try:
+                if storage_service.file_info(path)["modified_ns"] >= cutoff_ns:
+                    continue  # May be a concurrent render about to commit
+            except ValueError:
+                continue  # Already gone
+            storage_service.delete_file(path)
+            evicted += 1
+
+        if evicted:
+            logger.info(f"Evicted {evicted} stale render(s) for project {project_id}")
+
+
+# Singleton instance
+render_cache = RenderCache()
@@ -0,0 +1,214 @@
+"""
+Render Pool - Off-event-loop PDF rendering in worker processes
+WeasyPrint layout is CPU-heavy; running it in a dedicated process pool keeps
+every uvicorn worker responsive while PDFs are generated
+"""
+import asyncio
+import multiprocessing
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional
+
+from loguru import logger
+
+from core.config import settings
+from services.pdf_generator import ImageLayout
+
+
+def _init_worker(memory_limit_mb: int):
+    """Per-process setup: memory cap, then pre-warm fonts and stylesheets"""
+    if memory_limit_mb:
+        import resource
+        limit_bytes = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit_bytes, limit_bytes))
+
+    from services.pdf_generator import pdf_generator
+    pdf_generator.warm_up()
+
+
+def _ping() -> bool:
+    return True
+
+
+def _render_fragment(
+    page_data: dict,
+    title: Optional[str],
+    language: str,
+    fragment_path: str
+) -> str:
+    """Worker entry point: one page → PDF fragment written straight to storage"""
+    from services.pdf_generator import pdf_generator
+    from services.storage import storage_service
+
+    return pdf_generator.render_page_fragment(
+        page_data,
+        title=title,
+        language=language,
+        storage_service=storage_service,
+        output_path=fragment_path
+    )
+
+
+def _merge_fragments(fragment_paths: List[str], output_path: str) -> str:
+    """Worker entry point: fragments → numbered PDF written straight to storage"""
+    from services.pdf_generator import pdf_generator
+    from services.storage import storage_service
+
+    return pdf_generator.merge_fragments(fragment_paths, storage_service, output_path)
+
+
+def _render_overlay(original_path: str, markdown_content: str, language: str, output_path: str) -> str:
+    """Worker entry point: original PDF + translated Markdown → overlaid PDF written straight to storage"""
+    from services.pdf_overlay import pdf_overlay
+    from services.storage import storage_service
+
+    original_pdf = storage_service.download_file(original_path)
+    with storage_service.open_for_write(output_path) as output:
+        pdf_overlay.render(original_pdf, markdown_content, language=language, target=output)
+
+    return output_path
+
+
+class RenderPool:
+    """
+    Async facade over a process pool of pre-warmed WeasyPrint workers
+
+    - Workers are spawned (not forked) so they never inherit the event loop,
+      DB connections or threads of the web process
+    - Each render has a timeout; a stuck or crashed worker pool is torn
+      down and recreated on the next render, and renders that only died
+      with a timed-out neighbour are retried once
+    - RLIMIT_AS caps each worker's address space so one huge document fails
+      its own render instead of OOM-killing the container
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        timeout_seconds: Optional[float] = None,
+        memory_limit_mb: Optional[int] = None
+    ):
+        self.max_workers = max_workers or settings.RENDER_WORKERS
+        self.timeout_seconds = timeout_seconds or settings.RENDER_TIMEOUT_SECONDS
+        self.memory_limit_mb = settings.RENDER_WORKER_MEMORY_MB if memory_limit_mb is None else memory_limit_mb
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Renders queue here rather than inside the executor, so the timeout
+        # only counts time spent on a worker
+        self._slots = asyncio.Semaphore(self.max_workers)
+        self._timed_out: "weakref.WeakSet[ProcessPoolExecutor]" = weakref.WeakSet()
+
+    async def start(self):
+        """Spawn and pre-warm workers ahead of the first request"""
+        executor = self._get_executor()
+        loop = asyncio.get_running_loop()
+        try:
+            await asyncio.gather(*[
+                loop.run_in_executor(executor, _ping) for _ in range(self.max_workers)
+            ])
+            logger.info(f"Render pool ready with {self.max_workers} workers")
+        except Exception as e:
+            logger.warning(f"Render pool warm-up failed: {e}")
+
+    def shutdown(self):
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def render_fragment(
+        self,
+        page_data: dict,
+        fragment_path: str,
+        title: Optional[str] = None,
+        language: str = "en"
+    ) -> str:
+        """
+        Render one page (from PDFGeneratorService.split_pages) to a fragment in a worker process
+
+        Returns:
+            Storage path of the written fragment
+        """
+        page_data = {
+            **page_data,
+            "images": [ImageLayout.from_project_image(img) for img in page_data.get("images", [])],
+        }
+        return await self._run(_render_fragment, page_data, title, language, fragment_path)
+
+    async def merge_fragments(self, fragment_paths: List[str], output_path: str) -> str:
+        """
+        Merge stored fragments into the final, page-numbered PDF in a worker process
+
+        The PDF is written to output_path on the storage volume; only the
+        path crosses the process boundary.
+        """
+        return await self._run(_merge_fragments, fragment_paths, output_path)
+
+    async def overlay_to_pdf(
+        self,
+        original_path: str,
+        markdown_content: str,
+        output_path: str,
+        language: str = "en"
+    ) -> str:
+        """Write translated Markdown into the original PDF (overlay engine) at output_path in a worker process"""
+        return await self._run(_render_overlay, original_path, markdown_content, language, output_path)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.memory_limit_mb,)
+            )
+        return self._executor
+
+    async def _run(self, fn, *args):
+        async with self._slots:
+            return await self._run_now(fn, *args)
+
+    async def _run_now(self, fn, *args):
+        loop = asyncio.get_running_loop()
+
+        for attempt in range(2):
+            executor = self._get_executor()
+
+            try:
+                return await asyncio.wait_for(
+                    loop.run_in_executor(executor, fn, *args),
+                    timeout=self.timeout_seconds
+                )
+            except asyncio.TimeoutError:
+                logger.error(f"PDF render exceeded {self.timeout_seconds}s - restarting render workers")
+                self._reset(executor, timed_out=True)
+                raise ValueError(f"PDF rendering timed out after {self.timeout_seconds}s")
+            except BrokenProcessPool:
+                if attempt == 0 and executor in self._timed_out:
+                    # Collateral of another render's timeout, not this render's fault
+                    logger.warning("Render interrupted by a render worker restart - retrying")
+                    continue
+
+                logger.error("Render worker died (memory cap exceeded?) - restarting render workers")
+                self._reset(executor)
+                raise ValueError("PDF rendering failed: render worker crashed")
+
+    def _reset(self, executor: ProcessPoolExecutor, timed_out: bool = False):
+        """
+        Kill the workers of a stuck/broken pool; the next render starts a fresh one
+
+        Pools killed for a timeout are remembered, so the other renders they
+        were running retry on the fresh pool instead of failing.
+        """
+        if self._executor is executor:
+            self._executor = None
+        if timed_out:
+            self._timed_out.add(executor)
+
+        # ProcessPoolExecutor has no public way to abort a running task
+        for process in list((getattr(executor, "_processes", None) or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Singleton instance
+render_pool = RenderPool()
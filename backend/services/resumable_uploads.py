@@ -0,0 +1,345 @@
+"""
+Resumable Uploads - tus-style chunked uploads that survive dropped connections
+A client creates an upload, PATCHes chunks at explicit offsets and finalizes
+it; after a disconnect it asks for the current offset and continues from
+there instead of re-sending the whole file.
+"""
+import asyncio
+import json
+import tempfile
+import time
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import AsyncIterable, AsyncIterator, BinaryIO, Dict, Optional
+from uuid import UUID
+
+from loguru import logger
+from sqlalchemy import func, select
+
+from core.config import settings
+from core.database import engine
+from services.storage import storage_service, async_storage, UploadTooLarge, STREAM_CHUNK_SIZE
+
+
+UPLOAD_FOLDER = "uploads"
+
+
+class UploadOffsetMismatch(ValueError):
+    """PATCH offset does not match the bytes received so far"""
+
+    def __init__(self, offset: int):
+        super().__init__(f"Upload offset mismatch (server has {offset} bytes)")
+        self.offset = offset
+
+
+class UploadChecksumMismatch(ValueError):
+    """Finalized upload does not match the SHA-256 declared at creation"""
+
+
+class UploadBusy(ValueError):
+    """Another request (possibly on another worker) is writing the upload"""
+
+
+class ResumableUploadService:
+    """
+    Partial uploads kept on the storage volume
+
+    Layout:
+        uploads/{upload_id}/upload.json   (owner, filename, length, sha256, languages)
+        uploads/{upload_id}/upload.part   (bytes received so far)
+
+    The part file's size is the upload offset, so state survives restarts
+    and is shared by every worker on the volume. A PATCH body is received
+    into a node-local temp file at the client's pace; only appending it to
+    the part is serialised across workers (a Postgres advisory lock, with
+    the offset re-checked under it), so slow clients never pin a database
+    connection. Uploads idle for longer than
+    RESUMABLE_UPLOAD_EXPIRY_HOURS are deleted by a background task.
+    """
+
+    def __init__(self, expiry_hours: Optional[int] = None, cleanup_minutes: Optional[int] = None):
+        self.expiry_seconds = (expiry_hours or settings.RESUMABLE_UPLOAD_EXPIRY_HOURS) * 3600
+        self.cleanup_seconds = (cleanup_minutes or settings.RESUMABLE_UPLOAD_CLEANUP_MINUTES) * 60
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._cleanup_task: Optional[asyncio.Task] = None
+
+    async def create(
+        self,
+        user_id: UUID,
+        filename: str,
+        length: int,
+        sha256: Optional[str] = None,
+        source_language: str = "ko",
+        target_language: str = "en"
+    ) -> dict:
+        """
+        Start a new upload
+
+        Args:
+            user_id: Owner
+            filename: Original filename
+            length: Total size in bytes (declared up front)
+            sha256: Expected hex digest, verified at finalize (optional)
+
+        Returns:
+            Upload status dict (see status())
+        """
+        upload_id = uuid.uuid4().hex
+        meta = {
+            "id": upload_id,
+            "user_id": str(user_id),
+            "filename": filename,
+            "length": length,
+            "sha256": sha256.lower() if sha256 else None,
+            "source_language": source_language,
+            "target_language": target_language,
+            "created_at": datetime.utcnow().isoformat(),
+        }
+
+        await async_storage.save_file(self._meta_path(upload_id), json.dumps(meta).encode())
+        await async_storage.save_file(self._part_path(upload_id), b"")
+
+        logger.info(f"Created resumable upload {upload_id} ({filename}, {length} bytes)")
+        return await self.status(user_id, upload_id)
+
+    async def status(self, user_id: UUID, upload_id: str) -> dict:
+        """
+        Current state of an upload
+
+        Returns:
+            Dict with id, filename, length, offset and expires_at
+
+        Raises:
+            ValueError: Unknown upload, or owned by another user
+        """
+        meta = await async_storage.run(self._load, user_id, upload_id)
+        info = await async_storage.file_info(self._part_path(upload_id))
+
+        return {
+            "id": upload_id,
+            "filename": meta["filename"],
+            "length": meta["length"],
+            "offset": info["size"],
+            "expires_at": datetime.utcfromtimestamp(info["modified_ns"] / 1e9 + self.expiry_seconds),
+        }
+
+    async def append(
+        self,
+        user_id: UUID,
+        upload_id: str,
+        offset: int,
+        chunks: AsyncIterable[bytes]
+    ) -> int:
+        """
+        Append a chunk at the given offset
+
+        Args:
+            offset: Client's view of the bytes already received
+            chunks: Request body stream
+
+        Returns:
+            New offset
+
+        Raises:
+            UploadOffsetMismatch: offset is not the current size (client must HEAD and resume)
+            UploadTooLarge: Chunk runs past the declared length
+            UploadBusy: Another worker is appending a chunk at this moment
+        """
+        meta = await async_storage.run(self._load, user_id, upload_id)
+        part_path = self._part_path(upload_id)
+
+        # Turn a stale offset away before reading the body (re-checked under the lock)
+        current = (await async_storage.file_info(part_path))["size"]
+        if offset != current:
+            raise UploadOffsetMismatch(current)
+
+        with tempfile.TemporaryFile() as staged:
+            interrupted = await self._stage(chunks, staged, meta["length"] - current)
+
+            async with self._exclusive(upload_id):
+                current = (await async_storage.file_info(part_path))["size"]
+                if offset != current:
+                    raise UploadOffsetMismatch(current)
+
+                try:
+                    appended = await async_storage.append_stream(part_path, self._read_staged(staged))
+                finally:
+                    # Keeps an active upload from expiring
+                    await async_storage.run(storage_service.touch_file, part_path)
+
+        if interrupted:
+            # Whatever arrived before the disconnect (or the overflow) is kept
+            raise interrupted
+        return current + appended
+
+    async def finalize(self, user_id: UUID, upload_id: str, target_folder: str) -> dict:
+        """
+        Verify a complete upload and move it into target_folder
+
+        Returns:
+            Dict with path, size, sha256, filename and languages (the upload
+            dict expected by ingest_pdf, plus the creation metadata)
+
+        Raises:
+            ValueError: Unknown or incomplete upload
+            UploadChecksumMismatch: Content does not match the declared
+                sha256 (the upload is discarded; the client must start over)
+            UploadBusy: A chunk is still being written
+        """
+        meta = await async_storage.run(self._load, user_id, upload_id)
+
+        async with self._exclusive(upload_id):
+            part_path = self._part_path(upload_id)
+            size = (await async_storage.file_info(part_path))["size"]
+
+            if size != meta["length"]:
+                raise ValueError(f"Upload incomplete: {size} of {meta['length']} bytes received")
+
+            sha256 = await async_storage.hash_file(part_path)
+            if meta["sha256"] and sha256 != meta["sha256"]:
+                await async_storage.run(self._discard, upload_id)
+                raise UploadChecksumMismatch("Upload checksum mismatch")
+
+            path = await async_storage.move_file(part_path, storage_service.unique_path(target_folder, meta["filename"]))
+            await async_storage.run(self._discard, upload_id)
+
+        logger.success(f"Finalized resumable upload {upload_id} -> {path}")
+        return {
+            "path": path,
+            "size": size,
+            "sha256": sha256,
+            "filename": meta["filename"],
+            "source_language": meta["source_language"],
+            "target_language": meta["target_language"],
+        }
+
+    async def abort(self, user_id: UUID, upload_id: str):
+        """Delete an upload and everything received so far"""
+        await async_storage.run(self._load, user_id, upload_id)
+        async with self._exclusive(upload_id):
+            await async_storage.run(self._discard, upload_id)
+        logger.info(f"Aborted resumable upload {upload_id}")
+
+    def start(self):
+        """Start the background cleanup of abandoned uploads"""
+        if self._cleanup_task is None:
+            self._cleanup_task = asyncio.create_task(self._cleanup_loop())
+
+    def shutdown(self):
+        if self._cleanup_task:
+            self._cleanup_task.cancel()
+            self._cleanup_task = None
+
+    def cleanup_expired(self) -> int:
+        """
+        Delete uploads whose part file has not been written to within the expiry window
+
+        Returns:
+            Number of uploads deleted
+        """
+        cutoff_ns = (time.time() - self.expiry_seconds) * 1e9
+        deleted = 0
+
+        for folder in storage_service.list_folders(UPLOAD_FOLDER):
+            upload_id = folder.rsplit("/", 1)[-1]
+            last_write_ns = self._last_write_ns(upload_id)
+
+            lock = self._locks.get(upload_id)
+            if last_write_ns < cutoff_ns and not (lock and lock.locked()):
+                self._discard(upload_id)
+                deleted += 1
+
+        if deleted:
+            logger.info(f"Cleaned up {deleted} abandoned upload(s)")
+        return deleted
+
+    @asynccontextmanager
+    async def _exclusive(self, upload_id: str) -> AsyncIterator[None]:
+        """
+        Hold an upload against every other writer
+
+        Requests in this worker queue on an asyncio.Lock; other workers are
+        turned away with UploadBusy by a session-level advisory lock keyed
+        by the upload id (upload ids are hex, see create()). The lock pins
+        a pooled connection, so hold it only for server-paced work.
+        """
+        async with self._locks.setdefault(upload_id, asyncio.Lock()):
+            lock_key = int(upload_id[:15], 16)
+
+            async with engine.connect() as connection:
+                locked = (await connection.execute(select(func.pg_try_advisory_lock(lock_key)))).scalar()
+                if not locked:
+                    raise UploadBusy("Upload is being written by another request; retry shortly")
+
+                try:
+                    yield
+                finally:
+                    await connection.execute(select(func.pg_advisory_unlock(lock_key)))
+
+    async def _stage(self, chunks: AsyncIterable[bytes], staged: BinaryIO, max_bytes: int) -> Optional[Exception]:
+        """
+        Receive a PATCH body into staged, stopping before max_bytes is exceeded
+
+        Returns:
+            The error that cut the body short (disconnect, UploadTooLarge), or
+            None; the bytes received before it are still to be appended
+        """
+        received = 0
+        try:
+            async for chunk in chunks:
+                if received + len(chunk) > max_bytes:
+                    raise UploadTooLarge(f"Chunk exceeds the remaining {max_bytes - received} bytes")
+
+                await async_storage.run(staged.write, chunk)
+                received += len(chunk)
+        except Exception as e:
+            return e
+
+        return None
+
+    async def _read_staged(self, staged: BinaryIO) -> AsyncIterator[bytes]:
+        await async_storage.run(staged.seek, 0)
+        while chunk := await async_storage.run(staged.read, STREAM_CHUNK_SIZE):
+            yield chunk
+
+    async def _cleanup_loop(self):
+        while True:
+            try:
+                await async_storage.run(self.cleanup_expired)
+            except Exception as e:
+                logger.error(f"Upload cleanup failed: {str(e)}")
+            await asyncio.sleep(self.cleanup_seconds)
+
+    def _last_write_ns(self, upload_id: str) -> int:
+        """mtime of the part file, else of the metadata (mid-create), else 0 (half-deleted)"""
+        for path in (self._part_path(upload_id), self._meta_path(upload_id)):
+            try:
+                return storage_service.file_info(path)["modified_ns"]
+            except ValueError:
+                continue
+        return 0
+
+    def _load(self, user_id: UUID, upload_id: str) -> dict:
+        if not upload_id.isalnum() or not storage_service.file_exists(self._meta_path(upload_id)):
+            raise ValueError("Upload not found")
+
+        meta = json.loads(storage_service.download_file(self._meta_path(upload_id)))
+        if meta["user_id"] != str(user_id):
+            raise ValueError("Upload not found")
+
+        return meta
+
+    def _discard(self, upload_id: str):
+        storage_service.delete_folder(f"{UPLOAD_FOLDER}/{upload_id}")
+        self._locks.pop(upload_id, None)
+
+    def _meta_path(self, upload_id: str) -> str:
+        return f"{UPLOAD_FOLDER}/{upload_id}/upload.json"
+
+    def _part_path(self, upload_id: str) -> str:
+        return f"{UPLOAD_FOLDER}/{upload_id}/upload.part"
+
+
+# Singleton instance
+resumable_uploads = ResumableUploadService()
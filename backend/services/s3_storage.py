@@ -0,0 +1,556 @@
+"""
+S3 Storage Backend - Shared object storage for multi-node deployments
+Works with AWS S3 and S3-compatible servers (MinIO, moto's server mode) via
+S3_ENDPOINT_URL. Selected with STORAGE_BACKEND=s3.
+"""
+import hashlib
+import io
+import mimetypes
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
+
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from loguru import logger
+
+from core.config import settings
+from services.storage import StorageBackend, STREAM_CHUNK_SIZE
+
+
+# S3's minimum size for every multipart part except the last
+MIN_PART_SIZE = 5 * 1024 * 1024
+
+# Objects listed and deleted per request (S3 maximum)
+DELETE_BATCH_SIZE = 1000
+
+MB = 1024 * 1024
+
+# touch_file leaves objects modified more recently than this alone (an
+# in-place copy rewrites the whole object); well below every age-based
+# expiry that relies on touches
+TOUCH_MIN_INTERVAL_SECONDS = 15 * 60
+
+# local_path copies used this recently are never evicted (their caller may
+# not have opened them yet)
+SCRATCH_EVICT_GRACE_SECONDS = 60
+
+
+def _is_not_found(error: ClientError) -> bool:
+    return error.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound")
+
+
+class _AppendWriter:
+    """
+    File-like handle for S3StorageService.open_for_append
+
+    Appended bytes are buffered (spilling to disk) and added to the object
+    in one request on close.
+    """
+
+    def __init__(self, storage: "S3StorageService", file_path: str):
+        self.storage = storage
+        self.file_path = file_path
+        self.buffer = tempfile.SpooledTemporaryFile(max_size=MIN_PART_SIZE, dir=storage.scratch_path)
+        self.closed = False
+
+    def write(self, data: bytes) -> int:
+        return self.buffer.write(data)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+
+        try:
+            self.storage._append(self.file_path, self.buffer)
+        finally:
+            self.buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class S3StorageService(StorageBackend):
+    """
+    S3 storage service
+
+    - One pooled client per process (S3_MAX_POOL_CONNECTIONS), created
+      lazily so render pool workers get their own after spawning
+    - Large uploads, downloads and copies are split into parts transferred
+      in parallel (S3_MULTIPART_*)
+    - Reads stream with ranged GETs; only libraries that open files by path
+      (local_path) get a node-local copy, cached per object version in an
+      LRU bounded by S3_SCRATCH_MAX_MB
+    - Appends copy the existing object server-side (UploadPartCopy), so a
+      resumable upload chunk costs its own size, not the file's
+
+    S3 has no links: link_file is a server-side copy, so the blob store's
+    deduplication saves upload bandwidth but not stored bytes here.
+    """
+
+    def __init__(self, bucket: Optional[str] = None, endpoint_url: Optional[str] = None):
+        self.bucket = bucket or settings.S3_BUCKET_NAME
+        if not self.bucket:
+            raise ValueError("S3_BUCKET_NAME is required for the S3 storage backend")
+
+        self.endpoint_url = endpoint_url or settings.S3_ENDPOINT_URL or None
+        self.scratch_path = Path(settings.S3_SCRATCH_DIR or tempfile.gettempdir()) / "worldflow-s3"
+        self.scratch_path.mkdir(parents=True, exist_ok=True)
+        self.max_scratch_bytes = settings.S3_SCRATCH_MAX_MB * MB
+        self._scratch_bytes: Optional[int] = None  # Lazily measured on first download
+        self._scratch_lock = threading.Lock()
+
+        self.transfer_config = TransferConfig(
+            multipart_threshold=settings.S3_MULTIPART_THRESHOLD_MB * MB,
+            multipart_chunksize=settings.S3_MULTIPART_CHUNK_MB * MB,
+            max_concurrency=settings.S3_MULTIPART_CONCURRENCY,
+            use_threads=True
+        )
+
+        self._client = None
+        self._client_pid = None
+        self._client_lock = threading.Lock()
+
+        logger.info(f"Using S3 storage in bucket {self.bucket}" + (f" at {self.endpoint_url}" if self.endpoint_url else ""))
+
+    @property
+    def client(self):
+        """Shared, thread-safe client (recreated in a new process)"""
+        if self._client is None or self._client_pid != os.getpid():
+            with self._client_lock:
+                if self._client is None or self._client_pid != os.getpid():
+                    self._client = boto3.client(
+                        "s3",
+                        endpoint_url=self.endpoint_url,
+                        region_name=settings.AWS_REGION,
+                        aws_access_key_id=settings.AWS_ACCESS_KEY_ID or None,
+                        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY or None,
+                        config=Config(
+                            max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+                            retries={"max_attempts": 5, "mode": "adaptive"}
+                        )
+                    )
+                    self._client_pid = os.getpid()
+        return self._client
+
+    def upload_file(
+        self,
+        file_content: bytes,
+        filename: str,
+        content_type: str = "application/pdf",
+        folder: str = "uploads"
+    ) -> str:
+        """
+        Upload bytes under a new unique path in folder
+
+        Returns:
+            Relative file path
+        """
+        relative_path = self.unique_path(folder, filename)
+        self._put_bytes(relative_path, file_content, content_type)
+        logger.info(f"Uploaded file to S3: {relative_path}")
+        return relative_path
+
+    def download_file(self, file_path: str) -> bytes:
+        """Whole object as bytes"""
+        try:
+            body = self.client.get_object(Bucket=self.bucket, Key=self._key(file_path))["Body"]
+            try:
+                return body.read()
+            finally:
+                body.close()
+
+        except ClientError as e:
+            if _is_not_found(e):
+                raise ValueError(f"File not found: {file_path}")
+            logger.error(f"Failed to download file: {str(e)}")
+            raise ValueError(f"File download failed: {str(e)}")
+
+    def save_file(self, file_path: str, file_content: bytes) -> str:
+        """Write bytes to an exact path (S3 replaces objects atomically)"""
+        self._put_bytes(file_path, file_content)
+        logger.info(f"Saved file to S3: {file_path}")
+        return file_path
+
+    @contextmanager
+    def open_for_write(self, file_path: str) -> Iterator[BinaryIO]:
+        """
+        Stream a file into S3 at an exact path
+
+        Writes go to a node-local temp file, uploaded (in parallel parts when
+        large) when the block exits cleanly; nothing is stored if it raises.
+        The handle is a real named file, so libraries that save by name work.
+        """
+        key = self._key(file_path)
+        fd, temp_path = tempfile.mkstemp(dir=self.scratch_path, suffix=os.path.splitext(file_path)[1])
+
+        try:
+            with os.fdopen(fd, "w+b") as f:
+                yield f
+
+            self.client.upload_file(
+                temp_path, self.bucket, key,
+                ExtraArgs={"ContentType": self._content_type(file_path)},
+                Config=self.transfer_config
+            )
+        except ClientError as e:
+            raise ValueError(f"File save failed: {str(e)}")
+        finally:
+            Path(temp_path).unlink(missing_ok=True)
+
+    def open_for_append(self, file_path: str) -> BinaryIO:
+        """Handle appending to an object (created if missing); stored on close"""
+        self._key(file_path)
+        return _AppendWriter(self, file_path)
+
+    def open_file(self, file_path: str) -> BinaryIO:
+        """
+        Seekable copy of an object (in memory when small, else a temp file)
+
+        Large objects are fetched with parallel ranged GETs.
+        """
+        buffer = tempfile.SpooledTemporaryFile(max_size=self.transfer_config.multipart_threshold, dir=self.scratch_path)
+
+        try:
+            self.client.download_fileobj(self.bucket, self._key(file_path), buffer, Config=self.transfer_config)
+        except ClientError as e:
+            buffer.close()
+            if _is_not_found(e):
+                raise ValueError(f"File not found: {file_path}")
+            raise ValueError(f"File download failed: {str(e)}")
+
+        buffer.seek(0)
+        return buffer
+
+    def read_chunks(
+        self,
+        file_path: str,
+        start: int = 0,
+        end: Optional[int] = None,
+        chunk_size: int = STREAM_CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        """Stream the object, or bytes start..end (inclusive), with one (ranged) GET"""
+        request = {"Bucket": self.bucket, "Key": self._key(file_path)}
+        if start or end is not None:
+            request["Range"] = f"bytes={start}-{'' if end is None else end}"
+
+        try:
+            response = self.client.get_object(**request)
+        except ClientError as e:
+            if _is_not_found(e):
+                raise ValueError(f"File not found: {file_path}")
+            raise ValueError(f"File download failed: {str(e)}")
+
+        body = response["Body"]
+        try:
+            yield from body.iter_chunks(chunk_size)
+        finally:
+            body.close()
+
+    def local_path(self, file_path: str) -> str:
+        """
+        Node-local copy of an object, for libraries that open files by path
+
+        Copies are named after the object's key and ETag, so a changed
+        object is fetched again and older copies of it are dropped. Hits
+        refresh the copy's mtime; when the copies exceed S3_SCRATCH_MAX_MB
+        the least recently used ones are deleted.
+        """
+        key = self._key(file_path)
+        head = self._head(file_path)
+
+        key_hash = hashlib.sha256(key.encode()).hexdigest()[:32]
+        etag = head["ETag"].strip('"').replace("-", "_")
+        cache_folder = self.scratch_path / "files"
+        cached = cache_folder / f"{key_hash}-{etag}{os.path.splitext(file_path)[1]}"
+
+        try:
+            os.utime(cached)  # Refresh LRU position
+            return str(cached)
+        except FileNotFoundError:
+            pass
+
+        cache_folder.mkdir(parents=True, exist_ok=True)
+        freed = 0
+        for stale in cache_folder.glob(f"{key_hash}-*"):
+            freed += self._unlink_scratch(stale)
+
+        fd, temp_path = tempfile.mkstemp(dir=cache_folder, prefix=".")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                self.client.download_fileobj(self.bucket, key, f, Config=self.transfer_config)
+            os.replace(temp_path, cached)
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+
+        self._account_scratch(cache_folder, head["ContentLength"] - freed)
+        return str(cached)
+
+    def file_exists(self, file_path: str) -> bool:
+        """Check whether an object exists"""
+        try:
+            self._head(file_path)
+            return True
+        except ValueError:
+            return False
+
+    def file_info(self, file_path: str) -> dict:
+        """
+        Size and modification time of an object
+
+        Returns:
+            Dict with size (bytes) and modified_ns (mtime in nanoseconds)
+        """
+        head = self._head(file_path)
+        return {
+            "size": head["ContentLength"],
+            "modified_ns": int(head["LastModified"].timestamp() * 1e9),
+        }
+
+    def list_files(self, folder: str) -> list[str]:
+        """Objects directly inside a folder (prefix)"""
+        return [
+            item["Key"]
+            for page in self._list(folder, delimiter="/")
+            for item in page.get("Contents", [])
+            if not item["Key"].rsplit("/", 1)[-1].startswith(".")
+        ]
+
+    def list_folders(self, folder: str) -> list[str]:
+        """Subfolders (common prefixes) directly inside a folder"""
+        return [
+            prefix["Prefix"].rstrip("/")
+            for page in self._list(folder, delimiter="/")
+            for prefix in page.get("CommonPrefixes", [])
+            if not prefix["Prefix"].rstrip("/").rsplit("/", 1)[-1].startswith(".")
+        ]
+
+    def touch_file(self, file_path: str):
+        """
+        Set an object's LastModified to now (in-place metadata copy)
+
+        S3 can only do this by copying the object onto itself, so objects
+        modified within TOUCH_MIN_INTERVAL_SECONDS are left as they are.
+        """
+        try:
+            key = self._key(file_path)
+            head = self._head(file_path)
+            if time.time() - head["LastModified"].timestamp() < TOUCH_MIN_INTERVAL_SECONDS:
+                return
+
+            self.client.copy_object(
+                Bucket=self.bucket,
+                Key=key,
+                CopySource={"Bucket": self.bucket, "Key": key},
+                MetadataDirective="REPLACE",
+                ContentType=head.get("ContentType", "application/octet-stream"),
+                Metadata=head.get("Metadata", {})
+            )
+        except (ClientError, ValueError) as e:
+            logger.debug(f"Failed to touch file {file_path}: {e}")
+
+    def move_file(self, source_path: str, target_path: str) -> str:
+        """
+        Move an object (server-side copy, then delete)
+
+        Returns:
+            target_path
+        """
+        self._copy(source_path, target_path)
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(source_path))
+
+        logger.info(f"Moved file in S3: {source_path} -> {target_path}")
+        return target_path
+
+    def link_file(self, source_path: str, target_path: str) -> str:
+        """
+        Give target_path source_path's content (server-side copy; no data passes through this node)
+
+        Returns:
+            target_path
+        """
+        self._copy(source_path, target_path)
+        return target_path
+
+    def delete_file(self, file_path: str) -> bool:
+        """Delete an object (S3 does not report whether it existed)"""
+        try:
+            self.client.delete_object(Bucket=self.bucket, Key=self._key(file_path))
+            logger.info(f"Deleted file from S3: {file_path}")
+            return True
+
+        except (ClientError, ValueError) as e:
+            logger.error(f"Failed to delete file: {str(e)}")
+            return False
+
+    def delete_folder(self, folder: str) -> bool:
+        """Delete every object under a folder (False if there were none)"""
+        keys = [
+            item["Key"]
+            for page in self._list(folder)
+            for item in page.get("Contents", [])
+        ]
+
+        for index in range(0, len(keys), DELETE_BATCH_SIZE):
+            self.client.delete_objects(
+                Bucket=self.bucket,
+                Delete={"Objects": [{"Key": key} for key in keys[index:index + DELETE_BATCH_SIZE]], "Quiet": True}
+            )
+
+        if keys:
+            logger.info(f"Deleted folder from S3: {folder} ({len(keys)} objects)")
+        return bool(keys)
+
+    def _append(self, file_path: str, data: BinaryIO):
+        """
+        Add data to the end of an object
+
+        Small objects are rewritten whole; larger ones are combined server-side
+        from a copy part (the existing object) and an upload part (data).
+        """
+        key = self._key(file_path)
+        size = data.seek(0, os.SEEK_END)
+        data.seek(0)
+
+        try:
+            existing = self.file_info(file_path)["size"]
+        except ValueError:
+            existing = 0
+
+        if existing == 0 or existing < MIN_PART_SIZE:
+            with tempfile.SpooledTemporaryFile(max_size=MIN_PART_SIZE * 2, dir=self.scratch_path) as combined:
+                if existing:
+                    self.client.download_fileobj(self.bucket, key, combined)
+                for chunk in iter(lambda: data.read(STREAM_CHUNK_SIZE), b""):
+                    combined.write(chunk)
+                combined.seek(0)
+                self.client.upload_fileobj(combined, self.bucket, key, Config=self.transfer_config)
+            return
+
+        if size == 0:
+            return
+
+        upload_id = self.client.create_multipart_upload(Bucket=self.bucket, Key=key)["UploadId"]
+        try:
+            copied = self.client.upload_part_copy(
+                Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumber=1,
+                CopySource={"Bucket": self.bucket, "Key": key}
+            )
+            appended = self.client.upload_part(
+                Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumber=2, Body=data
+            )
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket, Key=key, UploadId=upload_id,
+                MultipartUpload={"Parts": [
+                    {"PartNumber": 1, "ETag": copied["CopyPartResult"]["ETag"]},
+                    {"PartNumber": 2, "ETag": appended["ETag"]},
+                ]}
+            )
+        except BaseException:
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+            raise
+
+    def _unlink_scratch(self, path: Path) -> int:
+        """Delete a local_path copy; returns its size (0 if already gone)"""
+        try:
+            size = path.stat().st_size
+            path.unlink()
+            return size
+        except FileNotFoundError:
+            return 0
+
+    def _account_scratch(self, cache_folder: Path, added_bytes: int):
+        """Track the size of local_path copies and evict least recently used ones over budget"""
+        with self._scratch_lock:
+            if self._scratch_bytes is not None:
+                self._scratch_bytes += added_bytes
+                if self._scratch_bytes <= self.max_scratch_bytes:
+                    return
+
+            entries = []
+            for path in cache_folder.glob("[!.]*"):
+                try:
+                    info = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((info.st_mtime, info.st_size, path))
+            entries.sort()
+            total = sum(size for _, size, _ in entries)
+
+            # Evict down to 90% so the next few downloads don't rescan
+            target = self.max_scratch_bytes * 0.9
+            recent = time.time() - SCRATCH_EVICT_GRACE_SECONDS
+            evicted = 0
+            for last_used, _, path in entries:
+                if total <= target or last_used > recent:
+                    break
+                total -= self._unlink_scratch(path)
+                evicted += 1
+
+            self._scratch_bytes = total
+            if evicted:
+                logger.info(f"Evicted {evicted} S3 scratch copies (now {total // MB} MB)")
+
+    def _put_bytes(self, file_path: str, file_content: bytes, content_type: Optional[str] = None):
+        try:
+            self.client.upload_fileobj(
+                io.BytesIO(file_content), self.bucket, self._key(file_path),
+                ExtraArgs={"ContentType": content_type or self._content_type(file_path)},
+                Config=self.transfer_config
+            )
+        except ClientError as e:
+            logger.error(f"Failed to save file: {str(e)}")
+            raise ValueError(f"File save failed: {str(e)}")
+
+    def _copy(self, source_path: str, target_path: str):
+        """Managed server-side copy (multipart for large objects)"""
+        try:
+            self.client.copy(
+                {"Bucket": self.bucket, "Key": self._key(source_path)},
+                self.bucket, self._key(target_path),
+                Config=self.transfer_config
+            )
+        except ClientError as e:
+            if _is_not_found(e):
+                raise ValueError(f"File not found: {source_path}")
+            raise ValueError(f"File copy failed: {str(e)}")
+
+    def _head(self, file_path: str) -> dict:
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self._key(file_path))
+        except ClientError as e:
+            if _is_not_found(e):
+                raise ValueError(f"File not found: {file_path}")
+            raise ValueError(f"File lookup failed: {str(e)}")
+
+    def _list(self, folder: str, delimiter: Optional[str] = None):
+        request = {"Bucket": self.bucket, "Prefix": f"{self._key(folder)}/"}
+        if delimiter:
+            request["Delimiter"] = delimiter
+        return self.client.get_paginator("list_objects_v2").paginate(**request)
+
+    @staticmethod
+    def _key(file_path: str) -> str:
+        """Object key of a relative storage path, refusing paths that escape the bucket root"""
+        parts = file_path.strip("/").split("/")
+
+        if not file_path.strip("/") or any(part in ("", ".", "..") for part in parts):
+            raise ValueError(f"Invalid storage path: {file_path}")
+
+        return "/".join(parts)
+
+    @staticmethod
+    def _content_type(file_path: str) -> str:
+        guessed, _ = mimetypes.guess_type(file_path)
+        return guessed or "application/octet-stream"
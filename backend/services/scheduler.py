@@ -0,0 +1,202 @@
+"""
+Translation Scheduler - Priority lanes and fair sharing by subscription plan
+Every provider call acquires a slot here, so a FREE user's 200-page upload
+cannot starve a PRO or ENTERPRISE user's short job
+"""
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Deque, Dict, Optional
+from uuid import UUID
+
+from loguru import logger
+
+from core.config import settings
+from models.user import SubscriptionPlan
+
+
+# Share of provider throughput each lane receives when all lanes are busy
+LANE_WEIGHTS: Dict[SubscriptionPlan, int] = {
+    SubscriptionPlan.FREE: 1,
+    SubscriptionPlan.BASIC: 2,
+    SubscriptionPlan.PRO: 4,
+    SubscriptionPlan.ENTERPRISE: 8,
+}
+
+# Max provider calls a single user may have in flight at once
+USER_CONCURRENCY: Dict[SubscriptionPlan, int] = {
+    SubscriptionPlan.FREE: 1,
+    SubscriptionPlan.BASIC: 1,
+    SubscriptionPlan.PRO: 2,
+    SubscriptionPlan.ENTERPRISE: 4,
+}
+
+# Stride scheduling: a lane's pass advances by STRIDE / weight per grant
+STRIDE = 1_000_000
+
+
+@dataclass
+class _Waiter:
+    """Single queued slot request"""
+    user_id: Optional[UUID]
+    future: asyncio.Future
+    enqueued_at: float
+
+
+@dataclass
+class _Lane:
+    """Per-plan queue with fairness state and metrics"""
+    plan: SubscriptionPlan
+    weight: int
+    waiters: Deque[_Waiter] = field(default_factory=deque)
+    pass_value: int = 0
+    in_flight: int = 0
+    granted_total: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+
+    def stats(self) -> dict:
+        return {
+            "weight": self.weight,
+            "queue_depth": len(self.waiters),
+            "in_flight": self.in_flight,
+            "granted_total": self.granted_total,
+            "avg_wait_seconds": round(self.wait_seconds_total / self.granted_total, 3) if self.granted_total else 0.0,
+            "max_wait_seconds": round(self.wait_seconds_max, 3),
+        }
+
+
+class TranslationScheduler:
+    """
+    Weighted fair scheduler for translation provider calls
+
+    - One priority lane per SubscriptionPlan, served by stride scheduling
+      (higher weight = proportionally more grants, no lane starves)
+    - Per-user concurrency caps, so one user's parallel jobs queue behind
+      each other instead of filling every slot
+    - Global cap on in-flight provider calls (TRANSLATION_MAX_CONCURRENCY)
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None):
+        self.max_concurrency = max_concurrency or settings.TRANSLATION_MAX_CONCURRENCY
+        self.lanes: Dict[SubscriptionPlan, _Lane] = {
+            plan: _Lane(plan=plan, weight=weight) for plan, weight in LANE_WEIGHTS.items()
+        }
+        self.in_flight = 0
+        self.user_in_flight: Dict[Optional[UUID], int] = {}
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        user_id: Optional[UUID] = None,
+        plan: Optional[SubscriptionPlan] = None
+    ) -> AsyncIterator[None]:
+        """
+        Hold one provider slot for the duration of the block
+
+        Usage:
+            async with translation_scheduler.slot(user.id, user.subscription_plan):
+                translated = await asyncio.to_thread(...)
+        """
+        lane = self.lanes[plan or SubscriptionPlan.FREE]
+        await self._acquire(lane, user_id)
+        try:
+            yield
+        finally:
+            self._release(lane, user_id)
+
+    def stats(self) -> dict:
+        """Queue depth, in-flight and wait-time metrics per lane"""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "lanes": {plan.value: lane.stats() for plan, lane in self.lanes.items()},
+        }
+
+    async def _acquire(self, lane: _Lane, user_id: Optional[UUID]):
+        """Enqueue a request in its lane and wait until it is granted"""
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(user_id=user_id, future=loop.create_future(), enqueued_at=time.monotonic())
+
+        if not lane.waiters and lane.in_flight == 0:
+            # Lane was idle: don't let it bank credit from the time it had no work
+            lane.pass_value = max(lane.pass_value, self._virtual_time())
+
+        lane.waiters.append(waiter)
+        self._dispatch()
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted just before cancellation - hand the slot back
+                self._release(lane, user_id)
+            elif waiter in lane.waiters:
+                # Still queued (a dispatch in between may already have dropped it)
+                lane.waiters.remove(waiter)
+            raise
+
+    def _release(self, lane: _Lane, user_id: Optional[UUID]):
+        """Return a slot and grant it to the next eligible waiter"""
+        self.in_flight -= 1
+        lane.in_flight -= 1
+        self.user_in_flight[user_id] -= 1
+        if self.user_in_flight[user_id] == 0:
+            del self.user_in_flight[user_id]
+        self._dispatch()
+
+    def _virtual_time(self) -> int:
+        """Lowest pass among lanes that currently have work"""
+        active = [lane.pass_value for lane in self.lanes.values() if lane.waiters or lane.in_flight]
+        return min(active) if active else 0
+
+    def _next_eligible(self, lane: _Lane) -> Optional[_Waiter]:
+        """
+        First waiter in the lane whose user is under their concurrency cap
+
+        Waiters cancelled while queued (their future is already done, the
+        task has not resumed yet) are dropped instead of granted.
+        """
+        if any(waiter.future.done() for waiter in lane.waiters):
+            lane.waiters = deque(waiter for waiter in lane.waiters if not waiter.future.done())
+
+        user_cap = USER_CONCURRENCY[lane.plan]
+        for waiter in lane.waiters:
+            if self.user_in_flight.get(waiter.user_id, 0) < user_cap:
+                return waiter
+        return None
+
+    def _dispatch(self):
+        """Grant free slots, lowest pass first (ties go to the heavier lane)"""
+        while self.in_flight < self.max_concurrency:
+            candidates = []
+            for lane in self.lanes.values():
+                waiter = self._next_eligible(lane)
+                if waiter:
+                    candidates.append((lane.pass_value, -lane.weight, lane.plan.value, lane, waiter))
+
+            if not candidates:
+                return
+
+            _, _, _, lane, waiter = min(candidates, key=lambda candidate: candidate[:3])
+            lane.waiters.remove(waiter)
+
+            waited = time.monotonic() - waiter.enqueued_at
+            lane.granted_total += 1
+            lane.wait_seconds_total += waited
+            lane.wait_seconds_max = max(lane.wait_seconds_max, waited)
+            lane.pass_value += STRIDE // lane.weight
+            lane.in_flight += 1
+            self.in_flight += 1
+            self.user_in_flight[waiter.user_id] = self.user_in_flight.get(waiter.user_id, 0) + 1
+
+            if waited > 5:
+                logger.debug(f"Scheduler granted {lane.plan.value} slot after {waited:.1f}s wait")
+
+            waiter.future.set_result(None)
+
+
+# Singleton instance
+translation_scheduler = TranslationScheduler()
@@ -1,16 +1,259 @@
 """
-File Storage Service - Local filesystem with Railway volume support
-Uses local storage for development and Railway persistent volume for production
+File Storage Service - Pluggable backends behind one interface
+Local filesystem (development, Railway persistent volume) or S3-compatible
+object storage (AWS, MinIO) for running several nodes against shared files.
+Select with STORAGE_BACKEND.
 """
+import asyncio
+import functools
+import hashlib
 import os
+import shutil
 import uuid
-from typing import Optional
+import mimetypes
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from typing import Optional, AsyncIterable, AsyncIterator, BinaryIO, Callable, ContextManager, Iterator, TypeVar
 from datetime import datetime
 from pathlib import Path
 from loguru import logger
 
+from core.config import settings
 
-class StorageService:
+T = TypeVar("T")
+
+
+# Read size for streamed uploads and downloads
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+
+class UploadTooLarge(ValueError):
+    """Streamed upload exceeded its size limit (nothing was stored)"""
+
+
+class StorageBackend(ABC):
+    """
+    Storage interface used by every service
+
+    Paths are relative, "/"-separated keys ("users/{id}/originals/x.pdf").
+    Missing files raise ValueError. Implementations must be thread-safe:
+    AsyncStorage calls them from a thread pool.
+    """
+
+    @abstractmethod
+    def upload_file(self, file_content: bytes, filename: str, content_type: str = "application/pdf", folder: str = "uploads") -> str:
+        """Store bytes under a new unique path in folder; returns the path"""
+
+    @abstractmethod
+    def download_file(self, file_path: str) -> bytes:
+        """Whole file as bytes"""
+
+    @abstractmethod
+    def save_file(self, file_path: str, file_content: bytes) -> str:
+        """Write bytes to an exact path, replacing it atomically"""
+
+    @abstractmethod
+    def open_for_write(self, file_path: str) -> ContextManager[BinaryIO]:
+        """Context manager yielding a handle whose content appears at file_path on clean exit"""
+
+    @abstractmethod
+    def open_for_append(self, file_path: str) -> BinaryIO:
+        """Handle appending to a file (created if missing); appended bytes are stored on close"""
+
+    @abstractmethod
+    def open_file(self, file_path: str) -> BinaryIO:
+        """Seekable handle for reading (caller closes it)"""
+
+    @abstractmethod
+    def read_chunks(self, file_path: str, start: int = 0, end: Optional[int] = None, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+        """Stream the file, or bytes start..end (inclusive), in chunks"""
+
+    @abstractmethod
+    def local_path(self, file_path: str) -> str:
+        """Filesystem path with the file's content, for libraries that open files themselves"""
+
+    @abstractmethod
+    def file_exists(self, file_path: str) -> bool:
+        """Check whether a stored file exists"""
+
+    @abstractmethod
+    def file_info(self, file_path: str) -> dict:
+        """
+        Dict with size (bytes) and modified_ns (mtime in nanoseconds), plus
+        links (hard links to the content) on backends that have them
+        """
+
+    @abstractmethod
+    def list_files(self, folder: str) -> list[str]:
+        """Files directly inside a folder (empty if it does not exist)"""
+
+    @abstractmethod
+    def list_folders(self, folder: str) -> list[str]:
+        """Subfolders directly inside a folder (empty if it does not exist)"""
+
+    @abstractmethod
+    def touch_file(self, file_path: str):
+        """Set the modification time to now (last-access for LRU caches)"""
+
+    @abstractmethod
+    def move_file(self, source_path: str, target_path: str) -> str:
+        """Move a file; returns target_path"""
+
+    @abstractmethod
+    def link_file(self, source_path: str, target_path: str) -> str:
+        """Make target_path have source_path's content, sharing storage where the backend can"""
+
+    @abstractmethod
+    def delete_file(self, file_path: str) -> bool:
+        """Delete a file (False if it did not exist)"""
+
+    @abstractmethod
+    def delete_folder(self, folder: str) -> bool:
+        """Delete a folder and everything in it (False if it did not exist)"""
+
+    def unwrap(self) -> "StorageBackend":
+        """The underlying backend, below any wrapping layers"""
+        return self
+
+    def reclaim_file(self, file_path: str) -> int:
+        """
+        Delete a file; returns the bytes this frees
+
+        0 if it did not exist, or while other hard links (blob store
+        deduplication) keep its content.
+        """
+        try:
+            info = self.file_info(file_path)
+        except ValueError:
+            return 0
+
+        if not self.delete_file(file_path):
+            return 0
+        return info["size"] if info.get("links", 1) <= 1 else 0
+
+    def unique_path(self, folder: str, filename: str) -> str:
+        """New {timestamp}_{id}{ext} path in folder, keeping filename's extension"""
+        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+        unique_id = str(uuid.uuid4())[:8]
+        file_extension = os.path.splitext(filename)[1]
+        return f"{folder}/{timestamp}_{unique_id}{file_extension}"
+
+    def hash_file(self, file_path: str) -> str:
+        """Hex SHA-256 of a stored file, read in chunks"""
+        digest = hashlib.sha256()
+        for chunk in self.read_chunks(file_path):
+            digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def sniff_content_type(file_obj: BinaryIO, file_path: str = "") -> str:
+        """
+        Detect MIME type from the file's magic bytes, falling back to its extension
+
+        The handle's position is restored after reading the header.
+        """
+        position = file_obj.tell()
+        header = file_obj.read(16)
+        file_obj.seek(position)
+
+        if header.startswith(b'\x89PNG\r\n\x1a\n'):
+            return 'image/png'
+        if header.startswith(b'\xff\xd8\xff'):
+            return 'image/jpeg'
+        if header.startswith((b'GIF87a', b'GIF89a')):
+            return 'image/gif'
+        if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+            return 'image/webp'
+        if header.startswith(b'%PDF-'):
+            return 'application/pdf'
+
+        guessed, _ = mimetypes.guess_type(file_path)
+        return guessed or 'application/octet-stream'
+
+    def get_file_url(self, file_path: str) -> str:
+        """
+        Get file URL
+
+        Args:
+            file_path: Relative file path
+
+        Returns:
+            File path (can be used to download via API)
+        """
+        return f"/api/files/{file_path}"
+
+
+class StorageWrapper(StorageBackend):
+    """
+    Backend that delegates everything to another one
+
+    Base for layers that change a few operations (read cache, image packs);
+    backend-specific attributes (base_path, bucket, ...) read through.
+    """
+
+    def __init__(self, backend: StorageBackend):
+        self.backend = backend
+
+    def unwrap(self) -> StorageBackend:
+        return self.backend.unwrap()
+
+    def upload_file(self, file_content: bytes, filename: str, content_type: str = "application/pdf", folder: str = "uploads") -> str:
+        return self.backend.upload_file(file_content, filename, content_type, folder)
+
+    def download_file(self, file_path: str) -> bytes:
+        return self.backend.download_file(file_path)
+
+    def save_file(self, file_path: str, file_content: bytes) -> str:
+        return self.backend.save_file(file_path, file_content)
+
+    def open_for_write(self, file_path: str) -> ContextManager[BinaryIO]:
+        return self.backend.open_for_write(file_path)
+
+    def open_for_append(self, file_path: str) -> BinaryIO:
+        return self.backend.open_for_append(file_path)
+
+    def open_file(self, file_path: str) -> BinaryIO:
+        return self.backend.open_file(file_path)
+
+    def read_chunks(self, file_path: str, start: int = 0, end: Optional[int] = None, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+        return self.backend.read_chunks(file_path, start, end, chunk_size)
+
+    def local_path(self, file_path: str) -> str:
+        return self.backend.local_path(file_path)
+
+    def file_exists(self, file_path: str) -> bool:
+        return self.backend.file_exists(file_path)
+
+    def file_info(self, file_path: str) -> dict:
+        return self.backend.file_info(file_path)
+
+    def list_files(self, folder: str) -> list[str]:
+        return self.backend.list_files(folder)
+
+    def list_folders(self, folder: str) -> list[str]:
+        return self.backend.list_folders(folder)
+
+    def touch_file(self, file_path: str):
+        self.backend.touch_file(file_path)
+
+    def move_file(self, source_path: str, target_path: str) -> str:
+        return self.backend.move_file(source_path, target_path)
+
+    def link_file(self, source_path: str, target_path: str) -> str:
+        return self.backend.link_file(source_path, target_path)
+
+    def delete_file(self, file_path: str) -> bool:
+        return self.backend.delete_file(file_path)
+
+    def delete_folder(self, folder: str) -> bool:
+        return self.backend.delete_folder(folder)
+
+    def __getattr__(self, name: str):
+        return getattr(self.backend, name)
+
+
+class StorageService(StorageBackend):
     """
     Filesystem storage service
     - Development: ./storage/
@@ -52,11 +295,7 @@ class StorageService:
             Local file path
         """
         try:
-            # Generate unique filename
-            timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-            unique_id = str(uuid.uuid4())[:8]
-            file_extension = os.path.splitext(filename)[1]
-            relative_path = f"{folder}/{timestamp}_{unique_id}{file_extension}"
+            relative_path = self.unique_path(folder, filename)
 
             # Create folder if not exists
             file_path = self.base_path / relative_path
@@ -73,6 +312,77 @@ class StorageService:
             logger.error(f"Failed to upload file: {str(e)}")
             raise ValueError(f"File upload failed: {str(e)}")
 
+    def move_file(self, source_path: str, target_path: str) -> str:
+        """
+        Move a stored file to a new path (atomic rename on the same volume)
+
+        Returns:
+            target_path
+        """
+        source = self._resolve(source_path)
+        target = self._resolve(target_path)
+
+        if not source.is_file():
+            raise ValueError(f"File not found: {source_path}")
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(source, target)
+
+        logger.info(f"Moved file in local storage: {source_path} -> {target_path}")
+        return target_path
+
+    def link_file(self, source_path: str, target_path: str) -> str:
+        """
+        Make target_path share source_path's content (hard link, replacing
+        any existing target atomically); copies if the volume can't link
+
+        Returns:
+            target_path
+        """
+        source = self._resolve(source_path)
+        target = self._resolve(target_path)
+
+        if not source.is_file():
+            raise ValueError(f"File not found: {source_path}")
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = target.with_name(f".{target.name}.{uuid.uuid4().hex[:8]}.tmp")
+
+        try:
+            try:
+                os.link(source, temp_path)
+            except OSError:
+                shutil.copyfile(source, temp_path)
+            os.replace(temp_path, target)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+
+        return target_path
+
+    def delete_folder(self, folder: str) -> bool:
+        """Delete a folder and everything in it (False if it did not exist)"""
+        full_folder = self._resolve(folder)
+
+        if full_folder == self.base_path.resolve() or not full_folder.is_dir():
+            return False
+
+        shutil.rmtree(full_folder, ignore_errors=True)
+        logger.info(f"Deleted folder from local storage: {folder}")
+        return True
+
+    def local_path(self, file_path: str) -> str:
+        """
+        Filesystem path of a stored file, for libraries that open files
+        themselves (lazy, page-at-a-time reads instead of loading bytes)
+        """
+        full_path = self._resolve(file_path)
+
+        if not full_path.is_file():
+            raise ValueError(f"File not found: {file_path}")
+
+        return str(full_path)
+
     def download_file(self, file_path: str) -> bytes:
         """
         Download file from local storage
@@ -92,13 +402,176 @@ class StorageService:
             with open(full_path, 'rb') as f:
                 file_content = f.read()
 
-            logger.info(f"Downloaded file from local storage: {file_path}")
+            logger.debug(f"Downloaded file from local storage: {file_path}")
             return file_content
 
         except Exception as e:
             logger.error(f"Failed to download file: {str(e)}")
             raise ValueError(f"File download failed: {str(e)}")
 
+    def save_file(self, file_path: str, file_content: bytes) -> str:
+        """
+        Write file to an exact (deterministic) path, replacing it atomically
+
+        Args:
+            file_path: Relative file path
+            file_content: File bytes
+
+        Returns:
+            Relative file path
+        """
+        try:
+            with self.open_for_write(file_path) as f:
+                f.write(file_content)
+
+            logger.info(f"Saved file to local storage: {file_path}")
+            return file_path
+
+        except Exception as e:
+            logger.error(f"Failed to save file: {str(e)}")
+            raise ValueError(f"File save failed: {str(e)}")
+
+    @contextmanager
+    def open_for_write(self, file_path: str) -> Iterator[BinaryIO]:
+        """
+        Stream a file into storage at an exact path
+
+        Writes go to a temp file next to the target, which is renamed into
+        place when the block exits cleanly (readers never see a partial file)
+        and discarded if it raises.
+
+        Usage:
+            with storage_service.open_for_write("users/.../out.pdf") as f:
+                document.write_pdf(f)
+        """
+        full_path = self._resolve(file_path)
+        full_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = full_path.with_name(f".{full_path.name}.{uuid.uuid4().hex[:8]}.tmp")
+
+        try:
+            with open(temp_path, 'wb') as f:
+                yield f
+            os.replace(temp_path, full_path)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+
+    def file_exists(self, file_path: str) -> bool:
+        """Check whether a stored file exists"""
+        try:
+            return self._resolve(file_path).is_file()
+        except ValueError:
+            return False
+
+    def file_info(self, file_path: str) -> dict:
+        """
+        Size, modification time and hard link count of a stored file
+
+        Returns:
+            Dict with size (bytes), modified_ns (mtime in nanoseconds) and
+            links (blob store links share one copy of the content)
+        """
+        full_path = self._resolve(file_path)
+
+        if not full_path.is_file():
+            raise ValueError(f"File not found: {file_path}")
+
+        stat = full_path.stat()
+        return {"size": stat.st_size, "modified_ns": stat.st_mtime_ns, "links": stat.st_nlink}
+
+    def list_files(self, folder: str) -> list[str]:
+        """
+        List files directly inside a folder
+
+        Args:
+            folder: Relative folder path
+
+        Returns:
+            Relative file paths (empty if the folder does not exist)
+        """
+        full_folder = self._resolve(folder)
+
+        if not full_folder.is_dir():
+            return []
+
+        return [
+            f"{folder}/{entry.name}"
+            for entry in full_folder.iterdir()
+            if entry.is_file() and not entry.name.startswith('.')
+        ]
+
+    def list_folders(self, folder: str) -> list[str]:
+        """List subfolders directly inside a folder (empty if it does not exist)"""
+        full_folder = self._resolve(folder)
+
+        if not full_folder.is_dir():
+            return []
+
+        return [
+            f"{folder}/{entry.name}"
+            for entry in full_folder.iterdir()
+            if entry.is_dir() and not entry.name.startswith('.')
+        ]
+
+    def touch_file(self, file_path: str):
+        """Set a stored file's modification time to now (used as last-access for LRU caches)"""
+        try:
+            os.utime(self._resolve(file_path))
+        except (OSError, ValueError) as e:
+            logger.debug(f"Failed to touch file {file_path}: {e}")
+
+    def open_file(self, file_path: str) -> BinaryIO:
+        """
+        Open a stored file for streaming reads (caller closes the handle)
+
+        Args:
+            file_path: Relative file path
+
+        Returns:
+            Binary file handle
+        """
+        full_path = self._resolve(file_path)
+
+        if not full_path.is_file():
+            raise ValueError(f"File not found: {file_path}")
+
+        return open(full_path, 'rb')
+
+    def read_chunks(
+        self,
+        file_path: str,
+        start: int = 0,
+        end: Optional[int] = None,
+        chunk_size: int = STREAM_CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        """Stream the file, or bytes start..end (inclusive), in chunks"""
+        with self.open_file(file_path) as f:
+            f.seek(start)
+            remaining = None if end is None else end - start + 1
+
+            while remaining is None or remaining > 0:
+                chunk = f.read(chunk_size if remaining is None else min(chunk_size, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def open_for_append(self, file_path: str) -> BinaryIO:
+        """Open a stored file for appending, creating it (and its folder) if missing"""
+        full_path = self._resolve(file_path)
+        full_path.parent.mkdir(parents=True, exist_ok=True)
+        return open(full_path, 'ab')
+
+    def _resolve(self, file_path: str) -> Path:
+        """Map a relative storage path to disk, refusing paths that escape base_path"""
+        full_path = (self.base_path / file_path).resolve()
+
+        if not full_path.is_relative_to(self.base_path.resolve()):
+            raise ValueError(f"Invalid storage path: {file_path}")
+
+        return full_path
+
     def delete_file(self, file_path: str) -> bool:
         """
         Delete file from local storage
@@ -124,18 +597,209 @@ class StorageService:
             logger.error(f"Failed to delete file: {str(e)}")
             return False
 
-    def get_file_url(self, file_path: str) -> str:
+
+class AsyncStorage:
+    """
+    Async facade over StorageService for code running on the event loop
+
+    Every operation runs on a dedicated pool of STORAGE_IO_THREADS threads:
+    blocking file I/O never stalls the loop, a slow volume sees at most that
+    many operations at once (the rest queue), and storage work can't starve
+    the default executor used for parsing and rasterizing.
+
+    Usage:
+        pdf_bytes = await async_storage.download_file(path)
+        stored = await async_storage.run(render_cache.get, user_id, project_id, key)
+    """
+
+    def __init__(self, storage: StorageBackend, max_workers: Optional[int] = None):
+        self.storage = storage
+        self.max_workers = max_workers or settings.STORAGE_IO_THREADS
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="storage-io")
+
+    async def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """Run any blocking storage-bound callable on the I/O pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def upload_file(self, file_content: bytes, filename: str, content_type: str = "application/pdf", folder: str = "uploads") -> str:
+        return await self.run(self.storage.upload_file, file_content, filename, content_type, folder)
+
+    async def download_file(self, file_path: str) -> bytes:
+        return await self.run(self.storage.download_file, file_path)
+
+    async def save_file(self, file_path: str, file_content: bytes) -> str:
+        return await self.run(self.storage.save_file, file_path, file_content)
+
+    async def delete_file(self, file_path: str) -> bool:
+        return await self.run(self.storage.delete_file, file_path)
+
+    async def file_exists(self, file_path: str) -> bool:
+        return await self.run(self.storage.file_exists, file_path)
+
+    async def file_info(self, file_path: str) -> dict:
+        return await self.run(self.storage.file_info, file_path)
+
+    async def local_path(self, file_path: str) -> str:
+        return await self.run(self.storage.local_path, file_path)
+
+    async def move_file(self, source_path: str, target_path: str) -> str:
+        return await self.run(self.storage.move_file, source_path, target_path)
+
+    async def hash_file(self, file_path: str) -> str:
+        return await self.run(self.storage.hash_file, file_path)
+
+    async def delete_folder(self, folder: str) -> bool:
+        return await self.run(self.storage.delete_folder, folder)
+
+    async def iter_range(
+        self,
+        file_path: str,
+        start: int = 0,
+        end: Optional[int] = None,
+        chunk_size: int = STREAM_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        """
+        Stream a stored file, or the byte range start..end (inclusive), in chunks
+
+        Only one chunk is held in memory at a time, so a download costs the
+        same whatever the file size.
+
+        Args:
+            file_path: Relative file path
+            start: First byte offset
+            end: Last byte offset (inclusive), None for the end of the file
+
+        Raises:
+            ValueError: File not found (before anything is yielded)
+        """
+        chunks = self.storage.read_chunks(file_path, start, end, chunk_size)
+
+        try:
+            while (chunk := await self.run(next, chunks, None)) is not None:
+                yield chunk
+        finally:
+            await self.run(chunks.close)
+
+    @asynccontextmanager
+    async def open_for_write(self, file_path: str) -> AsyncIterator[BinaryIO]:
+        """
+        StorageService.open_for_write with opening and committing (the upload,
+        for object storage) on the I/O pool; the caller offloads its writes
+        """
+        writer = self.storage.open_for_write(file_path)
+        f = await self.run(writer.__enter__)
+
+        try:
+            yield f
+        except BaseException as e:
+            if not await self.run(writer.__exit__, type(e), e, e.__traceback__):
+                raise
+        else:
+            await self.run(writer.__exit__, None, None, None)
+
+    async def save_stream(
+        self,
+        file_path: str,
+        chunks: AsyncIterable[bytes],
+        max_bytes: Optional[int] = None
+    ) -> dict:
+        """
+        Stream chunks into storage at an exact path, hashing as they arrive
+
+        Only one chunk is held in memory at a time, and the file appears
+        atomically (see StorageService.open_for_write) only once fully received.
+
+        Args:
+            file_path: Relative file path
+            chunks: Async iterable of byte chunks (UploadFile reads, request.stream())
+            max_bytes: Abort with UploadTooLarge as soon as more arrive
+
+        Returns:
+            Dict with path, size (bytes) and sha256 (hex digest)
+        """
+        digest = hashlib.sha256()
+        size = 0
+
+        try:
+            async with self.open_for_write(file_path) as f:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if max_bytes is not None and size > max_bytes:
+                        raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+
+                    digest.update(chunk)
+                    await self.run(f.write, chunk)
+
+        except UploadTooLarge:
+            logger.warning(f"Rejected upload to {file_path}: over {max_bytes} bytes")
+            raise
+        except Exception as e:
+            logger.error(f"Failed to stream file: {str(e)}")
+            raise ValueError(f"File upload failed: {str(e)}")
+
+        logger.info(f"Streamed {size} bytes to local storage: {file_path}")
+        return {"path": file_path, "size": size, "sha256": digest.hexdigest()}
+
+    async def append_stream(
+        self,
+        file_path: str,
+        chunks: AsyncIterable[bytes],
+        max_bytes: Optional[int] = None
+    ) -> int:
         """
-        Get file URL (for local development, returns file path)
+        Append streamed chunks to a file (created if missing), for resumable uploads
+
+        Unlike save_stream this is not atomic: every chunk written before a
+        disconnect stays on disk, so the client can resume from there.
 
         Args:
             file_path: Relative file path
+            chunks: Async iterable of byte chunks
+            max_bytes: Raise UploadTooLarge before writing past this many appended bytes
 
         Returns:
-            File path (can be used to download via API)
+            Number of bytes appended
         """
-        return f"/api/files/{file_path}"
+        appended = 0
+
+        f = await self.run(self.storage.open_for_append, file_path)
+
+        try:
+            async for chunk in chunks:
+                if max_bytes is not None and appended + len(chunk) > max_bytes:
+                    raise UploadTooLarge(f"Chunk exceeds the remaining {max_bytes - appended} bytes")
+
+                await self.run(f.write, chunk)
+                appended += len(chunk)
+        finally:
+            await self.run(f.close)  # Object storage uploads the appended bytes here
+
+        return appended
+
+
+def create_storage() -> StorageBackend:
+    """
+    Storage backend selected by STORAGE_BACKEND (local or s3), with image
+    pack references resolved below the read cache
+    """
+    from services.packed_storage import PackedStorage
+    from services.read_cache import cached
+
+    if settings.STORAGE_BACKEND == "s3":
+        from services.s3_storage import S3StorageService  # boto3 is only needed for S3
+        backend = S3StorageService()
+    elif settings.STORAGE_BACKEND == "local":
+        backend = StorageService()
+    else:
+        raise ValueError(f"Unknown STORAGE_BACKEND: {settings.STORAGE_BACKEND}")
+
+    return cached(PackedStorage(backend))
 
 
-# Singleton instance
-storage_service = StorageService()
+# Singleton instances
+storage_service = create_storage()
+async_storage = AsyncStorage(storage_service)
@@ -0,0 +1,420 @@
+"""
+Storage GC - Background sweeper for deleted projects and orphaned files
+Deleting a project only sets deleted_at, and files can outlive their
+rows (a rolled-back upload, a crash between file and row). The sweeper
+removes both in small batches, pausing between batches so live traffic
+keeps the storage pool and the database.
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from loguru import logger
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from core.database import AsyncSessionLocal
+from models.blob import Blob, BlobRef
+from models.project import Project
+from models.project_image import ProjectImage
+from services.blob_store import blob_store, BLOB_FOLDER
+from services.image_derivatives import DERIVATIVE_FOLDER
+from services.packed_storage import parse_pack_ref
+from services.render_cache import render_cache
+from services.storage import storage_service, async_storage
+
+
+# Blob files younger than this are left alone even without a live row: the
+# upload that wrote them may not have committed yet
+ORPHAN_BLOB_GRACE_SECONDS = 3600
+
+USERS_FOLDER = "users"
+
+
+class StorageGarbageCollector:
+    """
+    Periodically reclaim storage nobody can reach any more
+
+    Each sweep:
+        1. Hard-deletes projects soft-deleted more than
+           DELETED_PROJECT_RETENTION_DAYS ago: originals and image packs are
+           released through the blob store, the project's image, fragment
+           and render folders are deleted, then the rows. Downsampled
+           derivatives of its images go too unless its pack is still shared
+           (an identical image in another pack just gets re-derived).
+        2. Deletes originals with no Project or BlobRef row and project and
+           render folders with no Project row, once nothing in them changed
+           for the file grace period (ORPHAN_BLOB_GRACE_SECONDS past the
+           resumable upload expiry: a finalized upload keeps the mtime of
+           its last chunk while it is parsed).
+        3. Deletes blob files with no live Blob row (none, or ref_count 0)
+           older than ORPHAN_BLOB_GRACE_SECONDS.
+
+    Reclaimed bytes only count files whose content is really gone: a
+    deleted path still hard-linked from elsewhere frees nothing.
+
+    Safe alongside live traffic and other sweepers: projects are claimed
+    with FOR UPDATE SKIP LOCKED and are unreachable through the API once
+    deleted, and a blob deleted under a concurrent dedup is not data loss
+    (the linked path keeps its content and the next write of the same bytes
+    re-publishes the blob, see BlobStore).
+    """
+
+    def __init__(
+        self,
+        interval_minutes: Optional[int] = None,
+        retention_days: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        batch_pause_seconds: Optional[float] = None
+    ):
+        self.interval_seconds = (settings.STORAGE_GC_INTERVAL_MINUTES if interval_minutes is None else interval_minutes) * 60
+        self.retention_days = settings.DELETED_PROJECT_RETENTION_DAYS if retention_days is None else retention_days
+        self.batch_size = batch_size or settings.STORAGE_GC_BATCH_SIZE
+        self.batch_pause_seconds = (
+            settings.STORAGE_GC_BATCH_PAUSE_SECONDS if batch_pause_seconds is None else batch_pause_seconds
+        )
+        self.orphan_file_grace_seconds = settings.RESUMABLE_UPLOAD_EXPIRY_HOURS * 3600 + ORPHAN_BLOB_GRACE_SECONDS
+        self._task: Optional[asyncio.Task] = None
+
+        self.last_sweep: Optional[dict] = None
+        self.reclaimed_bytes = 0  # Since startup
+
+    def start(self):
+        """Start sweeping every STORAGE_GC_INTERVAL_MINUTES (0 = disabled)"""
+        if self._task is None and self.interval_seconds > 0:
+            self._task = asyncio.create_task(self._sweep_loop())
+
+    def shutdown(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def sweep(self) -> dict:
+        """
+        Run one full sweep
+
+        Returns:
+            Dict with projects, orphaned files (and folders) and blobs
+            deleted, reclaimed_bytes and seconds
+        """
+        started = time.perf_counter()
+        projects, project_bytes = await self.sweep_deleted_projects()
+        files, file_bytes = await self.sweep_orphan_files()
+        blobs, blob_bytes = await self.sweep_orphan_blobs()
+
+        reclaimed = project_bytes + file_bytes + blob_bytes
+        self.reclaimed_bytes += reclaimed
+        self.last_sweep = {
+            "finished_at": datetime.utcnow().isoformat(),
+            "projects": projects,
+            "files": files,
+            "blobs": blobs,
+            "reclaimed_bytes": reclaimed,
+            "seconds": round(time.perf_counter() - started, 1),
+        }
+
+        if projects or files or blobs:
+            logger.info(
+                f"Storage GC: deleted {projects} project(s), {files} orphaned file(s) or folder(s) "
+                f"and {blobs} orphaned blob(s), reclaimed {reclaimed / 1024 / 1024:.1f} MB"
+            )
+        return self.last_sweep
+
+    async def sweep_deleted_projects(self) -> Tuple[int, int]:
+        """
+        Hard-delete projects past the retention window, batch_size per transaction
+
+        Returns:
+            (projects deleted, bytes reclaimed)
+        """
+        cutoff = datetime.utcnow() - timedelta(days=self.retention_days)
+        deleted = reclaimed = 0
+
+        while True:
+            async with AsyncSessionLocal() as db:
+                projects = (await db.execute(
+                    select(Project)
+                    .where(Project.deleted_at.is_not(None), Project.deleted_at < cutoff)
+                    .order_by(Project.deleted_at)
+                    .limit(self.batch_size)
+                    .with_for_update(skip_locked=True)
+                )).scalars().all()
+
+                for project in projects:
+                    reclaimed += await self._purge_project(db, project)
+                await db.commit()
+
+            deleted += len(projects)
+            if len(projects) < self.batch_size:
+                return deleted, reclaimed
+            await asyncio.sleep(self.batch_pause_seconds)
+
+    async def sweep_orphan_files(self) -> Tuple[int, int]:
+        """
+        Delete originals and project folders without a row, batch_size at a time
+
+        Returns:
+            (files and folders deleted, bytes reclaimed)
+        """
+        deleted = reclaimed = 0
+
+        for user_folder in await async_storage.run(storage_service.list_folders, USERS_FOLDER):
+            originals = await async_storage.run(storage_service.list_files, f"{user_folder}/originals")
+            folders = [
+                folder
+                for parent in ("projects", "translated")
+                for folder in await async_storage.run(storage_service.list_folders, f"{user_folder}/{parent}")
+            ]
+
+            for paths, delete_orphans in ((originals, self._delete_orphan_originals), (folders, self._delete_orphan_folders)):
+                for start in range(0, len(paths), self.batch_size):
+                    batch_deleted, batch_reclaimed = await delete_orphans(paths[start:start + self.batch_size])
+                    deleted += batch_deleted
+                    reclaimed += batch_reclaimed
+                    if batch_deleted:
+                        await asyncio.sleep(self.batch_pause_seconds)
+
+        return deleted, reclaimed
+
+    async def sweep_orphan_blobs(self) -> Tuple[int, int]:
+        """
+        Delete blob files without a live Blob row, batch_size files at a time
+
+        Returns:
+            (blobs deleted, bytes reclaimed)
+        """
+        deleted = reclaimed = 0
+
+        for folder in await async_storage.run(storage_service.list_folders, BLOB_FOLDER):
+            for subfolder in await async_storage.run(storage_service.list_folders, folder):
+                paths = await async_storage.run(storage_service.list_files, subfolder)
+
+                for start in range(0, len(paths), self.batch_size):
+                    batch_deleted, batch_reclaimed = await self._delete_orphans(paths[start:start + self.batch_size])
+                    deleted += batch_deleted
+                    reclaimed += batch_reclaimed
+                    if batch_deleted:
+                        await asyncio.sleep(self.batch_pause_seconds)
+
+        return deleted, reclaimed
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self._task is not None,
+            "reclaimed_mb": round(self.reclaimed_bytes / 1024 / 1024, 1),
+            "last_sweep": self.last_sweep,
+        }
+
+    async def _purge_project(self, db: AsyncSession, project: Project) -> int:
+        """Release a project's files and delete its rows (caller commits); returns bytes reclaimed"""
+        image_paths = (await db.execute(
+            select(ProjectImage.storage_path).where(ProjectImage.project_id == project.id).distinct()
+        )).scalars().all()
+
+        # Packed images share their pack: release it once
+        containers = {path: ref.pack_path if (ref := parse_pack_ref(path)) else path for path in image_paths}
+        paths = {path for path in [project.original_file_url, *containers.values()] if path}
+
+        # Derivatives are named after their source image's hash; take them before the images go
+        image_hashes = await async_storage.run(self._hash_files, image_paths)
+        blob_shas = dict((await db.execute(
+            select(BlobRef.path, BlobRef.sha256).where(BlobRef.path.in_(paths))
+        )).all())
+
+        reclaimed = 0
+        for path in paths:
+            reclaimed += await blob_store.release(db, path)
+
+        # Packs deduplicated with a live project keep their derivatives
+        live_shas = set((await db.execute(
+            select(Blob.sha256).where(Blob.sha256.in_(set(blob_shas.values())), Blob.ref_count > 0)
+        )).scalars().all())
+        gone_hashes = {
+            image_hashes[path] for path in image_hashes
+            if blob_shas.get(containers[path]) not in live_shas
+        }
+
+        folders = [
+            f"users/{project.user_id}/projects/{project.id}",  # Images, fragments
+            render_cache.folder(project.user_id, project.id),
+        ]
+        reclaimed += await async_storage.run(self._delete_folders, folders, project.pdf_translated_url)
+        reclaimed += await async_storage.run(self._delete_derivatives, gone_hashes)
+
+        # ProjectImage rows cascade; usage logs keep their history (project_id SET NULL)
+        await db.execute(delete(Project).where(Project.id == project.id))
+
+        logger.debug(f"Purged project {project.id} (deleted {project.deleted_at:%Y-%m-%d})")
+        return reclaimed
+
+    def _hash_files(self, paths: Iterable[str]) -> Dict[str, str]:
+        """SHA-256 per path (pack references hash their own bytes); missing files are skipped"""
+        hashes = {}
+        for path in paths:
+            try:
+                hashes[path] = storage_service.hash_file(path)
+            except ValueError:
+                continue
+        return hashes
+
+    def _delete_derivatives(self, source_hashes: Iterable[str]) -> int:
+        """Delete downsampled copies of the given source images; returns bytes reclaimed"""
+        by_shard: Dict[str, List[str]] = {}
+        for source_hash in source_hashes:
+            by_shard.setdefault(source_hash[:2], []).append(f"{source_hash}_")
+
+        reclaimed = 0
+        for shard, prefixes in by_shard.items():
+            for path in storage_service.list_files(f"{DERIVATIVE_FOLDER}/{shard}"):
+                if path.rsplit("/", 1)[-1].startswith(tuple(prefixes)):
+                    reclaimed += storage_service.reclaim_file(path)
+        return reclaimed
+
+    def _delete_folders(self, folders: List[str], legacy_render: Optional[str]) -> int:
+        """Delete folders (and a render from before per-project render folders); returns bytes reclaimed"""
+        reclaimed = 0
+
+        if legacy_render and not any(legacy_render.startswith(f"{folder}/") for folder in folders):
+            reclaimed += storage_service.reclaim_file(legacy_render)
+
+        for folder in folders:
+            reclaimed += self._folder_size(folder)
+            storage_service.delete_folder(folder)
+
+        return reclaimed
+
+    def _folder_size(self, folder: str) -> int:
+        """Bytes deleting folder would free (files hard-linked from elsewhere free nothing)"""
+        return (
+            sum(self._size(path) for path in storage_service.list_files(folder))
+            + sum(self._folder_size(subfolder) for subfolder in storage_service.list_folders(folder))
+        )
+
+    def _size(self, path: str) -> int:
+        try:
+            info = storage_service.file_info(path)
+        except ValueError:
+            return 0  # Deleted concurrently
+        return info["size"] if info.get("links", 1) <= 1 else 0
+
+    def _last_modified_ns(self, folder: str) -> int:
+        """Newest mtime of anything in folder (0 if empty)"""
+        newest = 0
+        for path in storage_service.list_files(folder):
+            try:
+                newest = max(newest, storage_service.file_info(path)["modified_ns"])
+            except ValueError:
+                continue
+        for subfolder in storage_service.list_folders(folder):
+            newest = max(newest, self._last_modified_ns(subfolder))
+        return newest
+
+    async def _delete_orphan_originals(self, paths: List[str]) -> Tuple[int, int]:
+        """Delete the originals among paths no project or blob reference names; returns (deleted, bytes reclaimed)"""
+        async with AsyncSessionLocal() as db:
+            known = set((await db.execute(
+                select(Project.original_file_url).where(Project.original_file_url.in_(paths))
+            )).scalars().all())
+            known.update((await db.execute(
+                select(BlobRef.path).where(BlobRef.path.in_(paths))
+            )).scalars().all())
+
+        orphans = [path for path in paths if path not in known]
+        if not orphans:
+            return 0, 0
+
+        deleted = await async_storage.run(self._delete_if_old, orphans, self.orphan_file_grace_seconds)
+        return len(deleted), sum(deleted.values())
+
+    async def _delete_orphan_folders(self, folders: List[str]) -> Tuple[int, int]:
+        """Delete the project and render folders among folders without a Project row; returns (deleted, bytes reclaimed)"""
+        project_ids = {}
+        for folder in folders:
+            try:
+                project_ids[UUID(folder.rsplit("/", 1)[-1])] = folder
+            except ValueError:
+                continue  # Not a project folder
+
+        if not project_ids:
+            return 0, 0
+
+        async with AsyncSessionLocal() as db:
+            known = set((await db.execute(
+                select(Project.id).where(Project.id.in_(list(project_ids)))
+            )).scalars().all())
+
+        orphans = [folder for project_id, folder in project_ids.items() if project_id not in known]
+        if not orphans:
+            return 0, 0
+
+        deleted = await async_storage.run(self._delete_folders_if_old, orphans)
+        return len(deleted), sum(deleted.values())
+
+    def _delete_folders_if_old(self, folders: List[str]) -> dict:
+        """Delete folders nothing in which changed within the file grace period; returns {folder: bytes reclaimed}"""
+        cutoff_ns = (time.time() - self.orphan_file_grace_seconds) * 1e9
+        deleted = {}
+
+        for folder in folders:
+            if self._last_modified_ns(folder) >= cutoff_ns:
+                continue  # An ingest or render may still be writing it
+
+            deleted[folder] = self._folder_size(folder)
+            storage_service.delete_folder(folder)
+            logger.debug(f"Deleted orphaned folder {folder}")
+
+        return deleted
+
+    async def _delete_orphans(self, paths: List[str]) -> Tuple[int, int]:
+        """Delete the blobs among paths without a live row; returns (deleted, bytes reclaimed)"""
+        paths_by_sha = {path.rsplit("/", 1)[-1]: path for path in paths}
+
+        async with AsyncSessionLocal() as db:
+            live = set((await db.execute(
+                select(Blob.sha256).where(Blob.sha256.in_(list(paths_by_sha)), Blob.ref_count > 0)
+            )).scalars().all())
+
+            orphans = [path for sha, path in paths_by_sha.items() if sha not in live]
+            if not orphans:
+                return 0, 0
+
+            deleted = await async_storage.run(self._delete_if_old, orphans, ORPHAN_BLOB_GRACE_SECONDS)
+            if deleted:
+                # Drop leftover ref_count 0 rows of the deleted files (a concurrent
+                # dedup reviving one keeps it, and re-publishes the file)
+                deleted_shas = [path.rsplit("/", 1)[-1] for path in deleted]
+                await db.execute(delete(Blob).where(Blob.sha256.in_(deleted_shas), Blob.ref_count <= 0))
+                await db.commit()
+
+        return len(deleted), sum(deleted.values())
+
+    def _delete_if_old(self, paths: List[str], grace_seconds: float) -> dict:
+        """Delete files last modified before the grace period; returns {path: bytes reclaimed} of those deleted"""
+        cutoff_ns = (time.time() - grace_seconds) * 1e9
+        deleted = {}
+
+        for path in paths:
+            try:
+                info = storage_service.file_info(path)
+            except ValueError:
+                continue
+
+            if info["modified_ns"] < cutoff_ns and storage_service.delete_file(path):
+                deleted[path] = info["size"] if info.get("links", 1) <= 1 else 0
+
+        return deleted
+
+    async def _sweep_loop(self):
+        while True:
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"Storage GC failed: {str(e)}")
+            await asyncio.sleep(self.interval_seconds)
+
+
+# Singleton instance
+storage_gc = StorageGarbageCollector()
@@ -2,7 +2,7 @@
 AI Translation Service - OpenAI & Anthropic integration
 Supports chunk-based translation with context preservation
 """
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Callable
 from enum import Enum
 import re
 import openai
@@ -91,7 +91,9 @@ class TranslationService:
         source_lang: str = "ko",
         target_lang: str = "en",
         glossary: Optional[Dict[str, str]] = None,
-        chunk_size: int = 2000
+        chunk_size: int = 2000,
+        context: Optional[str] = None,
+        cancel_check: Optional[Callable[[], None]] = None
     ) -> str:
         """
         Translate Markdown document in chunks with context preservation
@@ -102,6 +104,8 @@ class TranslationService:
             target_lang: Target language
             glossary: Custom terminology
             chunk_size: Characters per chunk
+            context: Translated text preceding this document (e.g. previous page)
+            cancel_check: Called before each chunk; raises to abort the translation
 
         Returns:
             Translated markdown
@@ -110,9 +114,12 @@ class TranslationService:
         chunks = self._split_markdown_chunks(markdown, chunk_size)
 
         translated_chunks = []
-        context = None
 
         for i, chunk in enumerate(chunks):
+            # Stop before spending another provider call on a cancelled job
+            if cancel_check:
+                cancel_check()
+
             logger.info(f"Translating chunk {i+1}/{len(chunks)}")
 
             # Translate with context from previous chunk
@@ -0,0 +1,137 @@
+"""
+S3 storage backend against moto's in-process S3
+"""
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+import boto3
+import pytest
+from moto import mock_s3
+
+from core.config import settings
+from services import s3_storage
+from services.s3_storage import S3StorageService
+
+
+BUCKET = "wf-bucket"
+
+
+@pytest.fixture
+def s3(monkeypatch, tmp_path):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    # moto does not validate the checksums newer botocore sends by default
+    monkeypatch.setenv("AWS_REQUEST_CHECKSUM_CALCULATION", "when_required")
+    monkeypatch.setenv("AWS_RESPONSE_CHECKSUM_VALIDATION", "when_required")
+    monkeypatch.setattr(settings, "AWS_ACCESS_KEY_ID", "")
+    monkeypatch.setattr(settings, "AWS_SECRET_ACCESS_KEY", "")
+    monkeypatch.setattr(settings, "S3_ENDPOINT_URL", None)
+    monkeypatch.setattr(settings, "S3_SCRATCH_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "S3_MULTIPART_THRESHOLD_MB", 5)
+    monkeypatch.setattr(settings, "S3_MULTIPART_CHUNK_MB", 5)
+
+    with mock_s3():
+        boto3.client("s3", region_name=settings.AWS_REGION).create_bucket(
+            Bucket=BUCKET,
+            CreateBucketConfiguration={"LocationConstraint": settings.AWS_REGION}
+        )
+        yield S3StorageService(bucket=BUCKET)
+
+
+def test_save_and_read_multipart(s3):
+    content = os.urandom(12 * 1024 * 1024)
+    s3.save_file("users/u/originals/big.pdf", content)
+
+    assert s3.download_file("users/u/originals/big.pdf") == content
+    assert s3.file_info("users/u/originals/big.pdf")["size"] == len(content)
+    assert b"".join(s3.read_chunks("users/u/originals/big.pdf", 5, 20, chunk_size=4)) == content[5:21]
+
+
+def test_open_for_write_stores_only_on_success(s3):
+    with s3.open_for_write("renders/ok.pdf") as f:
+        f.write(b"%PDF-1.7")
+
+    with pytest.raises(RuntimeError):
+        with s3.open_for_write("renders/failed.pdf") as f:
+            f.write(b"%PDF")
+            raise RuntimeError
+
+    assert s3.download_file("renders/ok.pdf") == b"%PDF-1.7"
+    assert not s3.file_exists("renders/failed.pdf")
+
+
+def test_append_across_part_boundary(s3):
+    content = os.urandom(7 * 1024 * 1024)
+    for start in range(0, len(content), 3 * 1024 * 1024):
+        with s3.open_for_append("uploads/1/upload.part") as f:
+            f.write(content[start:start + 3 * 1024 * 1024])
+
+    assert s3.download_file("uploads/1/upload.part") == content
+
+
+def test_list_and_delete_folder(s3):
+    s3.save_file("uploads/1/upload.json", b"{}")
+    s3.save_file("uploads/2/upload.json", b"{}")
+
+    assert s3.list_files("uploads/1") == ["uploads/1/upload.json"]
+    assert s3.list_folders("uploads") == ["uploads/1", "uploads/2"]
+
+    s3.delete_folder("uploads")
+    assert s3.list_folders("uploads") == []
+
+
+def test_rejects_paths_outside_bucket_root(s3):
+    for path in ("../x", "a/../../b", ""):
+        with pytest.raises(ValueError):
+            s3.download_file(path)
+
+
+def test_touch_skips_recently_modified_objects(s3, monkeypatch):
+    s3.save_file("previews/ab/page.png", b"png")
+    copies = []
+    copy_object = s3.client.copy_object
+    monkeypatch.setattr(s3.client, "copy_object", lambda **kwargs: copies.append(kwargs) or copy_object(**kwargs))
+
+    s3.touch_file("previews/ab/page.png")
+    assert copies == []
+
+    # Pretend the object was last written long ago
+    stale = datetime.now(timezone.utc) - timedelta(seconds=s3_storage.TOUCH_MIN_INTERVAL_SECONDS + 60)
+    head = s3._head
+    monkeypatch.setattr(s3, "_head", lambda path: {**head(path), "LastModified": stale})
+
+    s3.touch_file("previews/ab/page.png")
+    assert len(copies) == 1
+    assert s3.download_file("previews/ab/page.png") == b"png"
+
+
+def test_local_path_is_cached_per_version(s3):
+    s3.save_file("users/u/originals/a.pdf", b"v1")
+    first = s3.local_path("users/u/originals/a.pdf")
+    assert s3.local_path("users/u/originals/a.pdf") == first
+
+    s3.save_file("users/u/originals/a.pdf", b"version 2")
+    second = s3.local_path("users/u/originals/a.pdf")
+    assert second != first and not os.path.exists(first)
+    with open(second, "rb") as f:
+        assert f.read() == b"version 2"
+
+
+def test_local_path_evicts_least_recently_used(s3, monkeypatch):
+    monkeypatch.setattr(s3_storage, "SCRATCH_EVICT_GRACE_SECONDS", 0)
+    s3.max_scratch_bytes = 3500
+
+    paths = {}
+    for name in ("a", "b", "c"):
+        s3.save_file(f"users/u/originals/{name}.pdf", name.encode() * 1000)
+        paths[name] = s3.local_path(f"users/u/originals/{name}.pdf")
+        os.utime(paths[name], (time.time() - 100, time.time() - 100))
+
+    s3.local_path("users/u/originals/a.pdf")  # Hit: a is now the most recent
+    s3.save_file("users/u/originals/d.pdf", b"d" * 1000)
+    s3.local_path("users/u/originals/d.pdf")
+
+    remaining = {name for name, path in paths.items() if os.path.exists(path)}
+    assert remaining == {"a", "c"}
+    assert s3._scratch_bytes <= s3.max_scratch_bytes